@@ -1,47 +1,144 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.keys import Keys
-import csv
-import time
-from datetime import datetime, timedelta
-
-# Read secured party names from file
-def read_secured_party_names(filename):
-    with open(filename, 'r') as file:
-        return [line.strip() for line in file if line.strip()]
-
-from datetime import datetime
-
-# Get current date for filename
-current_date = datetime.now().strftime("%Y-%m-%d")
-OUTPUT_CSV = f"AL_UCC1_{current_date}.csv"
-
-# Read secured party names
-secured_party_names = read_secured_party_names("secured_party_names.txt")
-all_results = []
-csv_header = None
-
-# Set up headless Chrome browser with webdriver_manager
-options = Options()
-# options.add_argument('--headless')
-options.add_argument('--disable-gpu')
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=options)
-
-driver.maximize_window()
-
-for secured_party_name in secured_party_names:
-    print(f"Processing: {secured_party_name}")
-        
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree, html
+import os
+import re
+import requests
+import sys
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc import cache
+from ucc.ratelimit import limited_request
+from ucc.replay import http_adapter
+from ucc.scraper import FilingRows, StateScraper, main, register
+from ucc.trace import pause, traced
+
+BASE_URL = "https://www.alabamainteractive.org/ucc_filing/"
+DETAIL_WORKERS = 8
+DETAIL_TIMEOUT = 30
+DETAIL_ID_REGEX = re.compile(r"SearchDetail\.do\?id=([^&#]+)")
+RESULT_LINKS = (By.CSS_SELECTOR, 'a[href^="SearchDetail.do?id="]')
+
+# The browser inserts <tbody>; the raw HTML from requests usually does not have it
+DETAIL_TABLE_PATH = '/html/body/table/tbody/tr[1]/td/table/tbody/tr[6]/td/table'
+DETAIL_TABLE_XPATHS = [etree.XPath(DETAIL_TABLE_PATH), etree.XPath(DETAIL_TABLE_PATH.replace('/tbody', ''))]
+TABLE_ROWS_XPATH = etree.XPath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr')
+ROW_TD_XPATH = etree.XPath('./td')
+ROW_TH_XPATH = etree.XPath('./th')
+
+
+class SessionExpired(Exception):
+    """The portal answered a detail request with something other than the detail page."""
+
+
+def collect_detail_ids(driver):
+    # One round-trip for every link on the results page, de-duplicated in page order
+    hrefs = driver.execute_script(
+        "return Array.from(document.querySelectorAll('a[href^=\"SearchDetail.do?id=\"]'), a => a.getAttribute('href'));"
+    )
+    ids = {}
+    for href in hrefs:
+        match = DETAIL_ID_REGEX.search(href or '')
+        if match:
+            ids.setdefault(match.group(1))
+    return list(ids)
+
+
+def build_session(driver):
+    session = requests.Session()
+    adapter = http_adapter(pool_connections=1, pool_maxsize=DETAIL_WORKERS)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent")
+    sync_cookies(driver, session)
+    return session
+
+
+def sync_cookies(driver, session):
+    # Carry the search session (JSESSIONID etc.) over from the browser
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+
+def cell_text(cell):
+    # Mimic WebElement.text: <br> becomes a line break, whitespace collapses per line
+    for br in cell.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    lines = (' '.join(line.split()) for line in cell.text_content().split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_detail_table(page_source):
+    """Return the detail table as a list of rows (header first), or None if it is missing."""
+    tree = html.fromstring(page_source)
+    for xpath in DETAIL_TABLE_XPATHS:
+        found = xpath(tree)
+        if found:
+            break
+    else:
+        return None
+    table_data = []
+    for row in TABLE_ROWS_XPATH(found[0]):
+        cells = ROW_TD_XPATH(row) or ROW_TH_XPATH(row)
+        row_data = [cell_text(cell) for cell in cells]
+        if row_data:
+            table_data.append(row_data)
+    return table_data
+
+
+def detail_page_complete(url, content):
+    """For the response cache: an expired session answers a detail request with a page that has no detail table."""
+    return 'SearchDetail.do' not in url or (bool(content) and extract_detail_table(content) is not None)
+
+
+cache.set_validator(urlsplit(BASE_URL).hostname, detail_page_complete)
+
+
+# Runs on the detail fetch threads, which do not carry the runner's context
+@traced("extract", state="AL")
+def fetch_detail(session, detail_id):
+    url = f"{BASE_URL}SearchDetail.do"
+    params = {'id': detail_id}
+    with limited_request(url, params) as ticket:
+        response = session.get(url, params=params, timeout=DETAIL_TIMEOUT)
+        ticket.check_response(response)
+    if response.status_code != 200 or 'NewSearch.do' in response.url:
+        raise SessionExpired(f"{detail_id}: HTTP {response.status_code} at {response.url}")
+    table_data = extract_detail_table(response.text)
+    if table_data is None:
+        raise SessionExpired(f"{detail_id}: detail table missing")
+    return table_data
+
+
+def fetch_detail_safe(session, detail_id):
     try:
-        driver.get("https://www.alabamainteractive.org/ucc_filing/NewSearch.do")
-        time.sleep(2)
+        return detail_id, fetch_detail(session, detail_id)
+    except (SessionExpired, requests.RequestException) as e:
+        print(f"HTTP fetch failed, will retry in browser: {e}")
+        return detail_id, None
 
-        from selenium.common.exceptions import NoSuchElementException
+
+@traced("extract", state="AL", browser=True)
+def fetch_detail_in_browser(driver, detail_id):
+    driver.get(f"{BASE_URL}SearchDetail.do?id={detail_id}")
+    return extract_detail_table(driver.page_source)
+
+
+@register
+class ALScraper(StateScraper):
+    state = "AL"
+    url = BASE_URL + "NewSearch.do"
+
+    def __init__(self, output_dir=None, run_date=None):
+        super().__init__(output_dir, run_date)
+        # Get run date for filename
+        self.output_file = f"AL_UCC1_{self.run_date.strftime('%Y-%m-%d')}.csv"
+
+    def scrape_name(self, driver, name):
+        driver.get(self.url)
+        pause(2)
 
         filer_type_xpath = '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[12]/td[2]/input[3]'
         try:
@@ -49,76 +146,64 @@ for secured_party_name in secured_party_names:
         except NoSuchElementException:
             # If not found, reload and try again once
             driver.refresh()
-            time.sleep(2)
+            pause(2)
             filer_type_button = driver.find_element(By.XPATH, filer_type_xpath)
         filer_type_button.click()
-        time.sleep(1)
+        pause(1)
 
         entry_type_button = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[13]/td[2]/input[3]')
         entry_type_button.click()
-        time.sleep(1)
+        pause(1)
 
         # filing_state_button = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[14]/td[2]/input[2]')
         # filing_state_button.click()
-        # time.sleep(1)
+        # pause(1)
 
         search_option_button = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[19]/td[2]/input[1]')
         search_option_button.click()
-        time.sleep(1)
+        pause(1)
 
         search_form = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[22]/td[2]/input')
         search_form.clear()
-        search_form.send_keys(secured_party_name)
-        time.sleep(1)
+        search_form.send_keys(name)
+        pause(1)
 
         continue_button = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[7]/td/form/table/tbody/tr[4]/td/table/tbody/tr[24]/td/input[1]')
-        continue_button.click()
-        time.sleep(10)
-
-        # Find all <a> elements whose href attribute starts with "SearchDetail.do?id="
-        detail_links = driver.find_elements(By.XPATH, '//a[starts-with(@href, "SearchDetail.do?id=")]')
-        for i in range(len(detail_links)):
-            try:
-                detail_links = driver.find_elements(By.XPATH, '//a[starts-with(@href, "SearchDetail.do?id=")]')
-                link = detail_links[i]
-                link.click()
-                time.sleep(10)
-
-                # Locate the table
-                table = driver.find_element(By.XPATH, '/html/body/table/tbody/tr[1]/td/table/tbody/tr[6]/td/table')
-                rows = table.find_elements(By.TAG_NAME, "tr")
-
-                # Extract table data
-                table_data = []
-                for row in rows:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if not cells:
-                        cells = row.find_elements(By.TAG_NAME, "th")
-                    row_data = [cell.text.strip() for cell in cells]
-                    if row_data:
-                        table_data.append(row_data)
-
-                # Set header if not set
-                if table_data and csv_header is None:
-                    csv_header = table_data[0]
-
-                # Add all data rows (skip header)
-                if table_data and len(table_data) > 1:
-                    all_results.extend(table_data[1:])
-
-                driver.back()
-                time.sleep(5)
-            except Exception as e:
-                print(f"Could not click detail link: {e}")
-    except Exception as e:
-        print(f"Error processing table: {e}")
-
-# Write all results to a single CSV at the end
-if csv_header and all_results:
-    with open(OUTPUT_CSV, "w", newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(csv_header)
-        writer.writerows(all_results)
-    print(f"Saved {len(all_results)} records to {OUTPUT_CSV}")
-else:
-    print("No records found to save.")
+        found = self.probe.search(driver, continue_button.click, RESULT_LINKS, pause=10)
+        if found is False:
+            print("Found 0 filings")
+            return
+        if found is None:
+            # Neither results nor "no records": the unit stays unfinished so --resume searches again
+            raise TimeoutException(f"No results or empty-result marker for '{name}' within 10s")
+
+        detail_ids = collect_detail_ids(driver)
+        print(f"Found {len(detail_ids)} filings")
+        # On --resume, details already in the journal are replayed rather than fetched again
+        detail_ids = [detail_id for detail_id in detail_ids if not self.filing_done(name, detail_id)]
+        # Each leased browser has its own search session, so the HTTP session is per name
+        session = build_session(driver)
+
+        with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as executor:
+            fetched = list(executor.map(lambda detail_id: fetch_detail_safe(session, detail_id), detail_ids))
+
+        for detail_id, table_data in fetched:
+            if table_data is None:
+                # Session expired (or the request failed): the browser still holds a live session
+                try:
+                    table_data = fetch_detail_in_browser(driver, detail_id)
+                except Exception as e:
+                    print(f"Could not load detail {detail_id}: {e}")
+                    continue
+                sync_cookies(driver, session)
+            if not table_data:
+                print(f"Detail table not found for {detail_id}")
+                continue
+
+            # First row is the header, the rest are filings
+            header = table_data[0]
+            yield FilingRows(detail_id, [dict(zip(header, row)) for row in table_data[1:]])
+
+
+if __name__ == "__main__":
+    main(ALScraper)
@@ -1,8 +1,19 @@
+import argparse
 import csv
 import glob
+import hashlib
+import json
 import os
 import re
+import sqlite3
+import sys
+import tempfile
 from datetime import datetime
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.records import Party, UCCFiling, intern, layout_for
 
 # Output columns as in the sample, plus secured party address fields
 OUTPUT_COLUMNS = [
@@ -11,6 +22,21 @@ OUTPUT_COLUMNS = [
     'lapse_date', 'official_designation', 'official_name', 'official_address', 'Processed'
 ]
 
+OUTPUT_FILE = 'combined_al_output.csv'
+MANIFEST_FILE = 'combined_al_manifest.json'
+SEEN_DB = 'combined_al_seen.sqlite3'
+
+# Identity of a filing/party pair across runs; Processed and the official_* enrichment change over time
+DEDUPE_COLUMNS = [
+    'filing_number', 'debtor_name', 'Debtor_Street', 'Debtor_City', 'Debtor_State', 'Debtor_Zip',
+    'filing_date', 'secured_party_name', 'secured_party_address', 'secured_party_city', 'secured_party_state', 'secured_party_zip',
+    'lapse_date',
+]
+DEDUPE_INDEXES = [OUTPUT_COLUMNS.index(col) for col in DEDUPE_COLUMNS]
+OUTPUT_LAYOUT = layout_for(tuple(OUTPUT_COLUMNS))
+# official_* are filled in later by get_official_al.py
+EMPTY_EXTRA = ('',) * len(OUTPUT_LAYOUT.extra)
+
 # Helper to parse address into street, city, state, zip
 ADDRESS_REGEX = re.compile(r"^(.*?),\s*([A-Za-z .'-]+),\s*([A-Z]{2})\s+(\d{5})(?:-(\d{4}))?$")
 SIMPLE_CITY_STATE_ZIP = re.compile(r"^([A-Za-z .'-]+),\s*([A-Z]{2})\s+(\d{5})(?:-(\d{4}))?$")
@@ -40,18 +66,23 @@ def parse_address(address1, address2=None):
     # Fallback: put everything in street
     return address, '', '', ''
 
+def iter_lines(fname):
+    """Stream a file line by line with all double quotes removed."""
+    with open(fname, encoding='utf-8') as f:
+        for line in f:
+            yield line.replace('"', '')
+
 def extract_blocks(lines):
-    blocks = []
+    """Group a line stream into ----Filing Type---- blocks, holding one block at a time."""
     block = []
     for line in lines:
         if line.strip().startswith('----Filing Type----'):
             if block:
-                blocks.append(block)
+                yield block
                 block = []
         block.append(line)
     if block:
-        blocks.append(block)
-    return blocks
+        yield block
 
 def parse_block(block):
     filing_number = filing_date = lapse_date = ''
@@ -127,62 +158,128 @@ def parse_block(block):
             continue
         i += 1
     # Combine all debtor/secured party pairs
-    rows = []
+    filings = []
+    processed = intern(datetime.now().strftime('%m/%d/%Y'))
+    secured_parties = [
+        Party(intern(sname), *(intern(v) for v in parse_address(*saddr_tuple)))
+        for sname, saddr_tuple in zip(secured_party_names, secured_party_addresses)
+    ]
     for dname, daddr_tuple in zip(debtor_names, debtor_addresses):
-        d_street, d_city, d_state, d_zip = parse_address(*daddr_tuple)
-        for sname, saddr_tuple in zip(secured_party_names, secured_party_addresses):
-            s_street, s_city, s_state, s_zip = parse_address(*saddr_tuple)
-            row = {
-                'filing_number': filing_number,
-                'debtor_name': dname,
-                'Debtor_Street': d_street,
-                'Debtor_City': d_city,
-                'Debtor_State': d_state,
-                'Debtor_Zip': d_zip,
-                'filing_date': filing_date,
-                'secured_party_name': sname,
-                'secured_party_address': s_street,
-                'secured_party_city': s_city,
-                'secured_party_state': s_state,
-                'secured_party_zip': s_zip,
-                'lapse_date': lapse_date,
-                'official_designation': '',
-                'official_name': '',
-                'official_address': '',
-                'Processed': datetime.now().strftime('%m/%d/%Y'),
-            }
-            rows.append(row)
-    return rows
+        debtor = Party(dname, *parse_address(*daddr_tuple))
+        for secured_party in secured_parties:
+            filings.append(UCCFiling(
+                state='AL', filing_number=filing_number, filing_date=filing_date, lapse_date=lapse_date,
+                search_name=secured_party.name, processed=processed, debtor=debtor,
+                secured_party=secured_party, extra=EMPTY_EXTRA, layout=OUTPUT_LAYOUT,
+            ))
+    return filings
+
+def parse_file(fname):
+    """file -> lines -> blocks -> rows, as output-ordered tuples with stray quotes removed."""
+    for block in extract_blocks(iter_lines(fname)):
+        for filing in parse_block(block):
+            yield tuple(v.replace('"', '').strip() if isinstance(v, str) else v for v in filing.to_row())
+
+def spool_file(task):
+    # Worker entry point: the file's rows go to a spool file as they are parsed, never into a list
+    fname, spool_dir = task
+    spool_path = os.path.join(spool_dir, os.path.basename(fname))
+    with open(spool_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(parse_file(fname))
+    return fname, spool_path
+
+def spooled_rows(spool_path):
+    """Stream a worker's parsed rows back, one at a time."""
+    with open(spool_path, newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+def row_digest(row):
+    # Fixed-size dedupe key over the stable columns only
+    key = '\x1f'.join(row[i] for i in DEDUPE_INDEXES)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+def file_sha256(fname):
+    digest = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def pending_files(files, manifest):
+    """Manifest entries for files that are new or whose size/content changed since they were last combined."""
+    pending = {}
+    for fname in files:
+        entry = {'size': os.path.getsize(fname), 'sha256': file_sha256(fname)}
+        if manifest.get(fname) != entry:
+            pending[fname] = entry
+    return pending
+
+def open_seen_store():
+    conn = sqlite3.connect(SEEN_DB)
+    conn.execute('CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+    return conn
 
 def main():
-    all_rows = []
-    for fname in glob.glob('al_*.csv'):
-        with open(fname, encoding='utf-8') as f:
-            # Remove all double quotes from each line before further processing
-            lines = [line.replace('"', '') for line in f.readlines()]
-        blocks = extract_blocks(lines)
-        for block in blocks:
-            rows = parse_block(block)
-            all_rows.extend(rows)
-    # Remove duplicates
-    unique_rows = []
-    seen = set()
-    for row in all_rows:
-        # Remove any extraneous quotes from all output fields
-        for k, v in row.items():
-            if isinstance(v, str):
-                row[k] = v.replace('"', '').strip()
-        row_tuple = tuple(row.get(col, '') for col in OUTPUT_COLUMNS)
-        if row_tuple not in seen:
-            seen.add(row_tuple)
-            unique_rows.append(row)
-    # Write output
-    with open('combined_al_output.csv', 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
-        writer.writeheader()
-        for row in unique_rows:
-            writer.writerow(row)
-    print(f'Wrote {len(unique_rows)} unique records to combined_al_output.csv')
+    parser = argparse.ArgumentParser(description='Combine al_*.csv exports into combined_al_output.csv')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the manifest and dedupe store and rewrite the output')
+    args = parser.parse_args()
+
+    # The manifest and dedupe store describe what is already in the output; without it they are stale,
+    # and a rebuild that kept the output would append every row to it again
+    if args.rebuild or not os.path.exists(OUTPUT_FILE):
+        for path in (OUTPUT_FILE, MANIFEST_FILE, SEEN_DB):
+            if os.path.exists(path):
+                os.remove(path)
+
+    manifest = load_manifest()
+    files = pending_files(sorted(glob.glob('al_*.csv')), manifest)
+    if not files:
+        print(f'No new or changed al_*.csv files; {OUTPUT_FILE} is up to date')
+        return
+
+    conn = open_seen_store()
+    write_header = not os.path.exists(OUTPUT_FILE)
+    written = 0
+    with open(OUTPUT_FILE, 'a', newline='', encoding='utf-8') as f, \
+            tempfile.TemporaryDirectory(prefix='combine_al_') as spool_dir:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(OUTPUT_COLUMNS)
+        with Pool(processes=min(len(files), os.cpu_count() or 1)) as pool:
+            # imap keeps file order and hands back each file as soon as it is parsed; its rows
+            # wait on disk, so memory stays constant however far the workers run ahead
+            for fname, spool_path in pool.imap(spool_file, [(fname, spool_dir) for fname in files]):
+                rows = new_rows = 0
+                for row in spooled_rows(spool_path):
+                    rows += 1
+                    cursor = conn.execute('INSERT OR IGNORE INTO seen (digest) VALUES (?)', (row_digest(row),))
+                    if cursor.rowcount:
+                        writer.writerow(row)
+                        new_rows += 1
+                os.remove(spool_path)
+                # Output first, then the dedupe store, then the manifest: a crash in between
+                # re-parses the file next run instead of losing its rows
+                f.flush()
+                os.fsync(f.fileno())
+                conn.commit()
+                manifest[fname] = files[fname]
+                save_manifest(manifest)
+                written += new_rows
+                print(f'{fname}: {rows} rows, {new_rows} new')
+    conn.close()
+    print(f'Appended {written} new unique records to {OUTPUT_FILE}')
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
@@ -1,18 +1,15 @@
-import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.enrich import DEFAULT_LOOKUP, OfficialIndex, enrich_csv
 
 input_file = 'combined_al_output.csv'
 output_file = 'combined_al_output_with_official.csv'
 
-with open(input_file, newline='', encoding='utf-8') as infile, \
-     open(output_file, 'w', newline='', encoding='utf-8') as outfile:
-    reader = csv.DictReader(infile)
-    fieldnames = reader.fieldnames
-    writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-    writer.writeheader()
-    for row in reader:
-        if 'citibank' in row.get('secured_party_name', '').strip().lower():
-            row['official_designation'] = row['secured_party_name']
-            row['official_address'] = row.get('secured_party_address', '')
-        writer.writerow(row)
+index = OfficialIndex.from_csv(DEFAULT_LOOKUP)
+matched = enrich_csv(input_file, output_file, index, name_column='secured_party_name',
+                     address_column='secured_party_address')
 
-print(f"Updated file written to {output_file}")
+print(f"Matched {matched} rows. Updated file written to {output_file}")
@@ -1,80 +1,283 @@
-import csv
-import time
+import json
+import os
+import sys
+import threading
 from datetime import datetime, timedelta
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.browser import TracedWait
+from ucc.scraper import StateScraper, main, register
+from ucc.trace import pause, span
+
 # --- Config ---
-input_file = "secured_party_names.txt"
-output_file = "ucc_results.csv"
-url = "https://apps.azsos.gov/apps/ucc/search/"
-
-# --- Read names ---
-with open(input_file, "r", encoding="utf-8") as f:
-    secured_party_names = [line.strip() for line in f if line.strip()]
-
-# --- CSV Setup ---
-with open(output_file, "w", newline='', encoding='utf-8') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(["Secured Party", "Filing Number", "Filing Type", "Filing Date", "Debtor Name", "Status"])
-
-    for name in secured_party_names:
-        # Open new browser instance
-        chrome_options = Options()
-        # chrome_options.add_argument('--headless')  # Optional: only enable after testing
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=chrome_options)
-        wait = WebDriverWait(driver, 15)
-
-        try:
-            driver.get(url)
-            time.sleep(5)  # Cloudflare challenge time
-
-            # Select "Organization" radio
-            org_radio = wait.until(EC.element_to_be_clickable((By.ID, "PageContent_PageContent_OrganizationRadioButtonList_1")))
-            org_radio.click()
-            time.sleep(1.5)
-
-            # Type secured party name
-            name_input = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_OrganizationTextBox")
-            name_input.clear()
-            time.sleep(0.5)
-            name_input.send_keys(name)
-            time.sleep(1.5)
-
-            # Input date (7 days ago)
-            begin_date = (datetime.today() - timedelta(days=37)).strftime("%m/%d/%Y")
-            date_input = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_BeginDatePicker_dateInput")
-            date_input.clear()
-            time.sleep(0.5)
-            date_input.send_keys(begin_date)
-            time.sleep(1.5)
-
-            # Click Search
-            search_btn = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_SearchButton_input")
-            search_btn.click()
-            time.sleep(5)  # Wait for table to load
-
-            # Scrape results
-            try:
-                results_table = wait.until(EC.presence_of_element_located((By.ID, "ctl00_ctl00_PageContent_PageContent_ResultsGridView_ctl00")))
-                rows = results_table.find_elements(By.XPATH, ".//tr")[1:]  # skip header
-                for row in rows:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    row_data = [col.text.strip() for col in cols]
-                    writer.writerow(row_data)
-            except Exception as inner_e:
-                print(f"No results for '{name}' or table error: {inner_e}")
-
-        except Exception as e:
-            print(f"Error during processing '{name}': {e}")
-
-        finally:
-            driver.quit()
-            time.sleep(2)  # Slight delay before reopening
-
-print(f"\n✅ All done. Results saved to {output_file}")
+GRID_ID = "ctl00_ctl00_PageContent_PageContent_ResultsGridView"
+RESULTS_TABLE_ID = GRID_ID + "_ctl00"
+# The row the grid renders instead of results
+NO_RECORDS = (By.CSS_SELECTOR, f"#{RESULTS_TABLE_ID} .rgNoRecords")
+FALLBACK_PAGE_SIZE = 50  # used when the grid exposes no page-size combo
+POSTBACK_TIMEOUT = 30
+watermark_file = "az_watermarks.json"
+DEFAULT_LOOKBACK_DAYS = 37  # first run for a name, or no watermark yet
+WATERMARK_OVERLAP_DAYS = 2  # re-query a little before the watermark to catch late postings
+
+HEADER = ["Secured Party", "Filing Number", "Filing Type", "Filing Date", "Debtor Name", "Status"]
+FILING_NUMBER_COL = HEADER.index("Filing Number")
+FILING_DATE_COL = HEADER.index("Filing Date")
+
+
+# --- Watermarks ---
+# Per secured party, the newest filing date already emitted, and the filing numbers
+# (with their dates) emitted within WATERMARK_OVERLAP_DAYS of it: the next run
+# searches that overlap again for late postings and skips only those numbers.
+def load_watermarks(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermarks(path, watermarks):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def parse_filing_date(text):
+    try:
+        return datetime.strptime(text.split()[0], "%m/%d/%Y")
+    except (IndexError, ValueError):
+        return None
+
+
+def filing_key(filing_date, filing_number):
+    """Sortable key: date first, then filing number (numeric strings compare by length first)."""
+    number = filing_number.strip()
+    return (filing_date, len(number), number)
+
+
+def watermark_key(mark):
+    # Watermarks from before "seen" was kept: only the newest filing is known
+    return filing_key(datetime.strptime(mark["filing_date"], "%m/%d/%Y"), mark["filing_number"])
+
+
+def already_emitted(mark, seen, filing_date, number):
+    if number in seen:
+        return True
+    return bool(mark) and "seen" not in mark and filing_key(filing_date, number) <= watermark_key(mark)
+
+
+def overlap_rows(mark, rows, seen):
+    """(row, new) for each grid row; ``new`` is False for a filing an earlier run emitted.
+
+    Every dated row's number is recorded in ``seen``. Only ``mark`` decides what
+    counts as emitted: a filing listed once per debtor repeats its number.
+    """
+    emitted = mark.get("seen", {}) if mark else {}
+    for row in rows:
+        if len(row) <= FILING_DATE_COL:
+            continue
+        filing_date = parse_filing_date(row[FILING_DATE_COL])
+        if filing_date is None:
+            yield row, True
+            continue
+        number = row[FILING_NUMBER_COL].strip()
+        seen[number] = filing_date.strftime("%m/%d/%Y")
+        yield row, not already_emitted(mark, emitted, filing_date, number)
+
+
+def next_watermark(mark, seen):
+    """The watermark after a complete read in which every filing of ``seen`` ({number: date}) was emitted.
+
+    The overlap numbers ``mark`` already held are kept alongside this run's.
+    """
+    if not seen:
+        return mark
+    if mark:
+        seen = {**mark.get("seen", {}), **seen}
+    dates = [datetime.strptime(d, "%m/%d/%Y") for d in seen.values()]
+    if mark:
+        dates.append(datetime.strptime(mark["filing_date"], "%m/%d/%Y"))
+    newest = max(dates)
+    cutoff = newest - timedelta(days=WATERMARK_OVERLAP_DAYS)
+    return {
+        "filing_date": newest.strftime("%m/%d/%Y"),
+        "seen": {n: d for n, d in sorted(seen.items()) if datetime.strptime(d, "%m/%d/%Y") >= cutoff},
+    }
+
+
+def begin_date_for(mark):
+    if not mark:
+        return datetime.today() - timedelta(days=DEFAULT_LOOKBACK_DAYS)
+    return datetime.strptime(mark["filing_date"], "%m/%d/%Y") - timedelta(days=WATERMARK_OVERLAP_DAYS)
+
+
+# --- Results grid (Telerik RadGrid) ---
+IN_ASYNC_POSTBACK_JS = """
+return !!(window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager
+          && Sys.WebForms.PageRequestManager.getInstance().get_isInAsyncPostBack());
+"""
+
+# Largest entry offered by the pager's page-size combo, and the master table's paging state
+GRID_STATE_JS = """
+var grid = $find(arguments[0]);
+if (!grid) { return null; }
+var view = grid.get_masterTableView();
+var sizes = [];
+if (window.$telerik && $telerik.radControls) {
+    $telerik.radControls.forEach(function (c) {
+        if (c.get_items && c.get_element && grid.get_element().contains(c.get_element())) {
+            var items = c.get_items();
+            for (var i = 0; i < items.get_count(); i++) {
+                var n = parseInt(items.getItem(i).get_value() || items.getItem(i).get_text(), 10);
+                if (!isNaN(n)) { sizes.push(n); }
+            }
+        }
+    });
+}
+return {
+    pageSize: view.get_pageSize(),
+    pageCount: view.get_pageCount(),
+    pageIndex: view.get_currentPageIndex(),
+    maxPageSize: sizes.length ? Math.max.apply(null, sizes) : null
+};
+"""
+
+# One round-trip per page instead of one find_elements call per row
+READ_PAGE_JS = """
+var body = arguments[0].tBodies[0];
+if (!body) { return []; }
+return Array.prototype.filter.call(body.rows, function (r) {
+    return !/rgNoRecords|rgPager/.test(r.className);
+}).map(function (r) {
+    return Array.prototype.map.call(r.cells, function (c) { return c.innerText.trim(); });
+});
+"""
+
+
+def wait_for_grid_postback(driver, old_table):
+    """Block until the grid postback finished and the results table was re-rendered."""
+    TracedWait(driver, POSTBACK_TIMEOUT).until(EC.staleness_of(old_table))
+    TracedWait(driver, POSTBACK_TIMEOUT).until(lambda d: not d.execute_script(IN_ASYNC_POSTBACK_JS))
+    return TracedWait(driver, POSTBACK_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, RESULTS_TABLE_ID))
+    )
+
+
+def grid_postback(driver, old_table, script, *args):
+    """Run a grid command and wait out its postback, as one request against the portal's limit."""
+    def run():
+        driver.execute_script(script, GRID_ID, *args)
+        return wait_for_grid_postback(driver, old_table)
+
+    return driver.limited(run)
+
+
+def maximize_page_size(driver, table):
+    """Switch the grid to its largest page size; returns the (possibly re-rendered) table."""
+    state = driver.execute_script(GRID_STATE_JS, GRID_ID)
+    if not state or state["pageCount"] <= 1:
+        return table
+    page_size = state["maxPageSize"] or FALLBACK_PAGE_SIZE
+    if page_size <= state["pageSize"]:
+        return table
+    return grid_postback(driver, table, "$find(arguments[0]).get_masterTableView().set_pageSize(arguments[1]);",
+                         page_size)
+
+
+def iter_grid_rows(driver, table):
+    """Yield the cell texts of every row on every page of the results grid."""
+    table = maximize_page_size(driver, table)
+    while True:
+        with span("extract"):
+            rows = driver.execute_script(READ_PAGE_JS, table)
+        yield from rows
+        state = driver.execute_script(GRID_STATE_JS, GRID_ID)
+        if not state or state["pageIndex"] + 1 >= state["pageCount"]:
+            return
+        table = grid_postback(driver, table, "$find(arguments[0]).get_masterTableView().page('Next');")
+
+
+@register
+class AZScraper(StateScraper):
+    state = "AZ"
+    url = "https://apps.azsos.gov/apps/ucc/search/"
+    output_file = "ucc_results.csv"
+    header = HEADER
+    # Watermarks skip filings earlier runs emitted
+    incremental = True
+    run_state_files = (watermark_file,)
+
+    def start(self):
+        super().start()
+        self.watermark_path = self.path(watermark_file)
+        self.watermarks = load_watermarks(self.watermark_path)
+        # Watermarks of names read to the end, saved once their unit is journaled as done
+        self.pending_watermarks = {}
+        self.watermark_lock = threading.Lock()
+
+    def unit_done(self, names):
+        with self.watermark_lock:
+            advanced = {name: self.pending_watermarks.pop(name) for name in names if name in self.pending_watermarks}
+            if advanced:
+                self.watermarks.update(advanced)
+                save_watermarks(self.watermark_path, self.watermarks)
+
+    def scrape_name(self, driver, name):
+        mark = self.watermarks.get(name)
+        seen = {}
+        wait = TracedWait(driver, 15)
+
+        self.session.open(driver, self.url)
+
+        # Select "Organization" radio
+        org_radio = wait.until(EC.element_to_be_clickable((By.ID, "PageContent_PageContent_OrganizationRadioButtonList_1")))
+        org_radio.click()
+        pause(1.5)
+
+        # Type secured party name
+        name_input = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_OrganizationTextBox")
+        name_input.clear()
+        pause(0.5)
+        name_input.send_keys(name)
+        pause(1.5)
+
+        # Input date (watermark minus overlap, or the default lookback)
+        begin_date = begin_date_for(mark).strftime("%m/%d/%Y")
+        date_input = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_BeginDatePicker_dateInput")
+        date_input.clear()
+        pause(0.5)
+        date_input.send_keys(begin_date)
+        pause(1.5)
+
+        # Click Search; an empty search is over as soon as the grid says so
+        search_btn = driver.find_element(By.ID, "ctl00_ctl00_PageContent_PageContent_SearchButton_input")
+        found = self.probe.search(driver, search_btn.click, (By.ID, RESULTS_TABLE_ID), empty=[NO_RECORDS], timeout=15)
+
+        if found is False:
+            print(f"No results for '{name}'")
+        elif found is None:
+            raise TimeoutException(f"No results grid for '{name}' within 15s")
+        else:
+            # Errors while paging propagate: a partial read must neither advance the watermark nor finish the unit
+            results_table = driver.find_element(By.ID, RESULTS_TABLE_ID)
+            skipped = 0
+            # Overlap rows emitted on an earlier run are skipped; late postings in the overlap are new numbers
+            for row_data, new in overlap_rows(mark, iter_grid_rows(driver, results_table), seen):
+                if new:
+                    yield row_data
+                else:
+                    skipped += 1
+            if skipped:
+                print(f"Skipped {skipped} already-seen filings for '{name}'")
+
+        with self.watermark_lock:
+            self.pending_watermarks[name] = next_watermark(mark, seen)
+
+
+if __name__ == "__main__":
+    main(AZScraper)
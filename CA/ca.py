@@ -1,22 +1,19 @@
-import time
-import csv
+import os
+import sys
+import threading
 import re
 from datetime import datetime, timedelta
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 
-# Read secured party names
-with open('secured_party_names.txt', 'r', encoding='utf-8') as f:
-    party_names = [line.strip() for line in f if line.strip()]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-output_file = 'ucc_results.csv'
-header = ['Party Name']
-rows_data = []
-sidebar_fields_set = set()
+from ucc.browser import TracedWait
+from ucc.scraper import StateScraper, main, register
+from ucc.trace import pause, span, traced
 
+@traced("parse")
 def parse_address(address: str) -> dict:
     """Parse a full address string into components."""
     if not address or address.strip() == '':
@@ -153,59 +150,87 @@ def parse_city_state_zip(text: str) -> dict:
         'zip_code': ''
     }
 
-chrome_options = Options()
-# chrome_options.add_argument('--headless')
-chrome_options.add_argument('--no-sandbox')
-chrome_options.add_argument('--disable-dev-shm-usage')
-driver = webdriver.Chrome(options=chrome_options)
+RESULTS_TABLE_XPATH = '//*[@id="root"]/div/div[1]/div/main/div[3]/table'
 
-url = 'https://bizfileonline.sos.ca.gov/search/ucc'
+# Address parsing columns, inserted after the original address columns
+ADDRESS_COLUMNS = {
+    'Debtor Address': ['Debtor Street', 'Debtor City', 'Debtor State', 'Debtor Zip'],
+    'Secured Party Address': ['Secured Party Street', 'Secured Party City', 'Secured Party State', 'Secured Party Zip'],
+}
 
-for name in party_names:
-    driver.get(url)
-    wait = WebDriverWait(driver, 20)
 
-    search_input = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div/div[3]/div[1]/form/input')))
-    search_input.clear()
-    search_input.send_keys(name)
+@register
+class CAScraper(StateScraper):
+    state = "CA"
+    url = 'https://bizfileonline.sos.ca.gov/search/ucc'
+    output_file = 'ucc_results.csv'
 
-    adv_btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div/div[3]/div[2]/button')))
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", adv_btn)
-    time.sleep(0.5)
-    adv_btn.click()
-    time.sleep(0.5)
+    def start(self):
+        super().start()
+        self.main_headers = []
+        self.lock = threading.Lock()
 
-    status_select = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="field-STATUS"]')))
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", status_select)
-    time.sleep(0.5)
-    status_select.click()
-    status_option = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="field-STATUS"]/option[2]')))
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", status_option)
-    time.sleep(0.5)
-    status_option.click()
+    def output_columns(self, keys):
+        # Main table columns first, then the sidebar fields sorted, as the portal shows them
+        header = ['Party Name'] + self.main_headers
+        derived = {col for cols in ADDRESS_COLUMNS.values() for col in cols}
+        all_headers = header + sorted(set(keys) - set(header) - derived)
+        final_headers = []
+        for header_name in all_headers:
+            final_headers.append(header_name)
+            final_headers.extend(ADDRESS_COLUMNS.get(header_name, []))
+        return final_headers
 
-    start_date_input = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="field-date-FILING_DATEs"]')))
-    seven_days_ago = (datetime.now() - timedelta(days=7)).strftime('%m/%d/%Y')
-    start_date_input.clear()
-    start_date_input.send_keys(seven_days_ago)
+    def scrape_name(self, driver, name):
+        driver.get(self.url)
+        wait = TracedWait(driver, 20)
 
-    time.sleep(3)
+        search_input = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div/div[3]/div[1]/form/input')))
+        search_input.clear()
+        search_input.send_keys(name)
 
-    search_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, 'advanced-search-button')))
-    driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", search_btn)
-    time.sleep(0.5)
-    search_btn.click()
+        adv_btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div/div[3]/div[2]/button')))
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", adv_btn)
+        pause(0.5)
+        adv_btn.click()
+        pause(0.5)
 
-    try:
-        table = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div[3]/table'))
-        )
-        time.sleep(1)
+        status_select = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="field-STATUS"]')))
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", status_select)
+        pause(0.5)
+        status_select.click()
+        status_option = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="field-STATUS"]/option[2]')))
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", status_option)
+        pause(0.5)
+        status_option.click()
+
+        start_date_input = wait.until(EC.presence_of_element_located((By.XPATH, '//*[@id="field-date-FILING_DATEs"]')))
+        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime('%m/%d/%Y')
+        start_date_input.clear()
+        start_date_input.send_keys(seven_days_ago)
+
+        pause(3)
+
+        search_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, 'advanced-search-button')))
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", search_btn)
+        pause(0.5)
+
+        found = self.probe.search(driver, search_btn.click, (By.XPATH, RESULTS_TABLE_XPATH), timeout=10)
+        if found is False:
+            print(f"No results for {name}")
+            return
+        if found is None:
+            raise TimeoutException(f"No results table for {name} within 10s")
+        # Errors reading the table propagate: a partly read name must stay unfinished for --resume
+        table = driver.find_element(By.XPATH, RESULTS_TABLE_XPATH)
+        pause(1)
         table_rows = table.find_elements(By.TAG_NAME, 'tr')
         # Get main table headers
         main_headers = [th.text for th in table_rows[0].find_elements(By.TAG_NAME, 'th')]
-        if len(header) == 1:
-            header.extend(main_headers)
+        with self.lock:
+            for h in main_headers:
+                if h not in self.main_headers:
+                    self.main_headers.append(h)
         # For each data row
         for row_idx, row in enumerate(table_rows[1:], start=1):
             cols = [col.text for col in row.find_elements(By.TAG_NAME, 'td')]
@@ -217,24 +242,25 @@ for name in party_names:
                 btn = wait.until(EC.element_to_be_clickable((By.XPATH, btn_xpath)))
                 # Scroll to make the button visible with some padding
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", btn)
-                time.sleep(0.5)  # Small delay to ensure scrolling is complete
+                pause(0.5)  # Small delay to ensure scrolling is complete
                 btn.click()
-                time.sleep(2)
+                pause(2)
                 # Wait for sidebar table
-                sidebar_table = WebDriverWait(driver, 10).until(
+                sidebar_table = TracedWait(driver, 10).until(
                     EC.presence_of_element_located((By.XPATH, '//*[@id="root"]/div/div[1]/div/main/div[5]/div/div[2]/div/div/table'))
                 )
-                sidebar_rows = sidebar_table.find_elements(By.TAG_NAME, 'tr')
-                sidebar_data = {}
-                for srow in sidebar_rows:
-                    scells = srow.find_elements(By.TAG_NAME, 'td')
-                    if len(scells) == 2:
-                        key = scells[0].text.strip()
-                        val = scells[1].text.strip()
-                        sidebar_data[key] = val
-                        sidebar_fields_set.add(key)
+                with span("extract", filing=row_idx):
+                    sidebar_rows = sidebar_table.find_elements(By.TAG_NAME, 'tr')
+                    sidebar_data = {}
+                    for srow in sidebar_rows:
+                        scells = srow.find_elements(By.TAG_NAME, 'td')
+                        if len(scells) == 2:
+                            key = scells[0].text.strip()
+                            val = scells[1].text.strip()
+                            sidebar_data[key] = val
                 # Close sidebar if needed (optional: add code if sidebar must be closed)
-            except Exception as e:
+            except TimeoutException as e:
+                # The row is still worth keeping without its sidebar details
                 print(f"Sidebar not found for row {row_idx}: {e}")
                 sidebar_data = {}
             # Merge row data
@@ -242,7 +268,7 @@ for name in party_names:
             for h, v in zip(main_headers, cols):
                 row_dict[h] = v
             row_dict.update(sidebar_data)
-            
+
             # Parse addresses if they exist
             if 'Debtor Address' in row_dict:
                 debtor_parsed = parse_address(row_dict['Debtor Address'])
@@ -250,44 +276,16 @@ for name in party_names:
                 row_dict['Debtor City'] = debtor_parsed['city']
                 row_dict['Debtor State'] = debtor_parsed['state']
                 row_dict['Debtor Zip'] = debtor_parsed['zip_code']
-            
+
             if 'Secured Party Address' in row_dict:
                 secured_parsed = parse_address(row_dict['Secured Party Address'])
                 row_dict['Secured Party Street'] = secured_parsed['street']
                 row_dict['Secured Party City'] = secured_parsed['city']
                 row_dict['Secured Party State'] = secured_parsed['state']
                 row_dict['Secured Party Zip'] = secured_parsed['zip_code']
-            
-            rows_data.append(row_dict)
-        
-    except Exception as e:
-        print(f"No table found for {name}: {e}")
-    time.sleep(10)
-
-driver.quit()
-
-# Write all data to CSV with dynamic headers
-all_headers = header + sorted(sidebar_fields_set - set(header))
-
-# Add address parsing columns to headers
-address_columns = [
-    'Debtor Street', 'Debtor City', 'Debtor State', 'Debtor Zip',
-    'Secured Party Street', 'Secured Party City', 'Secured Party State', 'Secured Party Zip'
-]
 
-# Insert address columns after the original address columns
-final_headers = []
-for header_name in all_headers:
-    final_headers.append(header_name)
-    if header_name == 'Debtor Address':
-        final_headers.extend(['Debtor Street', 'Debtor City', 'Debtor State', 'Debtor Zip'])
-    elif header_name == 'Secured Party Address':
-        final_headers.extend(['Secured Party Street', 'Secured Party City', 'Secured Party State', 'Secured Party Zip'])
+            yield row_dict
 
-with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-    writer = csv.DictWriter(csvfile, fieldnames=final_headers)
-    writer.writeheader()
-    for row in rows_data:
-        writer.writerow(row)
 
-print(f"Done. Results saved to {output_file}")
+if __name__ == "__main__":
+    main(CAScraper)
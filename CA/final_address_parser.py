@@ -1,5 +1,11 @@
 import csv
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.records import UCCFiling
 
 def final_parse_address(address: str) -> dict:
     """Final robust address parser that handles all edge cases."""
@@ -174,6 +180,8 @@ def process_csv_final(input_file: str, output_file: str):
     """Process the CSV file with the final address parser."""
     
     rows = []
+    # Secured parties shared by the rows (see ucc.records)
+    parties = {}
     with open(input_file, 'r', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         
@@ -204,13 +212,13 @@ def process_csv_final(input_file: str, output_file: str):
                 new_row['Secured Party State'] = secured_parsed['state']
                 new_row['Secured Party Zip'] = secured_parsed['zip_code']
             
-            rows.append(new_row)
+            rows.append(UCCFiling.from_row('CA', [new_row.get(h, '') for h in new_headers], new_headers, parties))
     
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=new_headers)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+        writer = csv.writer(csvfile)
+        writer.writerow(new_headers)
+        for filing in rows:
+            writer.writerow(filing.to_row())
     
     print(f"Processed {len(rows)} rows with final parser")
     print(f"Original file: {input_file}")
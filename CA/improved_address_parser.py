@@ -1,5 +1,11 @@
 import csv
+import os
 import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.records import UCCFiling
 
 def improved_parse_address(address: str) -> dict:
     """Improved address parser that handles more complex formats."""
@@ -156,6 +162,8 @@ def process_csv(input_file: str, output_file: str):
     """Process the CSV file and add parsed address columns."""
     
     rows = []
+    # Secured parties shared by the rows (see ucc.records)
+    parties = {}
     with open(input_file, 'r', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
         
@@ -186,13 +194,13 @@ def process_csv(input_file: str, output_file: str):
                 new_row['Secured Party State'] = secured_parsed['state']
                 new_row['Secured Party Zip'] = secured_parsed['zip_code']
             
-            rows.append(new_row)
+            rows.append(UCCFiling.from_row('CA', [new_row.get(h, '') for h in new_headers], new_headers, parties))
     
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=new_headers)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+        writer = csv.writer(csvfile)
+        writer.writerow(new_headers)
+        for filing in rows:
+            writer.writerow(filing.to_row())
     
     print(f"Processed {len(rows)} rows")
     print(f"Original file: {input_file}")
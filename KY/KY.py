@@ -1,62 +1,161 @@
-import csv
+import os
+import re
+import sys
+import threading
 import time
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc.browser import TracedWait
+from ucc.scraper import FilingRows, StateScraper, main, register
+from ucc.trace import pause, span
+
 # --- Config ---
-input_file = "secured_party_names.txt"
-output_file = "links.txt"
-url = "https://web.sos.ky.gov/ftucc/(S(ay1wb2mthqchiqgedu15z3xa))/search.aspx"
+# The portal puts its ASP.NET session in the path: /ftucc/(S(<id>))/search.aspx
+url = "https://web.sos.ky.gov/ftucc/search.aspx"
+SESSION_PATH = re.compile(r"/ftucc/\(S\([a-z0-9]+\)\)/", re.IGNORECASE)
+links_file = "links.txt"
+RESULT_LINKS = (By.XPATH, '//a[contains(@href, "search.aspx?filing=")]')
+
+HEADER = [
+    "Secured Party Name",
+    "File Number", "File Date", "Lapse Date", "Status", "Action",
+    "Debtor", "Debtor Address", "Debtor City",
+    "Secured Party", "Secured Party Address", "Secured Party City",
+    "Filer", "Filer Address", "Filer City", "Document Type", "Processed"
+]
+
+
+def search_url(driver):
+    """The search page in the browser's current portal session; the bare URL starts a new one."""
+    match = SESSION_PATH.search(driver.current_url or "")
+    return f"https://web.sos.ky.gov{match.group()}search.aspx" if match else url
+
+
+def search_links(driver, session, probe, name):
+    """Search one secured party and return the filing detail links.
+
+    ``session`` and ``probe`` are the scraper's ucc.session.PortalSession and ucc.probe.ResultProbe.
+    """
+    wait = TracedWait(driver, 15)
+    session.open(driver, search_url(driver))
+
+    # Input secured party name; an expired session lands elsewhere, so start a new one
+    try:
+        name_input = wait.until(EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_SearchForm1_tOrgname")))
+    except TimeoutException:
+        session.open(driver, url)
+        name_input = wait.until(EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_SearchForm1_tOrgname")))
+    name_input.clear()
+    pause(0.5)
+    name_input.send_keys(name)
+    pause(1.5)
 
-# --- Read names ---
-with open(input_file, "r", encoding="utf-8") as f:
-    secured_party_names = [line.strip() for line in f if line.strip()]
+    # Click Search; done as soon as links or "no records" show
+    search_btn = driver.find_element(By.ID, "ctl00_ContentPlaceHolder1_SearchForm1_bSearch")
+    found = probe.search(driver, search_btn.click, RESULT_LINKS, pause=15)
+    if found is False:
+        return []
+    if found is None:
+        raise TimeoutException(f"No results or empty-result marker for '{name}' within 15s")
 
-# --- Open output file ---
-with open(output_file, "w", encoding='utf-8', newline='') as f_out:
+    # Extract result links
+    links = driver.find_elements(*RESULT_LINKS)
+    return [href for href in (link.get_attribute("href") for link in links) if href]
 
-    for name in secured_party_names:
-        chrome_options = Options()
-        # chrome_options.add_argument('--headless')  # Optional for silent run
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
 
-        driver = webdriver.Chrome(options=chrome_options)
-        wait = WebDriverWait(driver, 15)
+def extract_filing(driver, link, secured_party_name):
+    """Open one filing detail page and return its KY_UCC1.csv row."""
+    driver.get(link)
+    pause(3)
 
+    def get_text(xpath):
         try:
-            driver.get(url)
-            time.sleep(5)  # Cloudflare challenge
+            return driver.find_element(By.XPATH, xpath).text.strip()
+        except:
+            return ""
+
+    # Extract data
+    file_number = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_Filenumber"]')
+    file_date = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_Filedate"]')
+    lapse_date = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_Lapsedate"]')
+    status = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_status"]')
+    action = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_actionstable"]/tbody/tr[2]/td[1]')
+    document_type = get_text('//*[@id="ctl00_ContentPlaceHolder1_showentity1_imagestable"]/tbody/tr[2]/td[1]')
+
+    # For text nodes, we extract them from parent td manually
+    def extract_td_texts(row, td, index):
+        try:
+            td_element = driver.find_element(By.XPATH, f'//*[@id="ctl00_ContentPlaceHolder1_showentity1_namestable"]/tbody/tr[{row}]/td[{td}]')
+            lines = td_element.text.split("\n")
+            return lines[index].strip() if index < len(lines) else ""
+        except:
+            return ""
+
+    debtor = extract_td_texts(2, 1, 1)
+    debtor_address = extract_td_texts(2, 3, 0)
+    debtor_city = extract_td_texts(2, 3, 1)
+
+    secured_party = extract_td_texts(3, 1, 1)
+    secured_party_address = extract_td_texts(3, 3, 0)
+    secured_party_city = extract_td_texts(3, 3, 1)
+
+    filer = extract_td_texts(4, 1, 1)
+    filer_address = extract_td_texts(4, 3, 0)
+    filer_city = extract_td_texts(4, 3, 1)
+
+    processed = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    return [
+        secured_party_name,
+        file_number, file_date, lapse_date, status, action,
+        debtor, debtor_address, debtor_city,
+        secured_party, secured_party_address, secured_party_city,
+        filer, filer_address, filer_city, document_type, processed
+    ]
 
-            # Input secured party name
-            name_input = wait.until(EC.element_to_be_clickable((By.ID, "ctl00_ContentPlaceHolder1_SearchForm1_tOrgname")))
-            name_input.clear()
-            time.sleep(0.5)
-            name_input.send_keys(name)
-            time.sleep(1.5)
 
-            # Click Search
-            search_btn = driver.find_element(By.ID, "ctl00_ContentPlaceHolder1_SearchForm1_bSearch")
-            search_btn.click()
-            time.sleep(15)
+@register
+class KYScraper(StateScraper):
+    """Search (formerly KY.py -> links.txt) and detail extraction (KY1.py) in one pass per name."""
 
+    state = "KY"
+    url = url
+    output_file = "KY_UCC1.csv"
+    header = HEADER
 
-            # Extract result links
-            links = driver.find_elements(By.XPATH, '//a[contains(@href, "search.aspx?filing=")]')
+    def start(self):
+        super().start()
+        # Keep the name,link list so KY1.py can re-extract details without searching again;
+        # a resumed run adds to the links of the interrupted one
+        mode = "a" if self.journal.previous.window else "w"
+        self.links_out = open(self.path(links_file), mode, encoding="utf-8", newline="")
+        self.links_lock = threading.Lock()
 
-            for link in links:
-                href = link.get_attribute("href")
-                if href:
-                    f_out.write(f"{name},{href}\n")
+    def finish(self):
+        self.links_out.close()
+        super().finish()
 
-        except Exception as e:
-            print(f"⚠️ Error during processing '{name}': {e}")
+    def scrape_name(self, driver, name):
+        links = search_links(driver, self.session, self.probe, name)
+        with self.links_lock:
+            self.links_out.writelines(f"{name},{link}\n" for link in links)
+            self.links_out.flush()
+        for link in links:
+            if self.filing_done(name, link):
+                continue
+            try:
+                with span("extract", filing=link):
+                    row = extract_filing(driver, link, name)
+            except Exception as e:
+                # Filings already yielded are journaled; the unit stays unfinished so --resume picks up the rest
+                print(f"⚠️ Error processing {link}: {e}")
+                raise
+            yield FilingRows(link, [row])
 
-        finally:
-            driver.quit()
-            time.sleep(2)
 
-print(f"\n✅ All done. Links saved to {output_file}")
+if __name__ == "__main__":
+    main(KYScraper)
@@ -1,14 +1,36 @@
 import csv
+import json
+import os
 import requests
-import time
+import sys
 import urllib.parse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ucc import cache
+from ucc.browser import driver_service, remember_driver_path
+from ucc.ratelimit import LimitedDriver, limited_request
+from ucc.replay import http_adapter
+from ucc.trace import pause, traced
+
+NAICS_URL = "https://www.naics.com/company-lookup-tool/"
+
+_session = None
+
+
+def http_session():
+    """One session for every geocoding call; it goes through the response cache when that is on."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.mount('https://', http_adapter())
+    return _session
+
+@traced("lookup", source="zip", state="WV")
 def get_zip_code(address):
     """
     Get ZIP code for an address using a free geocoding service.
@@ -27,7 +49,9 @@ def get_zip_code(address):
             'format': 'json'
         }
         
-        response = requests.get(api_url, params=params)
+        with limited_request(api_url, params) as ticket:
+            response = http_session().get(api_url, params=params)
+            ticket.check_response(response)
         zip_code = None
         if response.status_code == 200:
             data = response.json()
@@ -49,9 +73,11 @@ def get_zip_code(address):
             'limit': 1,
             'addressdetails': 1
         }
-        response = requests.get(nominatim_url, params=params, headers={
-            'User-Agent': 'UCC_Address_Lookup/1.0'
-        })
+        with limited_request(nominatim_url, params) as ticket:
+            response = http_session().get(nominatim_url, params=params, headers={
+                'User-Agent': 'UCC_Address_Lookup/1.0'
+            })
+            ticket.check_response(response)
         if response.status_code == 200:
             data = response.json()
             if data:
@@ -111,9 +137,12 @@ def setup_driver():
     options = Options()
     # options.add_argument('--headless')  # Run in background
     options.add_argument('--disable-gpu')
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+    # chromedriver as resolved by the first start, instead of asking webdriver-manager (online) every time
+    driver = webdriver.Chrome(service=driver_service(), options=options)
+    remember_driver_path(driver)
+    return LimitedDriver(driver)
 
+@traced("lookup", source="naics", state="WV")
 def lookup_address_naics(driver, name, entity_type):
     """
     Look up address for a given name using NAICS Company Lookup Tool.
@@ -127,8 +156,8 @@ def lookup_address_naics(driver, name, entity_type):
         print(f"Looking up address for {entity_type}: {search_name}")
         
         # Navigate to NAICS lookup tool
-        driver.get("https://www.naics.com/company-lookup-tool/")
-        time.sleep(2)
+        driver.get(NAICS_URL)
+        pause(2)
         
         # Find and fill the company name field
         try:
@@ -136,23 +165,23 @@ def lookup_address_naics(driver, name, entity_type):
             # Click the tab
             tab_element = driver.find_element(By.XPATH, '//*[@id="tablabel2"]')
             tab_element.click()
-            time.sleep(1)
+            pause(1)
             
             # Type company name
             company_field = driver.find_element(By.XPATH, '//*[@id="company2"]')
             company_field.clear()
             company_field.send_keys(search_name)
-            time.sleep(1)
+            pause(1)
             
             # Select WV option from state dropdown
             wv_option_element = driver.find_element(By.XPATH, '//*[@id="qstate"]/option[49]')
             wv_option_element.click()
-            time.sleep(1)
+            pause(1)
             
             # Click search button
             search_button_element = driver.find_element(By.XPATH, '//*[@id="nameAddressLU"]/div[3]/p/input[2]')
             search_button_element.click()
-            time.sleep(3)
+            pause(3)
             
             # Find street, city, state from results
             try:
@@ -233,6 +262,31 @@ def lookup_address_naics(driver, name, entity_type):
         print(f"Error looking up address for {name}: {e}")
         return "", "", "", ""
 
+def lookup_address(name, entity_type):
+    """lookup_address_naics in a new browser; with the response cache on, a name found before skips the browser."""
+    response_cache = cache.active()
+    # Selenium pages cannot be intercepted: the result itself is cached, keyed by the search it stands for
+    key_url = f"{NAICS_URL}?{urllib.parse.urlencode({'company': name.strip(), 'state': 'WV'})}"
+    if response_cache is not None:
+        cached = response_cache.get("GET", key_url)
+        if cached is not None:
+            return tuple(json.loads(cached[2]))
+    result = "", "", "", ""
+    driver = None
+    try:
+        driver = setup_driver()
+        result = lookup_address_naics(driver, name, entity_type)
+    except Exception as e:
+        print(f"Error looking up {entity_type} address: {e}")
+    finally:
+        if driver is not None:
+            driver.quit()
+    if response_cache is not None and any(result):
+        response_cache.put("GET", key_url, None, 200, {"Content-Type": "application/json"},
+                           json.dumps(result).encode("utf-8"))
+    return result
+
+
 def process_ucc_csv(input_csv, output_csv):
     """
     Read the UCC CSV, look up addresses using NAICS, and create a new CSV with address columns.
@@ -263,25 +317,11 @@ def process_ucc_csv(input_csv, output_csv):
             
             # Look up debtor address with new browser
             print(f"Looking up debtor address for: {debtor}")
-            debtor_address, debtor_city, debtor_state, debtor_zip = "", "", "", ""
-            try:
-                driver = setup_driver()
-                debtor_address, debtor_city, debtor_state, debtor_zip = lookup_address_naics(driver, debtor, "debtor")
-            except Exception as e:
-                print(f"Error looking up debtor address: {e}")
-            finally:
-                driver.quit()
+            debtor_address, debtor_city, debtor_state, debtor_zip = lookup_address(debtor, "debtor")
             
             # Look up secured party address with new browser
             print(f"Looking up secured party address for: {secured_party}")
-            secured_party_address, secured_party_city, secured_party_state, secured_party_zip = "", "", "", ""
-            try:
-                driver = setup_driver()
-                secured_party_address, secured_party_city, secured_party_state, secured_party_zip = lookup_address_naics(driver, secured_party, "secured_party")
-            except Exception as e:
-                print(f"Error looking up secured party address: {e}")
-            finally:
-                driver.quit()
+            secured_party_address, secured_party_city, secured_party_state, secured_party_zip = lookup_address(secured_party, "secured_party")
             
             # Parse address components
             debtor_addr, debtor_city, debtor_state, debtor_zip = parse_address_components(debtor_address)
@@ -291,9 +331,6 @@ def process_ucc_csv(input_csv, output_csv):
             new_row = row + [debtor_addr, debtor_city, debtor_state, debtor_zip,
                            secured_party_addr, secured_party_city, secured_party_state, secured_party_zip]
             rows.append(new_row)
-            
-            # Add delay between processing
-            time.sleep(1)
     
     # Write the new CSV with addresses
     with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from AZ.AZ import already_emitted, begin_date_for, next_watermark, overlap_rows
+
+
+def grid_row(number, filing_date, debtor="ACME INC"):
+    return ["FIRST BANK", number, "UCC1", filing_date, debtor, "Active"]
+
+
+def test_overlap_rows_skips_only_numbers_the_mark_emitted():
+    mark = {"filing_date": "06/05/2025", "seen": {"100": "06/05/2025"}}
+    rows = [grid_row("100", "06/05/2025"), grid_row("101", "06/04/2025"), grid_row("102", "06/06/2025")]
+    seen = {}
+    assert [(row[1], new) for row, new in overlap_rows(mark, rows, seen)] == [
+        ("100", False), ("101", True), ("102", True)]
+    assert seen == {"100": "06/05/2025", "101": "06/04/2025", "102": "06/06/2025"}
+
+
+def test_overlap_rows_keeps_every_row_of_a_filing_listed_once_per_debtor():
+    rows = [grid_row("200", "06/06/2025", "ACME INC"), grid_row("200", "06/06/2025", "ACME HOLDINGS")]
+    assert [new for _, new in overlap_rows(None, rows, {})] == [True, True]
+
+
+def test_overlap_rows_passes_undated_rows_and_drops_short_ones():
+    rows = [grid_row("300", "pending"), ["FIRST BANK", "301"]]
+    seen = {}
+    assert [(row[1], new) for row, new in overlap_rows(None, rows, seen)] == [("300", True)]
+    assert seen == {}
+
+
+def test_already_emitted_falls_back_to_the_key_for_old_watermarks():
+    legacy = {"filing_date": "06/05/2025", "filing_number": "100"}
+    assert already_emitted(legacy, {}, datetime(2025, 6, 5), "099")
+    assert not already_emitted(legacy, {}, datetime(2025, 6, 5), "101")
+    assert not already_emitted(None, {}, datetime(2025, 6, 5), "099")
+
+
+def test_next_watermark_keeps_only_the_overlap_window():
+    mark = {"filing_date": "06/05/2025", "seen": {"100": "06/05/2025", "090": "06/01/2025"}}
+    assert next_watermark(mark, {"110": "06/08/2025", "105": "06/06/2025"}) == {
+        "filing_date": "06/08/2025",
+        "seen": {"105": "06/06/2025", "110": "06/08/2025"},
+    }
+
+
+def test_next_watermark_merges_the_marks_numbers_and_never_moves_back():
+    mark = {"filing_date": "06/05/2025", "seen": {"100": "06/05/2025"}}
+    assert next_watermark(mark, {"099": "06/04/2025"}) == {
+        "filing_date": "06/05/2025",
+        "seen": {"099": "06/04/2025", "100": "06/05/2025"},
+    }
+    assert next_watermark(mark, {}) is mark
+
+
+def test_begin_date_reaches_back_by_the_overlap():
+    assert begin_date_for({"filing_date": "06/05/2025"}) == datetime(2025, 6, 3)
@@ -0,0 +1,86 @@
+import csv
+import sys
+
+from AL import combine_al_csvs as combine
+
+EXPORT = """----Filing Type----
+Business,01/02/2024,x,01/02/2029,y,B123
+Debtor(s)
+ACME INC
+1 MAIN ST, MOBILE, AL 36601
+Secured Party
+FIRST BANK
+2 OAK ST, BIRMINGHAM, AL 35203
+----Filing Type----
+Finance Statement,02/02/2024,x,02/02/2029,y,B124
+Debtor(s)
+FOO LLC
+3 PINE RD
+MONTGOMERY, AL 36104
+BAR LLC
+5 ASH AVE, DOTHAN, AL 36301
+Secured Party
+SECOND BANK
+4 ELM ST, HUNTSVILLE, AL 35801
+"""
+
+
+def run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["combine_al_csvs.py", *args])
+    combine.main()
+    with open(combine.OUTPUT_FILE, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_blocks_become_one_row_per_debtor_and_secured_party(tmp_path):
+    path = tmp_path / "al_1.csv"
+    path.write_text(EXPORT, encoding="utf-8")
+    rows = [dict(zip(combine.OUTPUT_COLUMNS, row)) for row in combine.parse_file(str(path))]
+    assert [(r["filing_number"], r["debtor_name"]) for r in rows] == [
+        ("B123", "ACME INC"), ("B124", "FOO LLC"), ("B124", "BAR LLC")]
+    assert rows[1]["Debtor_Street"] == "3 PINE RD"
+    assert rows[1]["Debtor_City"] == "MONTGOMERY"
+    assert rows[0]["secured_party_zip"] == "35203"
+    assert rows[0]["lapse_date"] == "01/02/2029"
+
+
+def test_parse_address():
+    assert combine.parse_address("1 MAIN ST, MOBILE, AL 36601-1234") == ("1 MAIN ST", "MOBILE", "AL", "36601")
+    assert combine.parse_address("MOBILE, AL 36601") == ("", "MOBILE", "AL", "36601")
+    assert combine.parse_address("PO BOX 7") == ("PO BOX 7", "", "", "")
+
+
+def test_reruns_only_combine_new_files_and_skip_duplicate_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "al_1.csv").write_text(EXPORT, encoding="utf-8")
+    assert len(run(monkeypatch)) == 3
+    assert len(combine.load_manifest()) == 1
+
+    # Nothing new: the output is left as it is
+    assert len(run(monkeypatch)) == 3
+
+    # A second export repeating one filing adds only the rows not seen before
+    second = EXPORT.replace("B123", "B125")
+    (tmp_path / "al_2.csv").write_text(second, encoding="utf-8")
+    rows = run(monkeypatch)
+    assert [r["filing_number"] for r in rows] == ["B123", "B124", "B124", "B125"]
+    assert sorted(combine.load_manifest()) == ["al_1.csv", "al_2.csv"]
+
+
+def test_a_changed_file_is_combined_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "al_1.csv"
+    path.write_text(EXPORT, encoding="utf-8")
+    run(monkeypatch)
+    path.write_text(EXPORT.replace("B124", "B126"), encoding="utf-8")
+    assert [r["filing_number"] for r in run(monkeypatch)] == ["B123", "B124", "B124", "B126", "B126"]
+
+
+def test_rebuild_starts_the_output_over(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "al_1.csv"
+    path.write_text(EXPORT, encoding="utf-8")
+    run(monkeypatch)
+    path.write_text(EXPORT.replace("B124", "B126"), encoding="utf-8")
+    run(monkeypatch)
+    assert [r["filing_number"] for r in run(monkeypatch, "--rebuild")] == ["B123", "B126", "B126"]
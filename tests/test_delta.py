@@ -0,0 +1,63 @@
+import json
+
+from ucc.delta import Delta
+from ucc.records import UCCFiling
+
+HEADER = ["Filing Number", "Filing Date", "Status", "Debtor Name", "Secured Party", "Party Name", "Processed"]
+
+
+def filing(number, status="Active", debtor="ACME INC", processed="06/01/2025"):
+    return UCCFiling.from_row("KY", [number, "01/02/2025", status, debtor, "FIRST BANK", "FIRST BANK", processed],
+                              HEADER)
+
+
+def run(delta, tmp_path, filings, **options):
+    for f in filings:
+        delta.add(f)
+    counts = delta.finish("KY", str(tmp_path), **options)
+    feed = sorted(tmp_path.glob("KY_changes_*.jsonl"))[-1]
+    with open(feed, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    feed.unlink()
+    return counts, records
+
+
+def test_new_changed_and_gone(tmp_path):
+    delta = Delta(str(tmp_path / ".delta"))
+    counts, _ = run(delta, tmp_path, [filing("1"), filing("2"), filing("3")])
+    assert counts == {"new": 3, "changed": 0, "gone": 0}
+
+    counts, records = run(delta, tmp_path, [filing("1", processed="06/02/2025"), filing("2", status="Lapsed"),
+                                            filing("4")])
+    assert counts == {"new": 1, "changed": 1, "gone": 1}
+    by_change = {r["change"]: r for r in records}
+    assert by_change["new"]["filing_number"] == "4"
+    assert by_change["changed"]["filing_number"] == "2"
+    assert by_change["changed"]["fields"] == {"status": ["Active", "Lapsed"]}
+    assert by_change["gone"]["filing_number"] == "3"
+
+
+def test_a_filing_is_hashed_over_all_its_rows(tmp_path):
+    delta = Delta(str(tmp_path / ".delta"))
+    run(delta, tmp_path, [filing("1", debtor="ACME INC")])
+    counts, records = run(delta, tmp_path, [filing("1", debtor="ACME INC"), filing("1", debtor="ACME HOLDINGS")])
+    assert counts == {"new": 0, "changed": 1, "gone": 0}
+    assert records[0]["fields"] == {}
+
+
+def test_an_incomplete_run_reports_nothing_gone_and_keeps_the_index(tmp_path):
+    delta = Delta(str(tmp_path / ".delta"))
+    run(delta, tmp_path, [filing("1"), filing("2")])
+    counts, _ = run(delta, tmp_path, [filing("1")], complete=False)
+    assert counts["gone"] == 0
+    counts, _ = run(delta, tmp_path, [filing("1"), filing("2")])
+    assert counts == {"new": 0, "changed": 0, "gone": 0}
+
+
+def test_an_incremental_run_merges_into_the_index(tmp_path):
+    delta = Delta(str(tmp_path / ".delta"))
+    run(delta, tmp_path, [filing("1"), filing("2")], incremental=True)
+    counts, _ = run(delta, tmp_path, [filing("3")], incremental=True)
+    assert counts == {"new": 1, "changed": 0, "gone": 0}
+    with open(delta.index_path("KY"), encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["1", "2", "3"]
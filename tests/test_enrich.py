@@ -0,0 +1,28 @@
+from ucc.enrich import AhoCorasick, OfficialEntry, OfficialIndex, normalize_name
+
+
+def test_normalize_name_drops_punctuation_and_corporate_suffixes():
+    assert normalize_name("Citibank, N.A.") == "CITIBANK"
+    assert normalize_name("The Huntington National Bank") == "HUNTINGTON NATIONAL BANK"
+    assert normalize_name("Smith & Sons, LLC") == "SMITH AND SONS"
+    assert normalize_name(None) == ""
+    # A name made only of suffixes is kept rather than emptied
+    assert normalize_name("Company Inc") == "COMPANY INC"
+
+
+def test_aho_corasick_matches_whole_tokens_only():
+    matcher = AhoCorasick(["BANK", "BANK OF AMERICA", "AMERICA"])
+    assert sorted(matcher.iter_matches("FIRST BANK OF AMERICA")) == [0, 1, 2]
+    assert list(matcher.iter_matches("BANKS OF AMERICAN")) == []
+
+
+def test_official_index_prefers_exact_then_longest_contained_entity():
+    index = OfficialIndex([
+        OfficialEntry("Bank of America, N.A.", "", "", ""),
+        OfficialEntry("Bank of America", "Registered agent", "CT Corp", "Dallas"),
+        OfficialEntry("America", "x", "y", "z"),
+    ])
+    assert len(index) == 2
+    assert index.lookup("BANK OF AMERICA NA").official_name == "CT Corp"
+    assert index.lookup("Leasing arm of Bank of America").entity_name == "Bank of America"
+    assert index.lookup("Wells Fargo") is None
@@ -0,0 +1,63 @@
+from ucc.journal import Journal, JournalState
+
+
+def test_resume_replays_finished_units_and_filings(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(str(path))
+    journal.start("AL|w|A")
+    journal.row("AL|w|A", ["a1"])
+    journal.done("AL|w|A")
+    journal.start("AL|w|B")
+    journal.filing("AL|w|B", "f1", [["b1"], ["b2"]])
+    journal.row("AL|w|B", ["b-loose"])
+    journal.close()
+
+    state = JournalState.load(str(path))
+    assert state.done_units == {"AL|w|A"}
+    assert state.replay_rows("AL|w|A") == [["a1"]]
+    # An unfinished unit only carries over its finished filings
+    assert state.replay_rows("AL|w|B") == [["b1"], ["b2"]]
+    assert state.filing_done("AL|w|B", "f1")
+    assert not state.filing_done("AL|w|B", "f2")
+
+
+def test_a_new_attempt_drops_the_rows_of_earlier_ones(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path)
+    journal.start("KY|w|A")
+    journal.row("KY|w|A", [1])
+    journal.row("KY|w|A", [2])
+    journal.close()
+
+    journal = Journal(path, resume=True)
+    journal.start("KY|w|A")
+    for row in ([1], [2], [3]):
+        journal.row("KY|w|A", row)
+    journal.done("KY|w|A")
+    journal.close()
+
+    assert JournalState.load(path).replay_rows("KY|w|A") == [[1], [2], [3]]
+
+
+def test_resume_keeps_the_window_and_ignores_a_torn_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    first = Journal(str(path))
+    window = first.window
+    first.done("MA|w|A")
+    first.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t":"done","u":"MA|w')
+
+    resumed = Journal(str(path), resume=True)
+    resumed.close()
+    assert resumed.window == window
+    assert resumed.previous.done_units == {"MA|w|A"}
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path)
+    journal.done("CA|w|A")
+    journal.close()
+    Journal(path).close()
+    assert JournalState.load(path).done_units == set()
@@ -0,0 +1,56 @@
+from selenium.webdriver.common.by import By
+
+from ucc.probe import ResultProbe
+
+RESULTS = (By.ID, "results")
+EMPTY_ROW = (By.CSS_SELECTOR, ".no-records")
+
+
+class FakePage:
+    """A driver whose page changes to ``after`` when the search is submitted."""
+
+    def __init__(self, before, after):
+        self.page = before
+        self.after = after
+
+    def submit(self):
+        self.page = self.after
+
+    def limited(self, action):
+        return action()
+
+    def execute_script(self, script):
+        return ["complete", self.page.get("text", "")]
+
+    def find_elements(self, by, value):
+        return [object()] if (by, value) in self.page.get("elements", ()) else []
+
+
+def search(before, after, **options):
+    driver = FakePage(before, after)
+    probe = ResultProbe("XX")
+    found = probe.search(driver, driver.submit, RESULTS, **options)
+    return found, probe.counts
+
+
+def test_results_and_empty_pages_are_told_apart():
+    assert search({}, {"elements": [RESULTS]}, pause=1) == (True, {"results": 1, "empty": 0, "timeout": 0})
+    assert search({}, {"text": "no records found"}, pause=1)[0] is False
+
+
+def test_an_undecided_search_is_none_not_empty():
+    # Callers must not take None for "no results": the name has to stay unfinished
+    found, counts = search({}, {"text": "still loading"}, timeout=0.3)
+    assert found is None
+    assert counts["timeout"] == 1
+
+
+def test_a_marker_already_on_the_page_does_not_count():
+    page = {"text": "no records found (showing tips)"}
+    assert search(page, dict(page), timeout=0.3)[0] is None
+
+
+def test_the_portals_empty_element_wins_over_the_results_table():
+    after = {"elements": [RESULTS, EMPTY_ROW]}
+    driver = FakePage({}, after)
+    assert ResultProbe("XX").search(driver, driver.submit, RESULTS, empty=[EMPTY_ROW], timeout=1) is False
@@ -0,0 +1,43 @@
+import pickle
+
+from ucc.records import Party, UCCFiling, layout_for
+
+HEADER = ["Filing Number", "Filing Date", "Debtor Name", "Debtor Address", "Secured Party", "Note"]
+ROW = ["B123", "01/02/2025", "ACME INC", "1 MAIN ST", "FIRST BANK", "see file"]
+
+
+def test_layout_maps_columns_to_fields_and_keeps_the_rest_as_extra():
+    layout = layout_for(tuple(HEADER))
+    assert layout.filing["filing_number"] == 0
+    assert layout.filing["filing_date"] == 1
+    assert layout.parties["debtor"]["name"] == 2
+    assert layout.parties["debtor"]["street"] == 3
+    # "Secured Party" is both the party and the searched name
+    assert layout.parties["secured_party"]["name"] == 4
+    assert layout.filing["search_name"] == 4
+    assert layout.extra == ["Note"]
+
+
+def test_rows_round_trip_in_their_own_columns():
+    filing = UCCFiling.from_row("AL", ROW, HEADER)
+    assert filing.filing_number == "B123"
+    assert filing.debtor == Party("ACME INC", "1 MAIN ST")
+    assert filing.filer is None
+    assert filing.to_row() == ROW
+    assert filing.to_dict() == dict(zip(HEADER, ROW))
+    assert UCCFiling.from_row("AL", dict(zip(HEADER, ROW))).to_row() == ROW
+
+
+def test_secured_parties_are_shared_through_the_callers_table():
+    parties = {}
+    first = UCCFiling.from_row("AL", ROW, HEADER, parties=parties)
+    second = UCCFiling.from_row("AL", ["B124"] + ROW[1:], HEADER, parties=parties)
+    assert first.secured_party is second.secured_party
+    assert first.debtor is not second.debtor
+    assert list(parties) == [Party("FIRST BANK")]
+
+
+def test_layouts_are_shared_and_pickle_to_the_shared_instance():
+    layout = layout_for(tuple(HEADER))
+    assert layout_for(tuple(HEADER)) is layout
+    assert pickle.loads(pickle.dumps(layout)) is layout
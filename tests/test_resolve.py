@@ -0,0 +1,37 @@
+import pytest
+
+from ucc.resolve import DisjointSet, name_tokens, soundex
+
+
+def test_soundex():
+    assert soundex("ROBERT") == soundex("RUPERT") == "R163"
+    assert soundex("ASHCRAFT") == "A261"
+    assert soundex("TYMCZAK") == "T522"
+    assert soundex("PFISTER") == "P236"
+    assert soundex("LEE") == "L000"
+    assert soundex("123") == "123"
+
+
+def test_name_tokens_sorts_and_drops_initials():
+    assert name_tokens("McCann, John C") == ["JOHN", "MCCANN"]
+    assert name_tokens("O'Brien Holdings LLC") == ["HOLDINGS", "OBRIEN"]
+
+
+def test_similar_pairs_finds_near_duplicates_and_uses_zip_bonus():
+    pytest.importorskip("numpy")
+    from ucc.resolve import similar_pairs
+
+    names = ["ACME HOLDINGS", "ACME HOLDING", "ZENITH FARMS"]
+    assert list(similar_pairs(names, [[], [], []], 0.7)) == [(0, 1)]
+    # Trigram cosine 0.78: a shared ZIP code lifts it over 0.8, a different one does not
+    assert list(similar_pairs(["ACME CO", "ACME CORP"], [[], []], 0.8)) == []
+    assert list(similar_pairs(["ACME CO", "ACME CORP"], [["35203"], ["36104"]], 0.8)) == []
+    assert list(similar_pairs(["ACME CO", "ACME CORP"], [["35203"], ["35203"]], 0.8)) == [(0, 1)]
+
+
+def test_disjoint_set_keeps_the_lowest_id():
+    entities = DisjointSet()
+    entities.union(5, 3)
+    entities.union(3, 9)
+    assert entities.find(9) == entities.find(5) == 3
+    assert entities.find(7) == 7
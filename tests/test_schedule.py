@@ -0,0 +1,77 @@
+import threading
+
+from ucc.schedule import CostModel, Unit, WorkStealingScheduler
+
+
+class FakeScraper:
+    def __init__(self, state):
+        self.state = state
+
+
+def units(state, estimates):
+    scraper = FakeScraper(state)
+    return [Unit(scraper, [f"{state}{i}"], estimate) for i, estimate in enumerate(estimates)]
+
+
+def test_longest_units_are_dealt_to_the_least_loaded_worker():
+    scheduler = WorkStealingScheduler(units("KY", [10, 7, 5, 3, 1]), workers=2)
+    assert [[u.estimate for u in queue] for queue in scheduler.queues] == [[10, 3], [7, 5, 1]]
+    assert scheduler.queued == [13, 13]
+
+
+def test_every_unit_runs_once_and_idle_workers_steal():
+    # Worker 0 gets 5 and 3, worker 1 gets 4 and 3
+    work = units("KY", [5, 4, 3, 3])
+    scheduler = WorkStealingScheduler(work, workers=2)
+    ran = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def func(scraper, names):
+        if names == ["KY0"]:
+            # Hold the long unit until the other worker has emptied its queue and stolen
+            release.wait(5)
+        with lock:
+            ran.append(names[0])
+            if len(ran) == 3:
+                release.set()
+
+    scheduler.run(func)
+    assert sorted(ran) == ["KY0", "KY1", "KY2", "KY3"]
+    assert scheduler.steals == 1
+    assert all(u.seconds is not None for u in work)
+
+
+def test_a_failed_unit_has_no_time():
+    work = units("AL", [2, 1])
+
+    def func(scraper, names):
+        if names == ["AL0"]:
+            raise RuntimeError("portal down")
+
+    WorkStealingScheduler(work, workers=1).run(func)
+    assert [u.seconds is None for u in work] == [True, False]
+
+
+def test_a_worker_passes_over_a_portal_at_its_limit():
+    work = units("AZ", [9, 8]) + units("CA", [1])
+    scheduler = WorkStealingScheduler(work, workers=1, state_limits={"AZ": 1})
+    assert scheduler.take(0).scraper.state == "AZ"
+    assert scheduler.take(0).scraper.state == "CA"
+    # Nothing else left: the portal's limit does not leave the worker idle
+    assert scheduler.take(0).scraper.state == "AZ"
+    assert scheduler.take(0) is None
+
+
+def test_cost_model_remembers_and_falls_back_to_the_state_median(tmp_path):
+    path = str(tmp_path / "costs.json")
+    costs = CostModel(path)
+    costs.observe("KY", ["A"], 10)
+    costs.observe("KY", ["A"], 20)
+    costs.observe("KY", ["B"], 40)
+    costs.save()
+
+    costs = CostModel(path)
+    assert costs.estimate("KY", ["A"]) == 15
+    assert costs.estimate("KY", ["C"]) == 27.5
+    assert costs.estimate("MA", ["A"]) == 60.0
@@ -0,0 +1 @@
+"""Shared code for the state UCC scrapers and their post-processing scripts."""
@@ -0,0 +1,3 @@
+from ucc.cli import main
+
+main()
@@ -0,0 +1,191 @@
+"""Chrome setup and a pool of drivers shared by every state scraper in a run."""
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ucc.ratelimit import LimitedDriver
+from ucc.trace import span
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_ROOT = os.path.join(REPO_ROOT, ".browser_cache")
+CACHE_SIZE = 512 * 1024 * 1024
+# Where the first start found chromedriver; later starts skip the lookup (and any download)
+DRIVER_FILE = os.path.join(CACHE_ROOT, "chromedriver.json")
+
+# Nothing the scrapers read comes from these
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*hotjar.com*", "*newrelic.com*", "*nr-data.net*",
+    "*clarity.ms*", "*siteimproveanalytics.com*", "*quantserve.com*",
+]
+STYLESHEET_PATTERNS = ["*.css"]
+
+
+class BrowserProfile:
+    """How a Chrome instance is launched: visibility, resource blocking, load strategy and cache."""
+
+    def __init__(self, name, headless=False, block_resources=False, block_stylesheets=False,
+                 eager=False, cache_dir=None, performance_log=False):
+        self.name = name
+        self.headless = headless
+        self.block_resources = block_resources
+        # Off by default: some portals only make their buttons clickable once styled
+        self.block_stylesheets = block_stylesheets
+        self.eager = eager
+        self.cache_dir = cache_dir
+        self.performance_log = performance_log
+
+    def blocked_urls(self):
+        patterns = list(BLOCKED_URL_PATTERNS) if self.block_resources else []
+        if self.block_stylesheets:
+            patterns += STYLESHEET_PATTERNS
+        return patterns
+
+    def options(self, slot=0):
+        options = Options()
+        if self.headless:
+            options.add_argument('--headless=new')
+            options.add_argument('--window-size=1920,1080')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        if self.block_resources:
+            # Images via content settings as well, so windows opened later (MA) are covered too
+            options.add_experimental_option('prefs', {
+                'profile.managed_default_content_settings.images': 2,
+                'profile.default_content_setting_values.notifications': 2,
+            })
+        if self.eager:
+            # driver.get returns at DOMContentLoaded; the scrapers wait for their own elements
+            options.page_load_strategy = 'eager'
+        if self.cache_dir:
+            # One cache directory per pool slot: relaunches reuse a warm cache, but two
+            # running Chromes never write to the same one
+            options.add_argument(f'--disk-cache-dir={os.path.join(self.cache_dir, f"slot-{slot}")}')
+            options.add_argument(f'--disk-cache-size={CACHE_SIZE}')
+        if self.performance_log:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return options
+
+    def apply(self, driver):
+        patterns = self.blocked_urls()
+        if patterns:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+PROFILES = {
+    # What the scripts always did: a visible Chrome loading everything
+    "visible": BrowserProfile("visible"),
+    "lean": BrowserProfile("lean", headless=True, block_resources=True, eager=True, cache_dir=CACHE_ROOT),
+}
+DEFAULT_PROFILE = "lean"
+
+
+def chrome_options(profile=None):
+    return (profile or PROFILES[DEFAULT_PROFILE]).options()
+
+
+def cached_driver_path():
+    try:
+        with open(DRIVER_FILE, "r", encoding="utf-8") as f:
+            path = json.load(f)["path"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return path if os.path.exists(path) else None
+
+
+def remember_driver_path(driver):
+    # Selenium Manager resolved it for this start (Service.path in every Selenium 4 release)
+    path = getattr(driver.service, "path", None)
+    if not path or path == cached_driver_path():
+        return
+    os.makedirs(CACHE_ROOT, exist_ok=True)
+    tmp_path = f"{DRIVER_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path}, f)
+    os.replace(tmp_path, DRIVER_FILE)
+
+
+def driver_service():
+    """A chromedriver Service for the binary an earlier start resolved, or one Selenium resolves now."""
+    path = cached_driver_path()
+    return Service(executable_path=path) if path else Service()
+
+
+def new_driver(profile=None, slot=0):
+    profile = profile or PROFILES[DEFAULT_PROFILE]
+    driver = webdriver.Chrome(service=driver_service(), options=profile.options(slot))
+    remember_driver_path(driver)
+    profile.apply(driver)
+    return driver
+
+
+class TracedWait(WebDriverWait):
+    """WebDriverWait whose ``until`` shows up as a wait in the trace."""
+
+    def until(self, method, message=""):
+        with span("wait"):
+            return super().until(method, message)
+
+    def until_not(self, method, message=""):
+        with span("wait"):
+            return super().until_not(method, message)
+
+
+class BrowserPool:
+    """At most ``size`` live drivers, one per slot, created lazily and leased to one unit of work at a time."""
+
+    def __init__(self, size, profile=None, factory=new_driver):
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
+        self.factory = factory
+        self.free_slots = queue.LifoQueue()
+        for slot in range(size):
+            self.free_slots.put(slot)
+        self.drivers = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, fresh=False):
+        """Yield a rate-limited driver; with ``fresh`` it is quit afterwards instead of going back to the pool."""
+        slot = self.free_slots.get()
+        try:
+            with self.lock:
+                driver = self.drivers.get(slot)
+            if driver is None:
+                driver = self.factory(self.profile, slot)
+                with self.lock:
+                    self.drivers[slot] = driver
+            healthy = False
+            try:
+                yield LimitedDriver(driver)
+                healthy = True
+            finally:
+                if fresh or not healthy:
+                    self._discard(slot)
+        finally:
+            self.free_slots.put(slot)
+
+    def _discard(self, slot):
+        with self.lock:
+            driver = self.drivers.pop(slot, None)
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+
+    def close(self):
+        with self.lock:
+            slots = list(self.drivers)
+        for slot in slots:
+            self._discard(slot)
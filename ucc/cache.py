@@ -0,0 +1,341 @@
+"""Opt-in on-disk response cache for development loops and repeated lookups.
+
+    python -m ucc run --states CA --engine playwright --cache
+    UCC_CACHE=1 python WV/address_lookup.py
+    python -m ucc cache report
+
+Responses are keyed by method, URL (query included) and request body (form
+parameters) and kept in one SQLite file. How long a response stays fresh is
+set per portal in http_cache.json at the repository root (seconds; 0 turns
+caching off for that host). When the file grows past ``max_mb`` the least
+recently used responses are evicted.
+
+Only responses that are the page asked for are kept: not a Cloudflare
+challenge, nor anything a scraper's check for its host (``set_validator``)
+turns down, such as AL's "session expired" answer to a detail request. Cookies
+the portal sets are not stored, so a cache hit never hands out a stale session.
+
+Fetch paths that go through it: requests sessions built with
+``ucc.replay.http_adapter`` (AL details, WV geocoding), and the Playwright
+engine's pages and XHR through request interception. Selenium cannot
+intercept requests, so its pages are never cached. A request the cache
+answers is not sent, and ``ucc.ratelimit.limited_request`` does not make it
+wait for the portal's limit.
+"""
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ucc.ratelimit import is_challenge
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(REPO_ROOT, "http_cache.json")
+DEFAULT_CACHE = os.path.join(REPO_ROOT, ".http_cache.sqlite3")
+
+DEFAULT_CONFIG = {"max_mb": 512, "default_ttl": 3600, "hosts": {}}
+# Evict down to this share of max_mb, so eviction does not run on every store
+EVICT_TO = 0.9
+# What the browser fetches that is worth caching; images, fonts and the like are blocked or cheap
+CACHED_RESOURCE_TYPES = {"document", "xhr", "fetch", "script", "stylesheet"}
+# Describe the stored body, not the bytes on the wire
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Also left out of the cache: a session cookie belongs to the response that set it
+UNCACHED_HEADERS = DROPPED_HEADERS | {"set-cookie"}
+TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def as_bytes(body):
+    return body.encode("utf-8") if isinstance(body, str) else body
+
+
+def request_url(url, params=None):
+    """The URL requests will send for ``url`` plus ``params``."""
+    if not params:
+        return url
+    prepared = PreparedRequest()
+    prepared.prepare_url(url, params)
+    return prepared.url
+
+
+_validators = {}
+
+
+def set_validator(host, check):
+    """Cache ``host``'s responses only when ``check(url, content)`` is true of them."""
+    _validators[host] = check
+
+
+def cacheable(url, headers, content):
+    """Whether a 200 response is the page that was asked for, and not a challenge or an error page."""
+    content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+    if "html" in content_type:
+        title = TITLE_RE.search(content)
+        if title and is_challenge(title.group(1).decode("utf-8", "replace")):
+            return False
+    check = _validators.get(urlsplit(url).hostname or "")
+    return check is None or check(url, content)
+
+
+def request_key(method, url, body=None):
+    digest = hashlib.sha256()
+    for part in (method.upper().encode("utf-8"), url.encode("utf-8"), as_bytes(body) or b""):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """The SQLite-backed cache; safe to share between scraper threads and the Playwright loop."""
+
+    def __init__(self, path=DEFAULT_CACHE, config=None):
+        config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.path = path
+        self.default_ttl = config["default_ttl"]
+        self.ttls = config["hosts"]
+        self.max_bytes = int(config["max_mb"] * 1024 * 1024)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # Per host, for this process: hits, misses, stores, evictions
+        self.counts = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_CACHE, config_path=CONFIG_FILE):
+        if not os.path.exists(config_path):
+            return cls(path)
+        with open(config_path, "r", encoding="utf-8") as f:
+            return cls(path, json.load(f))
+
+    def ttl(self, url):
+        return self.ttls.get(urlsplit(url).hostname or "", self.default_ttl)
+
+    def _count(self, host, what, n=1):
+        counts = self.counts.setdefault(host, {"hit": 0, "miss": 0, "store": 0, "evict": 0})
+        counts[what] += n
+
+    def _lookup(self, key, ttl):
+        row = self.conn.execute("SELECT status, headers, body, stored FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[3] > ttl:
+            return None
+        return row
+
+    def fresh(self, method, url, body=None):
+        """Whether a request would be answered from the cache (nothing is counted)."""
+        ttl = self.ttl(url)
+        if not ttl:
+            return False
+        with self.lock:
+            return self._lookup(request_key(method, url, body), ttl) is not None
+
+    def get(self, method, url, body=None):
+        """(status, headers, body) of a fresh cached response, or None."""
+        ttl = self.ttl(url)
+        if not ttl:
+            return None
+        key = request_key(method, url, body)
+        host = urlsplit(url).hostname or ""
+        with self.lock:
+            row = self._lookup(key, ttl)
+            if row is None:
+                self._count(host, "miss")
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self._count(host, "hit")
+        status, headers, content, _ = row
+        return status, json.loads(headers), content
+
+    def put(self, method, url, body, status, headers, content):
+        """Keep a successful response for its host's TTL; anything else is not cached."""
+        content = content or b""
+        if status != 200 or not self.ttl(url) or not cacheable(url, headers, content):
+            return
+        key = request_key(method, url, body)
+        host = urlsplit(url).hostname or ""
+        headers = {k: v for k, v in headers.items() if k.lower() not in UNCACHED_HEADERS}
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                """INSERT OR REPLACE INTO responses (key, host, method, url, status, headers, body, size, stored,
+                                                     last_used, hits)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)""",
+                (key, host, method.upper(), url, status, json.dumps(headers), content, len(content), now, now),
+            )
+            self.total_bytes += len(content) - (previous[0] if previous else 0)
+            self._count(host, "store")
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        target = self.max_bytes * EVICT_TO
+        rows = self.conn.execute("SELECT key, host, size FROM responses ORDER BY last_used").fetchall()
+        for key, host, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.total_bytes -= size
+            self._count(host, "evict")
+
+    async def handle(self, route):
+        """Playwright route handler: answer from the cache, or fetch, keep and pass on the response."""
+        request = route.request
+        if request.resource_type not in CACHED_RESOURCE_TYPES or not self.ttl(request.url):
+            await route.fallback()
+            return
+        body = request.post_data_buffer
+        # SQLite blocks; the browser's other requests are served by this same event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.get, request.method, request.url, body)
+        if cached is not None:
+            status, headers, content = cached
+            await route.fulfill(status=status, headers=headers, body=content)
+            return
+        # Redirects are passed back to the browser, which requests (and caches) the target itself
+        response = await route.fetch(max_redirects=0)
+        content = await response.body()
+        await loop.run_in_executor(None, self.put, request.method, request.url, body, response.status,
+                                   response.headers, content)
+        await route.fulfill(response=response, body=content)
+
+    def send(self, adapter, request, **kwargs):
+        """For ``CachingAdapter``: a cached response, or the real one (kept when it is cacheable)."""
+        body = as_bytes(request.body)
+        cached = self.get(request.method, request.url, body)
+        if cached is None:
+            response = HTTPAdapter.send(adapter, request, **kwargs)
+            self.put(request.method, request.url, body, response.status_code, dict(response.headers),
+                     response.content)
+            return response
+        status, headers, content = cached
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = status
+        response._content = content
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def report(self):
+        with self.lock:
+            counts = {host: dict(c) for host, c in self.counts.items()}
+        if not counts:
+            return
+        print(f"{'Host':<32}{'Hits':>7}{'Misses':>8}{'Hit rate':>10}{'Stored':>8}{'Evicted':>9}")
+        for host, c in sorted(counts.items()):
+            lookups = c["hit"] + c["miss"]
+            rate = f"{100 * c['hit'] / lookups:.0f}%" if lookups else "-"
+            print(f"{host:<32}{c['hit']:>7}{c['miss']:>8}{rate:>10}{c['store']:>8}{c['evict']:>9}")
+        print(f"Response cache: {self.total_bytes / 1024 / 1024:.1f} of {self.max_bytes / 1024 / 1024:.0f} MB "
+              f"in {self.path}")
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """Sends through the process-wide cache while one is enabled, straight to the network otherwise."""
+
+    def send(self, request, **kwargs):
+        cache = _cache
+        if cache is None:
+            return super().send(request, **kwargs)
+        return cache.send(self, request, **kwargs)
+
+
+_cache = None
+
+
+def enable(path=DEFAULT_CACHE):
+    global _cache
+    disable()
+    _cache = ResponseCache.load(path)
+    return _cache
+
+
+def disable():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def active():
+    """The enabled cache, or None."""
+    return _cache
+
+
+def fresh(method, url, params=None, body=None):
+    cache = _cache
+    return cache is not None and cache.fresh(method, request_url(url, params), body)
+
+
+def stored_report(path=DEFAULT_CACHE):
+    """What the cache file holds, per host, across all runs."""
+    if not os.path.exists(path):
+        print(f"No response cache at {path}")
+        return
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            """SELECT host, COUNT(*), SUM(size), SUM(hits), MIN(stored), MAX(last_used)
+               FROM responses GROUP BY host ORDER BY SUM(size) DESC"""
+        ).fetchall()
+    finally:
+        conn.close()
+    print(f"{'Host':<32}{'Entries':>9}{'MB':>8}{'Hits':>8}  Oldest stored")
+    for host, entries, size, hits, oldest, _ in rows:
+        stored = time.strftime("%Y-%m-%d %H:%M", time.localtime(oldest))
+        print(f"{host:<32}{entries:>9}{size / 1024 / 1024:>8.1f}{hits:>8}  {stored}")
+
+
+def clear(path=DEFAULT_CACHE):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+if os.environ.get("UCC_CACHE"):
+    enable(DEFAULT_CACHE if os.environ["UCC_CACHE"] == "1" else os.environ["UCC_CACHE"])
+
+    def _report_at_exit():
+        if _cache is not None:
+            _cache.report()
+            disable()
+
+    atexit.register(_report_at_exit)
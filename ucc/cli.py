@@ -0,0 +1,250 @@
+"""Command line entry point: ``python -m ucc <command>``."""
+import argparse
+
+from ucc import enrich, store
+
+
+def cmd_enrich(args):
+    index = enrich.OfficialIndex.from_csv(args.lookup, key_column=args.lookup_key)
+    matched = enrich.enrich_csv(args.input, args.output, index, name_column=args.name_column,
+                                address_column=args.address_column)
+    print(f"Matched {matched} rows against {len(index)} entities. Updated file written to {args.output}")
+
+
+def parse_states(text):
+    from ucc.scraper import STATE_MODULES
+
+    if text.lower() == "all":
+        return sorted(STATE_MODULES)
+    return [state.strip().upper() for state in text.split(",") if state.strip()]
+
+
+def cmd_run(args):
+    # Selenium is only needed for scraping, not for the post-processing commands
+    from ucc.scraper import get_scraper, run_from_args
+
+    run_from_args([get_scraper(state) for state in parse_states(args.states)], args)
+
+
+def cmd_measure(args):
+    from ucc.measure import measure
+    from ucc.scraper import get_scraper
+
+    scrapers = [get_scraper(state)() for state in parse_states(args.states)]
+    measure(scrapers, repeats=args.repeats)
+
+
+def cmd_store_load(args):
+    db = store.Store(args.store)
+    try:
+        for path in args.csv:
+            db.load_csv(args.state.upper(), path)
+    finally:
+        db.close()
+    print(f"Stored {db.rows} rows; {db.filings} filings in {args.store} ({db.skipped} rows without a filing number)")
+
+
+def cmd_store_export(args):
+    total = store.export_parquet(args.store, args.output_dir)
+    print(f"Exported {total} filings to {args.output_dir}")
+
+
+def cmd_store_resolve(args):
+    from ucc.resolve import resolve
+
+    resolve(args.store, role=args.role, threshold=args.threshold, output=args.output)
+
+
+def cmd_trace(args):
+    from ucc.trace import report
+
+    report(args.file)
+
+
+def cmd_bench_record(args):
+    from ucc.browser import PROFILES
+    from ucc.replay import DEFAULT_ARCHIVE, record
+
+    record(parse_states(args.states), args.archive or DEFAULT_ARCHIVE, workers=args.workers, profile=PROFILES[args.profile])
+
+
+def cmd_bench_replay(args):
+    from ucc.browser import PROFILES
+    from ucc.replay import DEFAULT_ARCHIVE, benchmark
+
+    benchmark(parse_states(args.states), args.archive or DEFAULT_ARCHIVE, latency=args.latency, workers=args.workers,
+              profile=PROFILES[args.profile], pause_scale=args.pause_scale)
+
+
+def cmd_bench_scale(args):
+    from ucc.browser import PROFILES
+    from ucc.mockportal import scale
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    scale(parse_states(args.states), sizes, workers=args.workers, profile=PROFILES[args.profile], output=args.output)
+
+
+def cmd_reparse(args):
+    from ucc.replay import DEFAULT_ARCHIVE, reparse
+
+    reparse(parse_states(args.states), args.archive or DEFAULT_ARCHIVE, args.output_dir, day=args.day,
+            processes=args.processes)
+
+
+def cmd_cache_report(args):
+    from ucc.cache import stored_report
+
+    stored_report()
+
+
+def cmd_cache_clear(args):
+    from ucc.cache import DEFAULT_CACHE, clear
+
+    clear()
+    print(f"Removed {DEFAULT_CACHE}")
+
+
+def cmd_browsers_serve(args):
+    from ucc.browser import PROFILES
+    from ucc.daemon import serve
+
+    serve(args.size, profile=PROFILES[args.profile])
+
+
+def cmd_browsers_status(args):
+    from ucc.daemon import print_status
+
+    print_status()
+
+
+def cmd_browsers_stop(args):
+    from ucc.daemon import request
+
+    request({"op": "stop"})
+
+
+def cmd_limits(args):
+    from ucc.ratelimit import STATE_FILE
+
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        print(f.read())
+
+
+def add_run_arguments(parser):
+    parser.add_argument("--workers", type=int, default=1, help="concurrent browsers shared by all states")
+    parser.add_argument("--output-dir", help="write outputs to a subdirectory per state here instead of each state's directory")
+    parser.add_argument("--profile", choices=["lean", "visible"], default="lean",
+                        help="lean: headless, no images/fonts/media/analytics, eager load, shared disk cache")
+    parser.add_argument("--engine", choices=["selenium", "playwright", "daemon"], default="selenium",
+                        help="playwright: one browser process, one isolated context per worker; "
+                             "daemon: lease the warm browsers of 'browsers serve'")
+    parser.add_argument("--resume", action="store_true", help="skip the work the interrupted previous run finished")
+    parser.add_argument("--journal", help="checkpoint journal (default: .journal/<STATES>.jsonl)")
+    parser.add_argument("--store", default=store.DEFAULT_STORE, help="normalized SQLite store every row also goes to")
+    parser.add_argument("--no-store", action="store_true", help="write the state CSVs only")
+    parser.add_argument("--no-delta", action="store_true",
+                        help="skip the change feed (<STATE>_changes_<date>.jsonl: new, changed and gone filings)")
+    parser.add_argument("--trace", help="write timing spans (navigate, wait, extract, ...) to this JSONL file")
+    parser.add_argument("--archive", help="also keep every fetched page in this archive for 'reparse' "
+                                          "(needs --engine playwright)")
+    parser.add_argument("--cache", action="store_true",
+                        help="answer repeated requests from the on-disk response cache (http_cache.json TTLs)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ucc", description="UCC scraping tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("run", help="scrape one or more states concurrently")
+    p.add_argument("--states", default="all", help="comma-separated state codes, or 'all'")
+    add_run_arguments(p)
+    p.set_defaults(func=cmd_run)
+
+    p = commands.add_parser("store", help="the normalized SQLite store of all states")
+    store_commands = p.add_subparsers(dest="store_command", required=True)
+    sp = store_commands.add_parser("load", help="add existing state CSVs to the store")
+    sp.add_argument("state", help="state code the rows belong to")
+    sp.add_argument("csv", nargs="+")
+    sp.add_argument("--store", default=store.DEFAULT_STORE)
+    sp.set_defaults(func=cmd_store_load)
+    sp = store_commands.add_parser("export", help="Parquet partitioned by state and filing month (needs pyarrow)")
+    sp.add_argument("output_dir")
+    sp.add_argument("--store", default=store.DEFAULT_STORE)
+    sp.set_defaults(func=cmd_store_export)
+    sp = store_commands.add_parser("resolve", help="group the parties into cross-state entities (needs numpy)")
+    sp.add_argument("--store", default=store.DEFAULT_STORE)
+    sp.add_argument("--role", choices=["debtor", "secured_party", "filer"], default="debtor")
+    sp.add_argument("--threshold", type=float, default=0.85, help="trigram cosine similarity that merges two names")
+    sp.add_argument("--output", help="also write entity_id, party_id, name to this CSV")
+    sp.set_defaults(func=cmd_store_resolve)
+
+    p = commands.add_parser("trace", help="p50/p95/total per stage and state from a run --trace file")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_trace)
+
+    p = commands.add_parser("bench", help="record the portals once, then benchmark the scrapers offline")
+    bench_commands = p.add_subparsers(dest="bench_command", required=True)
+    for name, func, help_text in (("record", cmd_bench_record, "scrape live and keep every response"),
+                                  ("replay", cmd_bench_replay, "scrape the recorded responses: filings/sec, commands/filing")):
+        sp = bench_commands.add_parser(name, help=help_text)
+        sp.add_argument("--states", default="all", help="comma-separated state codes, or 'all'")
+        sp.add_argument("--archive", help="recorded responses (default: .replay/)")
+        sp.add_argument("--workers", type=int, default=1)
+        sp.add_argument("--profile", choices=["lean", "visible"], default="lean")
+        sp.set_defaults(func=func)
+    sp.add_argument("--latency", type=float, default=0.0, help="seconds added to every replayed response")
+    sp.add_argument("--pause-scale", type=float, default=1.0,
+                    help="multiply the scrapers' fixed pauses (0 measures the scraping work alone)")
+    sp = bench_commands.add_parser("scale", help="scrape synthetic CA/AL/WV portals at growing result counts")
+    sp.add_argument("--states", default="CA,AL,WV", help="comma-separated state codes (mocked: CA, AL, WV)")
+    sp.add_argument("--sizes", default="10,30,100,300,1000,3000,10000", help="results per search")
+    sp.add_argument("--workers", type=int, default=1)
+    sp.add_argument("--profile", choices=["lean", "visible"], default="lean")
+    sp.add_argument("--output", default="scale.csv", help="results CSV; the chart goes next to it as .png")
+    sp.set_defaults(func=cmd_bench_scale)
+
+    p = commands.add_parser("reparse", help="regenerate outputs from archived pages, without network access")
+    p.add_argument("--states", default="all", help="comma-separated state codes, or 'all'")
+    p.add_argument("--archive", help="archived pages (default: .replay/)")
+    p.add_argument("--day", help="archive day to use, YYYY-MM-DD (default: each state's latest)")
+    p.add_argument("--output-dir", default="reparsed", help="where the regenerated outputs go")
+    p.add_argument("--processes", type=int, help="parallel processes (default: one per state)")
+    p.set_defaults(func=cmd_reparse)
+
+    p = commands.add_parser("cache", help="the development response cache (run --cache, UCC_CACHE=1)")
+    cache_commands = p.add_subparsers(dest="cache_command", required=True)
+    cache_commands.add_parser("report", help="entries, size and hits per host").set_defaults(func=cmd_cache_report)
+    cache_commands.add_parser("clear", help="delete the cache file").set_defaults(func=cmd_cache_clear)
+
+    p = commands.add_parser("browsers", help="a daemon of warm browsers that runs lease (run --engine daemon)")
+    browser_commands = p.add_subparsers(dest="browsers_command", required=True)
+    sp = browser_commands.add_parser("serve", help="start the browsers and lease them until Ctrl+C")
+    sp.add_argument("--size", type=int, default=4, help="browsers to keep; more than the workers hides restarts")
+    sp.add_argument("--profile", choices=["lean", "visible"], default="lean")
+    sp.set_defaults(func=cmd_browsers_serve)
+    browser_commands.add_parser("status", help="leased, free and replaced browsers").set_defaults(
+        func=cmd_browsers_status)
+    browser_commands.add_parser("stop", help="quit the daemon and its browsers").set_defaults(func=cmd_browsers_stop)
+
+    p = commands.add_parser("limits", help="show the adaptive per-portal limits of the current or last run")
+    p.set_defaults(func=cmd_limits)
+
+    p = commands.add_parser("measure", help="bytes and load time per portal, visible vs lean browser")
+    p.add_argument("--states", default="all", help="comma-separated state codes, or 'all'")
+    p.add_argument("--repeats", type=int, default=2, help="loads per profile; the first one is cold")
+    p.set_defaults(func=cmd_measure)
+
+    p = commands.add_parser("enrich", help="fill official_* columns from an entity lookup table")
+    p.add_argument("input", help="any state's output CSV")
+    p.add_argument("output")
+    p.add_argument("--lookup", default=enrich.DEFAULT_LOOKUP, help="CSV of entity names and official_* columns")
+    p.add_argument("--lookup-key", default=enrich.LOOKUP_KEY_COLUMN, help="entity name column of the lookup CSV")
+    p.add_argument("--name-column", help="row column to match (default: the secured party column)")
+    p.add_argument("--address-column", help="row address used when an entry has no official_address")
+    p.set_defaults(func=cmd_enrich)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
@@ -0,0 +1,300 @@
+"""A long-lived pool of warm browsers that scraper processes lease instead of starting Chrome.
+
+    python -m ucc browsers serve --size 6       # leave running in its own terminal
+    python -m ucc run --states KY,AZ,MA --engine daemon --workers 4
+    python -m ucc browsers status
+
+Every browser a scraper starts costs seconds: Chrome itself, and on a fresh
+machine Selenium looking up chromedriver. The daemon starts ``size`` browsers
+once, with the chosen profile, and leases them one at a time over a local TCP
+socket (UCC_BROWSERD, default 127.0.0.1:47800). A client attaches its own
+chromedriver to the leased browser through Chrome's debugger address, which
+takes a fraction of a second, and detaches when the lease ends; the browser
+keeps running. chromedriver is resolved once (see ucc.browser.DRIVER_FILE)
+and its path handed to the clients.
+
+A lease lasts as long as the client's connection, so a client that dies
+releases its browser. A browser that comes back unhealthy, or was leased
+``fresh`` (a new session per name), is quit and replaced in the background:
+with more browsers than workers the next lease never waits for Chrome to
+start. Any other browser has its extra windows closed and goes back to the
+pool as it is, cookies included.
+
+Protocol, one JSON object per line: ``{"op": "lease"}`` is answered with
+``{"slot", "debugger_address", "driver_path", "profile"}`` once a browser is
+free, and ``{"op": "release", "healthy": ..., "fresh": ...}`` ends the lease.
+``{"op": "status"}`` and ``{"op": "stop"}`` are answered at once.
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from ucc.browser import DEFAULT_PROFILE, PROFILES, cached_driver_path, new_driver
+from ucc.ratelimit import LimitedDriver
+
+DEFAULT_ADDRESS = "127.0.0.1:47800"
+LAUNCH_ATTEMPTS = 3
+
+
+def daemon_address():
+    host, _, port = os.environ.get("UCC_BROWSERD", DEFAULT_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def send(stream, message):
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def receive(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("The browser daemon closed the connection")
+    return json.loads(line)
+
+
+class BrowserDaemon:
+    """The warm browsers, by slot, and which of them are free."""
+
+    def __init__(self, size, profile=None):
+        self.size = size
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
+        self.drivers = {}
+        self.free = queue.Queue()
+        self.leased = set()
+        self.lock = threading.Lock()
+        self.counts = {"launched": 0, "leases": 0, "recycled": 0, "failed": 0}
+        self.started = time.time()
+
+    def start(self):
+        # The first start resolves chromedriver; the others find its path cached and start together
+        self._launch(0)
+        threads = [threading.Thread(target=self._launch, args=(slot,)) for slot in range(1, self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _launch(self, slot):
+        for attempt in range(1, LAUNCH_ATTEMPTS + 1):
+            try:
+                driver = new_driver(self.profile, slot)
+                break
+            except Exception as e:
+                print(f"⚠️ Browser {slot} failed to start (attempt {attempt}): {e}")
+        else:
+            with self.lock:
+                self.counts["failed"] += 1
+            return
+        with self.lock:
+            self.drivers[slot] = driver
+            self.counts["launched"] += 1
+        self.free.put(slot)
+
+    def _replace(self, slot):
+        with self.lock:
+            driver = self.drivers.pop(slot, None)
+            self.counts["recycled"] += 1
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        self._launch(slot)
+
+    def _tidy(self, driver):
+        """Close every window but the first, as a newly started browser would have it."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+    def lease(self):
+        while True:
+            slot = self.free.get()
+            with self.lock:
+                driver = self.drivers[slot]
+            try:
+                # Also proves the browser is still alive
+                self._tidy(driver)
+                address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+                break
+            except Exception as e:
+                print(f"⚠️ Browser {slot} is gone, starting another: {e}")
+                self._replace(slot)
+        with self.lock:
+            self.leased.add(slot)
+            self.counts["leases"] += 1
+        return slot, {"slot": slot, "debugger_address": address, "driver_path": cached_driver_path(),
+                      "profile": self.profile.name}
+
+    def release(self, slot, healthy=True, fresh=False):
+        with self.lock:
+            self.leased.discard(slot)
+        if healthy and not fresh:
+            self.free.put(slot)
+        else:
+            threading.Thread(target=self._replace, args=(slot,), daemon=True).start()
+
+    def status(self):
+        with self.lock:
+            return dict(self.counts, size=self.size, running=len(self.drivers), leased=len(self.leased),
+                        free=self.free.qsize(), profile=self.profile.name, driver_path=cached_driver_path(),
+                        uptime=time.time() - self.started)
+
+    def close(self):
+        with self.lock:
+            drivers = list(self.drivers.values())
+            self.drivers.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+
+
+class LeaseHandler(socketserver.StreamRequestHandler):
+    """One client connection: any number of requests, at most one browser leased at a time."""
+
+    def handle(self):
+        daemon = self.server.daemon
+        stream = self.wfile
+        slot = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                op = message.get("op")
+                if op == "lease" and slot is None:
+                    slot, info = daemon.lease()
+                    reply = info
+                elif op == "release" and slot is not None:
+                    daemon.release(slot, healthy=message.get("healthy", True), fresh=message.get("fresh", False))
+                    slot = None
+                    reply = {"ok": True}
+                elif op == "status":
+                    reply = daemon.status()
+                elif op == "stop":
+                    reply = {"ok": True}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    reply = {"error": f"unexpected {op!r}"}
+                stream.write((json.dumps(reply) + "\n").encode("utf-8"))
+                stream.flush()
+        except (OSError, ValueError):
+            pass
+        finally:
+            if slot is not None:
+                # The client went away mid-lease; nothing says what state it left the browser in
+                daemon.release(slot, healthy=False)
+
+
+class LeaseServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, daemon):
+        self.daemon = daemon
+        super().__init__(address, LeaseHandler)
+
+
+def serve(size, profile=None, address=None):
+    address = address or daemon_address()
+    daemon = BrowserDaemon(size, profile)
+    start = time.perf_counter()
+    daemon.start()
+    try:
+        with LeaseServer(address, daemon) as server:
+            print(f"{len(daemon.drivers)} {daemon.profile.name} browsers ready in {time.perf_counter() - start:.1f}s, "
+                  f"leasing on {address[0]}:{address[1]} (Ctrl+C to stop)")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        status = daemon.status()
+        daemon.close()
+        print(f"Stopped after {status['leases']} leases ({status['launched']} browsers started, "
+              f"{status['recycled']} replaced)")
+
+
+def request(message, address=None):
+    """Send one request on a new connection and return the answer."""
+    with socket.create_connection(address or daemon_address(), timeout=10) as sock:
+        stream = sock.makefile("rw", encoding="utf-8")
+        send(stream, message)
+        return receive(stream)
+
+
+def print_status(address=None):
+    address = address or daemon_address()
+    try:
+        status = request({"op": "status"}, address)
+    except OSError:
+        print(f"No browser daemon at {address[0]}:{address[1]}")
+        return
+    print(f"{status['size']} {status['profile']} browsers: {status['leased']} leased, {status['free']} free, "
+          f"{status['running'] - status['leased'] - status['free']} being replaced")
+    print(f"{status['leases']} leases, {status['launched']} started, {status['recycled']} replaced, "
+          f"{status['failed']} failed to start, up {status['uptime'] / 60:.0f} min")
+    print(f"chromedriver: {status['driver_path'] or 'resolved by Selenium on each start'}")
+
+
+def attach(info, profile=None):
+    """A driver on the leased browser; quitting it only detaches."""
+    options = Options()
+    options.debugger_address = info["debugger_address"]
+    service = Service(executable_path=info["driver_path"]) if info["driver_path"] else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    # URL blocking belongs to the DevTools connection, so every client sets it again
+    PROFILES.get(info["profile"], profile or PROFILES[DEFAULT_PROFILE]).apply(driver)
+    return driver
+
+
+class DaemonPool:
+    """The BrowserPool interface over the daemon's browsers; how many there are is up to the daemon."""
+
+    def __init__(self, size=None, profile=None, address=None):
+        self.profile = profile
+        self.address = address or daemon_address()
+        try:
+            status = request({"op": "status"}, self.address)
+        except OSError as e:
+            raise RuntimeError(f"No browser daemon at {self.address[0]}:{self.address[1]}; "
+                               f"start one with: python -m ucc browsers serve") from e
+        if size and status["size"] < size:
+            print(f"⚠️ The browser daemon has {status['size']} browsers for {size} workers")
+
+    @contextmanager
+    def lease(self, fresh=False):
+        """Yield a rate-limited driver on a leased browser; with ``fresh`` the daemon replaces it afterwards."""
+        with socket.create_connection(self.address) as sock:
+            stream = sock.makefile("rw", encoding="utf-8")
+            send(stream, {"op": "lease"})
+            info = receive(stream)
+            driver = None
+            healthy = False
+            try:
+                driver = attach(info, self.profile)
+                yield LimitedDriver(driver)
+                healthy = True
+            finally:
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception as e:
+                        print(f"Error detaching from browser: {e}")
+                send(stream, {"op": "release", "healthy": healthy, "fresh": fresh})
+                receive(stream)
+
+    def close(self):
+        # The browsers belong to the daemon
+        pass
@@ -0,0 +1,133 @@
+"""Change feed between consecutive runs: which filings are new, changed or gone.
+
+Each run's filings are hashed as they are emitted; the hashes of the last run
+of each state are kept in .delta/<STATE>.json. When the state is done, the
+two are compared and the differences written next to its output as
+<STATE>_changes_<date>.jsonl, one record per filing:
+
+    {"change": "new", "state": "KY", "filing_number": "...", "filing": {...}}
+    {"change": "changed", ..., "fields": {"status": ["Active", "Lapsed"]}, "filing": {...}}
+    {"change": "gone", "state": "KY", "filing_number": "..."}
+
+A filing is keyed by state and filing number, and its hash covers every row
+with that number (AL lists a filing once per party) except the columns that
+say how it was found (searched name, processed date). Rows without a filing
+number are keyed by their content, so they can only be new or gone.
+
+"Gone" means the filing is no longer in the run's results; for the states
+that search a date window that is usually a filing ageing out of it. A state
+with a failed unit has incomplete results, so none of its filings are
+reported gone and its previous index is kept for the next run.
+
+An incremental state (``StateScraper.incremental``, AZ) only fetches what was
+filed since its last run, so a filing missing from a run says nothing: such a
+state never reports "gone", and its index keeps every filing earlier runs saw.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DELTA_DIR = os.path.join(REPO_ROOT, ".delta")
+
+# Fields whose old and new values a "changed" record lists
+TRACKED_FIELDS = ["filing_date", "lapse_date", "status", "filing_type"]
+# Where a row came from, not what the filing says
+IGNORED_FIELDS = {"search_name", "processed"}
+
+
+_ignored_columns = {}
+
+
+def ignored_columns(layout):
+    """Positions of the columns that only feed IGNORED_FIELDS (WV's "Secured Party" is also the party)."""
+    ignored = _ignored_columns.get(layout.columns)
+    if ignored is None:
+        party_columns = {i for parts in layout.parties.values() for i in parts.values() if i is not None}
+        ignored = {layout.filing[f] for f in IGNORED_FIELDS if layout.filing[f] is not None} - party_columns
+        _ignored_columns[layout.columns] = ignored
+    return ignored
+
+
+def row_digest(filing):
+    ignored = ignored_columns(filing.layout)
+    content = [(column, value) for i, (column, value) in enumerate(zip(filing.layout.columns, filing.to_row()))
+               if i not in ignored]
+    return hashlib.sha1(json.dumps(content, default=str).encode("utf-8")).hexdigest()
+
+
+class Delta:
+    """Collects the hashes of one run's filings, per state; safe to share between scraper threads."""
+
+    def __init__(self, directory=DELTA_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        # state -> filing key -> (row digests, tracked field values, latest filing)
+        self.current = {}
+
+    def index_path(self, state):
+        return os.path.join(self.directory, f"{state}.json")
+
+    def add(self, filing):
+        digest = row_digest(filing)
+        key = filing.filing_number.strip() or f"#{digest}"
+        with self.lock:
+            filings = self.current.setdefault(filing.state, {})
+            entry = filings.get(key)
+            if entry is None:
+                filings[key] = ({digest}, {f: getattr(filing, f) for f in TRACKED_FIELDS}, filing)
+            else:
+                entry[0].add(digest)
+
+    def finish(self, state, output_dir, complete=True, incremental=False):
+        """Write the state's change feed and index; returns (new, changed, gone) counts.
+
+        With ``incremental`` the run is taken to cover only part of the state's
+        filings: nothing is reported gone and the previous index is merged into
+        the new one, complete or not.
+        """
+        with self.lock:
+            current = self.current.pop(state, {})
+        previous = {}
+        if os.path.exists(self.index_path(state)):
+            with open(self.index_path(state), "r", encoding="utf-8") as f:
+                previous = json.load(f)
+
+        # An incremental run's filings are added to what earlier runs saw
+        index = dict(previous) if incremental else {}
+        counts = {"new": 0, "changed": 0, "gone": 0}
+        feed_path = os.path.join(output_dir, f"{state}_changes_{date.today().isoformat()}.jsonl")
+        with open(feed_path, "w", encoding="utf-8") as feed:
+            def write(change, key, **fields):
+                record = {"change": change, "state": state, "filing_number": "" if key.startswith("#") else key}
+                record.update(fields)
+                feed.write(json.dumps(record, default=str) + "\n")
+                counts[change] += 1
+
+            for key, (digests, tracked, filing) in current.items():
+                content_hash = hashlib.sha1("".join(sorted(digests)).encode("utf-8")).hexdigest()
+                old = previous.get(key)
+                index[key] = [content_hash, tracked]
+                if old is None:
+                    write("new", key, filing=filing.to_dict())
+                elif old[0] != content_hash:
+                    fields = {f: [old[1].get(f), tracked[f]] for f in TRACKED_FIELDS if old[1].get(f) != tracked[f]}
+                    write("changed", key, fields=fields, filing=filing.to_dict())
+            if complete and not incremental:
+                for key in previous.keys() - index.keys():
+                    write("gone", key)
+
+        if complete or incremental:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.index_path(state) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path(state))
+        if incremental:
+            note = " (incremental: nothing reported gone)"
+        else:
+            note = "" if complete else " (incomplete run: nothing reported gone, index kept)"
+        print(f"[{state}] {counts['new']} new, {counts['changed']} changed, {counts['gone']} gone -> {feed_path}{note}")
+        return counts
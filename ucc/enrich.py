@@ -0,0 +1,169 @@
+"""Official-designation enrichment for any state's UCC output.
+
+A lookup table maps entity names to an official designation, name and address
+(the official_* columns of "Bizpedia api - Sheet64.csv"). Each output row is
+matched against every entity in one pass: an exact hit on the normalized name
+first, then an Aho-Corasick scan for entity names contained in the row's name.
+"""
+import csv
+import os
+import re
+from collections import deque, namedtuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOOKUP = os.path.join(REPO_ROOT, "official_designations.csv")
+
+LOOKUP_KEY_COLUMN = "entity_name"
+OFFICIAL_COLUMNS = ["official_designation", "official_name", "official_address"]
+
+# Column names used for the secured party by the different state outputs
+NAME_COLUMN_CANDIDATES = ["secured_party_name", "Secured Party Name", "Secured Party", "Party Name"]
+ADDRESS_COLUMN_CANDIDATES = ["secured_party_address", "Secured Party Address"]
+
+# Corporate noise that varies between filings of the same entity
+IGNORED_TOKENS = {
+    "THE", "INC", "INCORPORATED", "LLC", "LLP", "LP", "PLLC", "PC", "CORP", "CORPORATION",
+    "CO", "COMPANY", "LTD", "LIMITED", "NA", "N", "A",
+}
+NON_ALNUM = re.compile(r"[^A-Z0-9&]+")
+
+OfficialEntry = namedtuple("OfficialEntry", ["entity_name", "official_designation", "official_name", "official_address"])
+
+
+def normalize_name(name):
+    """Upper-case, strip punctuation and corporate suffixes: 'Citibank, N.A.' -> 'CITIBANK'."""
+    text = NON_ALNUM.sub(" ", (name or "").upper().replace("&", " AND "))
+    tokens = text.split()
+    kept = [t for t in tokens if t not in IGNORED_TOKENS]
+    return " ".join(kept or tokens)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher over whole tokens of normalized names."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, pattern in enumerate(patterns):
+            self._add(f" {pattern} ", index)
+        self._link()
+
+    def _add(self, pattern, index):
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append(index)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield the index of every pattern that occurs in ``text`` as whole tokens."""
+        state = 0
+        for char in f" {text} ":
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            yield from self.output[state]
+
+
+class OfficialIndex:
+    """Normalized-name hash index plus an Aho-Corasick automaton over the same entities."""
+
+    def __init__(self, entries):
+        self.entries = []
+        self.by_name = {}
+        for entry in entries:
+            key = normalize_name(entry.entity_name)
+            if not key:
+                continue
+            if key not in self.by_name:
+                self.by_name[key] = len(self.entries)
+                self.entries.append(entry)
+            elif not any(self.entries[self.by_name[key]][1:]):
+                # Sheets repeat an entity per filing; keep the first row that actually has official data
+                self.entries[self.by_name[key]] = entry
+        self.matcher = AhoCorasick([normalize_name(e.entity_name) for e in self.entries])
+
+    @classmethod
+    def from_csv(cls, path, key_column=LOOKUP_KEY_COLUMN):
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = [
+                OfficialEntry(row[key_column].strip(), *(row.get(col, "").strip() for col in OFFICIAL_COLUMNS))
+                for row in csv.DictReader(f)
+                if row.get(key_column, "").strip()
+            ]
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, name):
+        """Return the entry for ``name``, preferring an exact hit, else the longest contained entity."""
+        key = normalize_name(name)
+        if not key:
+            return None
+        index = self.by_name.get(key)
+        if index is not None:
+            return self.entries[index]
+        best = None
+        for index in self.matcher.iter_matches(key):
+            if best is None or len(self.entries[index].entity_name) > len(self.entries[best].entity_name):
+                best = index
+        return None if best is None else self.entries[best]
+
+
+def pick_column(fieldnames, candidates):
+    for candidate in candidates:
+        if candidate in fieldnames:
+            return candidate
+    return None
+
+
+def enrich_csv(input_file, output_file, index, name_column=None, address_column=None):
+    """Fill the official_* columns of every row whose name matches an entity in ``index``.
+
+    An entry with an empty designation or address takes the row's own name or
+    address, so "CITIBANK" with blank fields reproduces the old AL Citibank rule.
+    """
+    matched = 0
+    with open(input_file, newline="", encoding="utf-8") as infile, \
+         open(output_file, "w", newline="", encoding="utf-8") as outfile:
+        reader = csv.DictReader(infile)
+        fieldnames = list(reader.fieldnames or [])
+        name_column = name_column or pick_column(fieldnames, NAME_COLUMN_CANDIDATES)
+        if name_column is None:
+            raise ValueError(f"{input_file}: no secured party column among {NAME_COLUMN_CANDIDATES}")
+        address_column = address_column or pick_column(fieldnames, ADDRESS_COLUMN_CANDIDATES)
+        fieldnames += [col for col in OFFICIAL_COLUMNS if col not in fieldnames]
+
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in reader:
+            name = row.get(name_column, "").strip()
+            entry = index.lookup(name)
+            if entry is not None:
+                row["official_designation"] = entry.official_designation or name
+                if entry.official_name:
+                    row["official_name"] = entry.official_name
+                row["official_address"] = entry.official_address or (row.get(address_column, "") if address_column else "")
+                matched += 1
+            writer.writerow(row)
+    return matched
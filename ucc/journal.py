@@ -0,0 +1,129 @@
+"""Append-only JSONL journal of finished work, so an interrupted run can resume.
+
+Every output row is journaled with the unit (state, date window, names) that
+produced it; scrapers that yield ``FilingRows`` get finer-grained checkpoints,
+one per filing. A unit is marked done once all of its rows were written. On ``--resume`` the rows of
+finished units and finished filings are replayed into the new output and only
+the remaining work is scraped again.
+
+Each attempt at a unit begins with a "start" record, which drops the rows
+journaled by its earlier attempts (a retry, or an interrupted run before
+``--resume``), so they are not replayed twice. Finished filings are kept: an
+attempt skips them rather than scraping them again.
+
+Writes are buffered and fsync'ed in batches; a "done" record always forces a
+sync, so a finished unit is never lost.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOURNAL_DIR = os.path.join(REPO_ROOT, ".journal")
+
+SYNC_EVERY_RECORDS = 200
+SYNC_EVERY_SECONDS = 2.0
+
+
+def journal_path_for(states):
+    """One journal per set of states, so separate runs (AL alone, AZ alone) do not clobber each other."""
+    return os.path.join(JOURNAL_DIR, "-".join(sorted(states)) + ".jsonl")
+
+
+def unit_key(state, window, names):
+    return "|".join([state, window] + list(names))
+
+
+class JournalState:
+    """What an existing journal says is already finished."""
+
+    def __init__(self):
+        self.window = None
+        self.done_units = set()
+        self.unit_rows = {}
+        self.filing_rows = {}
+
+    @classmethod
+    def load(cls, path):
+        state = cls()
+        if not os.path.exists(path):
+            return state
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                if record["t"] == "run":
+                    state.window = state.window or record["window"]
+                elif record["t"] == "start":
+                    state.unit_rows.pop(record["u"], None)
+                elif record["t"] == "done":
+                    state.done_units.add(record["u"])
+                elif record["t"] == "filing":
+                    state.filing_rows[(record["u"], record["f"])] = record["rows"]
+                elif record["t"] == "row":
+                    state.unit_rows.setdefault(record["u"], []).append(record["row"])
+        return state
+
+    def replay_rows(self, unit):
+        """Rows to carry over for ``unit``: all of them if it finished, else those of its finished filings."""
+        rows = []
+        if unit in self.done_units:
+            rows.extend(self.unit_rows.get(unit, []))
+        for (u, _), filing_rows in self.filing_rows.items():
+            if u == unit:
+                rows.extend(filing_rows)
+        return rows
+
+    def filing_done(self, unit, filing):
+        return (unit, filing) in self.filing_rows
+
+
+class Journal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.previous = JournalState.load(path) if resume else JournalState()
+        # The date window belongs to the run: a resumed run keeps the window it started with
+        self.window = self.previous.window or date.today().isoformat()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self._append({"t": "run", "window": self.window, "started": time.strftime("%Y-%m-%d %H:%M:%S")}, force_sync=True)
+
+    def _append(self, record, force_sync=False):
+        with self.lock:
+            self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.pending += 1
+            if force_sync or self.pending >= SYNC_EVERY_RECORDS or time.monotonic() - self.last_sync >= SYNC_EVERY_SECONDS:
+                self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def start(self, unit):
+        """A new attempt at ``unit``; the rows of earlier attempts no longer count."""
+        self._append({"t": "start", "u": unit})
+
+    def row(self, unit, row):
+        self._append({"t": "row", "u": unit, "row": row})
+
+    def filing(self, unit, filing, rows):
+        """All rows of one finished filing; on resume the filing is skipped even if its unit is not done."""
+        self._append({"t": "filing", "u": unit, "f": filing, "rows": rows})
+
+    def done(self, unit):
+        self._append({"t": "done", "u": unit}, force_sync=True)
+
+    def close(self):
+        with self.lock:
+            self._sync()
+            self.file.close()
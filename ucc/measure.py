@@ -0,0 +1,52 @@
+"""Bytes transferred and page-load time per portal, with and without the lean browser profile."""
+import copy
+import json
+import tempfile
+import time
+
+from ucc.browser import PROFILES, new_driver
+
+
+def transferred_bytes(driver):
+    """Sum of encoded bytes for every response since the log was last read (Chrome performance log)."""
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            total += message['params'].get('encodedDataLength', 0)
+    return total
+
+
+def measure_url(profile, url, repeats=2):
+    """Load ``url`` ``repeats`` times in one browser; the first load is cold, the rest hit the cache."""
+    profile = copy.copy(profile)
+    profile.performance_log = True
+    results = []
+    # An empty disk cache of its own: the profile's usual one is warm from earlier runs
+    with tempfile.TemporaryDirectory(prefix="ucc-measure-") as cache_dir:
+        profile.cache_dir = cache_dir
+        driver = new_driver(profile)
+        try:
+            for attempt in range(repeats):
+                transferred_bytes(driver)  # drop anything logged before this load
+                start = time.perf_counter()
+                driver.get(url)
+                elapsed = time.perf_counter() - start
+                # Let late subresources finish so their bytes are counted
+                time.sleep(2)
+                results.append({"load_s": elapsed, "bytes": transferred_bytes(driver), "cold": attempt == 0})
+        finally:
+            driver.quit()
+    return results
+
+
+def measure(scrapers, profile_names=("visible", "lean"), repeats=2):
+    rows = []
+    for scraper in scrapers:
+        for name in profile_names:
+            for result in measure_url(PROFILES[name], scraper.url, repeats):
+                rows.append((scraper.state, name, "cold" if result["cold"] else "warm", result["load_s"], result["bytes"]))
+    print(f"{'State':<6}{'Profile':<9}{'Cache':<6}{'Load (s)':>10}{'KB':>10}")
+    for state, name, cache, load_s, nbytes in rows:
+        print(f"{state:<6}{name:<9}{cache:<6}{load_s:>10.2f}{nbytes / 1024:>10.1f}")
+    return rows
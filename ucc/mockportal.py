@@ -0,0 +1,405 @@
+"""Synthetic CA, AL and WV portals with any number of results, and a scaling benchmark.
+
+    python -m ucc bench scale --states CA,AL,WV --sizes 10,100,1000,10000
+
+The live name lists return a few dozen filings per name; big lenders return
+thousands. ``MockPortals`` answers the scrapers' requests at the real URLs
+(through the same interception hooks as the replay benchmark) with pages that
+copy the structure the scrapers walk: the element IDs, the XPaths and the
+interactions (CA's advanced search and per-row sidebar, AL's search form,
+results links and detail pages, WV's search terms, date picker and combined
+table). Every search returns ``size`` generated filings.
+
+``scale`` runs each state for one name at each size with the fixed pauses
+skipped and no rate limits, and reports seconds and peak traced Python memory
+per filing. Per-filing cost should stay flat as the size grows; the log-log
+slope of total time against size shows when it does not (about 1 is linear,
+2 is quadratic). Memory is traced with ``tracemalloc``, which also slows the
+Python side down; the slope is what to compare.
+"""
+import asyncio
+import csv
+import html
+import json
+import math
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from ucc.replay import UNLIMITED, run_state, serving
+from ucc.trace import scale_pauses
+
+DEFAULT_SIZES = [10, 30, 100, 300, 1000, 3000, 10000]
+SCALE_NAME = "MOCK LENDING CORP"
+# Slope of log(time) against log(size) above which a state is reported as super-linear
+SUPERLINEAR_SLOPE = 1.2
+
+CA_HOST = "bizfileonline.sos.ca.gov"
+AL_HOST = "www.alabamainteractive.org"
+WV_HOST = "apps.wv.gov"
+
+STREETS = ["MAIN ST", "OAK AVE", "PINE RD", "MARKET ST", "BROADWAY", "CEDAR LN", "ELM ST", "WASHINGTON BLVD"]
+CITIES = [("SACRAMENTO", "CA", "95814"), ("BIRMINGHAM", "AL", "35203"), ("CHARLESTON", "WV", "25301"),
+          ("DALLAS", "TX", "75201"), ("COLUMBUS", "OH", "43215"), ("ATLANTA", "GA", "30303")]
+DEBTOR_WORDS = ["ACME", "SUMMIT", "RIVER", "EAGLE", "PIONEER", "HARBOR", "FRONTIER", "GRANITE", "MAPLE", "BLUE"]
+DEBTOR_SUFFIXES = ["LLC", "INC", "FARMS LLC", "TRUCKING INC", "HOLDINGS LLC", "CONSTRUCTION CO"]
+LENDERS = ["FIRST CAPITAL BANK", "MOCK LENDING CORP", "EQUIPMENT FINANCE LLC", "FARM CREDIT SERVICES"]
+
+
+def address(rng):
+    city, state, zip_code = rng.choice(CITIES)
+    return f"{rng.randint(1, 9999)} {rng.choice(STREETS)}", city, state, zip_code
+
+
+def filing(index):
+    """The ``index``-th synthetic filing: the same one for every run and state."""
+    rng = random.Random(index)
+    filed = datetime.now() - timedelta(days=rng.randint(0, 6))
+    return {
+        "number": f"U{26000000 + index:09d}",
+        "date": filed.strftime("%m/%d/%Y"),
+        "lapse": (filed + timedelta(days=5 * 365)).strftime("%m/%d/%Y"),
+        "debtor": f"{rng.choice(DEBTOR_WORDS)} {rng.choice(DEBTOR_WORDS)} {rng.choice(DEBTOR_SUFFIXES)}",
+        "debtor_address": address(rng),
+        "secured_party": rng.choice(LENDERS),
+        "secured_party_address": address(rng),
+    }
+
+
+def one_line(parts):
+    street, city, state, zip_code = parts
+    return f"{street}, {city}, {state} {zip_code}"
+
+
+def page(body, script=""):
+    return f"<!DOCTYPE html><html><head><title>Mock portal</title></head><body>{body}<script>{script}</script></body></html>"
+
+
+# --- CA: React-like page; the advanced search renders the table, each row's button fills the sidebar ---
+
+CA_COLUMNS = ["File Number", "UCC Type", "Debtor Information", "Secured Party Information", "Status",
+              "Filing Date", "Lapse Date"]
+
+CA_SCRIPT = """
+const FILINGS = %s;
+const COLUMNS = %s;
+const main = document.querySelector('main');
+document.getElementById('advanced').onclick = () => { main.children[1].style.display = 'block'; };
+let term = '';
+document.querySelector('.advanced-search-button').onclick = () => {
+    term = main.querySelector('form input').value;
+    const rows = FILINGS.map((f, i) => '<tr><td><div class="row-button" data-row="' + i + '">' + f[0] + '</div></td>'
+        + '<td>' + f[1] + '</td><td>' + f[2] + '</td><td>' + term + '</td>'
+        + f.slice(4, COLUMNS.length).map(v => '<td>' + v + '</td>').join('') + '</tr>');
+    main.children[2].innerHTML = '<table><thead><tr>' + COLUMNS.map(c => '<th>' + c + '</th>').join('')
+        + '</tr></thead><tbody>' + rows.join('') + '</tbody></table>';
+};
+main.children[2].onclick = (event) => {
+    const button = event.target.closest('.row-button');
+    if (!button) return;
+    const f = FILINGS[+button.dataset.row];
+    const fields = [['Debtor Name', f[2]], ['Debtor Address', f[7]], ['Secured Party Name', term],
+                    ['Secured Party Address', f[8]], ['Filing Type', f[1]]];
+    main.children[4].innerHTML = '<div><div>Filing ' + f[0] + '</div><div><div><div><table><tbody>'
+        + fields.map(([k, v]) => '<tr><td>' + k + '</td><td>' + v + '</td></tr>').join('')
+        + '</tbody></table></div></div></div></div>';
+};
+"""
+
+
+def ca_search_page(size):
+    rows = []
+    for i in range(size):
+        f = filing(i)
+        # The secured party is whatever name was searched for (column 3 is filled in by the page)
+        rows.append([f["number"], "Financing Statement", f["debtor"], "", "Active", f["date"],
+                     f["lapse"], one_line(f["debtor_address"]), one_line(f["secured_party_address"])])
+    body = (
+        '<div id="root"><div><div><div><main>'
+        # main/div[1]: the basic search, its div[3] holding the form and the advanced search toggle
+        '<div><div></div><div></div><div>'
+        '<div><form onsubmit="return false"><input type="text"></form></div>'
+        '<div><button type="button" id="advanced">Advanced</button></div>'
+        '</div></div>'
+        # main/div[2]: advanced search, hidden until toggled
+        '<div style="display:none">'
+        '<select id="field-STATUS"><option value="">All</option><option value="ACTIVE">Active</option></select>'
+        '<input type="text" id="field-date-FILING_DATEs">'
+        '<button type="button" class="advanced-search-button">Search</button>'
+        '</div>'
+        # main/div[3]: results table; main/div[5]: sidebar
+        '<div></div><div></div><div></div>'
+        '</main></div></div></div></div>'
+    )
+    return page(body, CA_SCRIPT % (json.dumps(rows), json.dumps(CA_COLUMNS)))
+
+
+# --- AL: nested layout tables, a form posting to the results page, plain detail pages ---
+
+AL_COLUMNS = ["File Number", "Filing Date", "Lapse Date", "Filing Type", "Debtor Name", "Debtor Address",
+              "Secured Party", "Secured Party Address"]
+
+
+def al_search_page():
+    rows = ["<tr><td>&nbsp;</td></tr>"] * 30
+    rows[11] = ('<tr><td>Filer type</td><td><input type="radio" name="filerType" value="D">'
+                '<input type="radio" name="filerType" value="B"><input type="radio" name="filerType" value="S"></td></tr>')
+    rows[12] = ('<tr><td>Entry type</td><td><input type="radio" name="entryType" value="I">'
+                '<input type="radio" name="entryType" value="O"><input type="radio" name="entryType" value="A"></td></tr>')
+    rows[18] = ('<tr><td>Search option</td><td><input type="radio" name="option" value="exact">'
+                '<input type="radio" name="option" value="starts"></td></tr>')
+    rows[21] = '<tr><td>Name</td><td><input type="text" name="name"></td></tr>'
+    rows[23] = '<tr><td colspan="2"><input type="submit" value="Continue"><input type="reset" value="Clear"></td></tr>'
+    layout = ["<tr><td>&nbsp;</td></tr>"] * 8
+    layout[6] = ('<tr><td><form method="get" action="SearchResults.do"><table>'
+                 '<tr><td>Search</td></tr><tr><td></td></tr><tr><td></td></tr>'
+                 f'<tr><td><table>{"".join(rows)}</table></td></tr>'
+                 '</table></form></td></tr>')
+    return page(f'<table><tr><td><table>{"".join(layout)}</table></td></tr></table>')
+
+
+def al_results_page(size):
+    links = "".join(f'<tr><td><a href="SearchDetail.do?id={i}">{filing(i)["number"]}</a></td></tr>' for i in range(size))
+    return page(f"<table><tr><td><table>{links}</table></td></tr></table>")
+
+
+def al_detail_page(detail_id):
+    f = filing(int(detail_id))
+    values = [f["number"], f["date"], f["lapse"], "UCC-1", f["debtor"], one_line(f["debtor_address"]),
+              f["secured_party"], one_line(f["secured_party_address"])]
+    table = ("<tr>" + "".join(f"<th>{c}</th>" for c in AL_COLUMNS) + "</tr>"
+             "<tr>" + "".join(f"<td>{html.escape(v)}</td>" for v in values) + "</tr>")
+    layout = ["<tr><td>&nbsp;</td></tr>"] * 6
+    layout[5] = f"<tr><td><table>{table}</table></td></tr>"
+    return page(f'<table><tr><td><table>{"".join(layout)}</table></td></tr></table>')
+
+
+# --- WV: search terms added one by one, a bootstrap-style date picker, one combined results table ---
+
+# The header row has no cell over the filing number column
+WV_HEADERS = ["", "Type", "Debtor", "Secured Party", "Filing Date", "Status"]
+
+WV_SCRIPT = """
+const SIZE = %d;
+const HEADERS = %s;
+const MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+                'October', 'November', 'December'];
+let shown = new Date();
+shown.setDate(1);
+const picker = document.querySelector('.datepicker');
+function renderPicker() {
+    document.querySelector('.datepicker-switch').textContent = MONTHS[shown.getMonth()] + ' ' + shown.getFullYear();
+    const first = shown.getDay();
+    const days = new Date(shown.getFullYear(), shown.getMonth() + 1, 0).getDate();
+    const previous = new Date(shown.getFullYear(), shown.getMonth(), 0).getDate();
+    let cells = [];
+    for (let i = first - 1; i >= 0; i--) cells.push('<td class="old day">' + (previous - i) + '</td>');
+    for (let d = 1; d <= days; d++) cells.push('<td class="day" data-day="' + d + '">' + d + '</td>');
+    let weeks = [];
+    for (let i = 0; i < cells.length; i += 7) weeks.push('<tr>' + cells.slice(i, i + 7).join('') + '</tr>');
+    document.querySelector('.datepicker-days tbody').innerHTML = weeks.join('');
+}
+document.getElementById('txtFromDate').onclick = () => { picker.style.display = 'block'; renderPicker(); };
+document.querySelector('.datepicker-days .prev').onclick = () => { shown.setMonth(shown.getMonth() - 1); renderPicker(); };
+document.querySelector('.datepicker-days .next').onclick = () => { shown.setMonth(shown.getMonth() + 1); renderPicker(); };
+document.querySelector('.datepicker-days tbody').onclick = (event) => {
+    const cell = event.target.closest('td.day');
+    if (!cell || !cell.dataset.day) return;
+    document.getElementById('txtFromDate').value = (shown.getMonth() + 1) + '/' + cell.dataset.day + '/' + shown.getFullYear();
+    picker.style.display = 'none';
+};
+const terms = document.querySelector('#tblSearchTermResults tbody');
+const results = document.querySelector('#search table');
+results.innerHTML = '<tr>' + HEADERS.map(h => '<th>' + h + '</th>').join('') + '</tr>';
+document.querySelector('#SearchTerms form button').onclick = () => {
+    const term = document.getElementById('searchTerm').value;
+    const row = document.createElement('tr');
+    row.innerHTML = '<td>' + term + '</td><td><button type="button">Search</button></td>';
+    row.querySelector('button').onclick = () => {
+        row.remove();
+        const today = new Date();
+        let rows = [];
+        for (let i = 0; i < SIZE; i++) {
+            const filed = new Date(today.getFullYear(), today.getMonth(), today.getDate() - (i %% 7));
+            const date = String(filed.getMonth() + 1).padStart(2, '0') + '/' + String(filed.getDate()).padStart(2, '0')
+                + '/' + filed.getFullYear();
+            rows.push('<tr><td><input type="checkbox"></td><td>' + (26000000 + i) + '</td><td>UCC-1</td><td>DEBTOR ' + i
+                + ' LLC</td><td>' + term + '</td><td>' + date + '</td><td>Active</td></tr>');
+        }
+        results.insertAdjacentHTML('beforeend', rows.join(''));
+    };
+    terms.appendChild(row);
+};
+"""
+
+
+def wv_search_page(size):
+    body = (
+        '<div id="SearchTerms">'
+        '<div><div><a href="#" onclick="return false">Debtor Search</a>'
+        '<a href="#" onclick="return false">Secured Party Search</a></div></div>'
+        '<div><div><form onsubmit="return false"><input type="text" id="searchTerm">'
+        '<button type="button">Add</button></form></div></div>'
+        '</div>'
+        '<div id="SearchOptions"><div><label><input type="radio" name="match"> Exact</label></div></div>'
+        '<input type="text" id="txtFromDate">'
+        '<div class="datepicker" style="display:none"><div class="datepicker-days"><table>'
+        '<thead><tr><th class="prev">&laquo;</th><th class="datepicker-switch" colspan="5"></th>'
+        '<th class="next">&raquo;</th></tr></thead><tbody></tbody></table></div></div>'
+        '<table id="tblSearchTermResults"><tbody></tbody></table>'
+        '<div id="search"><div></div><div><div><div><div><table></table></div></div></div></div></div>'
+    )
+    return page(body, WV_SCRIPT % (size, json.dumps(WV_HEADERS)))
+
+
+class MockPortals:
+    """Answers the browser's and the HTTP session's requests for the mocked portals.
+
+    Plugs into the same slots as ``ucc.replay.Replayer``: ``handle`` is the
+    browser route handler and ``send`` serves requests sessions.
+    """
+
+    def __init__(self, size, latency=0.0):
+        self.size = size
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def respond(self, method, url):
+        """(status, body) for one request; 404 for anything the mocks do not know."""
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        path = parts.path
+        body = None
+        if parts.netloc == CA_HOST and path == "/search/ucc":
+            body = ca_search_page(self.size)
+        elif parts.netloc == AL_HOST and path.endswith("/NewSearch.do"):
+            body = al_search_page()
+        elif parts.netloc == AL_HOST and path.endswith("/SearchResults.do"):
+            body = al_results_page(self.size)
+        elif parts.netloc == AL_HOST and path.endswith("/SearchDetail.do") and query.get("id", [""])[0].isdigit():
+            body = al_detail_page(query["id"][0])
+        elif parts.netloc == WV_HOST and path == "/SOS/UCC/Search":
+            body = wv_search_page(self.size)
+        with self.lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if body is None:
+            return 404, b""
+        return 200, body.encode("utf-8")
+
+    async def handle(self, route):
+        request = route.request
+        status, body = self.respond(request.method, request.url)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        await route.fulfill(status=status, headers={"Content-Type": "text/html; charset=utf-8"}, body=body)
+
+    def send(self, adapter, request, **kwargs):
+        status, body = self.respond(request.method, request.url)
+        if self.latency:
+            time.sleep(self.latency)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = status
+        response._content = body
+        response.headers = CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+        response.encoding = "utf-8"
+        return response
+
+
+def slope(points):
+    """Least-squares slope of log(seconds) against log(size)."""
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if size > 0 and seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def plot(results, path):
+    # Optional dependency: without matplotlib there is only the table and the CSV
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+    fig, (time_ax, memory_ax) = plt.subplots(1, 2, figsize=(12, 5))
+    for state in sorted({r["state"] for r in results}):
+        rows = [r for r in results if r["state"] == state and r["filings"]]
+        sizes = [r["size"] for r in rows]
+        time_ax.plot(sizes, [r["ms_per_filing"] for r in rows], marker="o", label=state)
+        memory_ax.plot(sizes, [r["kb_per_filing"] for r in rows], marker="o", label=state)
+    for ax, label in ((time_ax, "ms per filing"), (memory_ax, "peak KiB per filing")):
+        ax.set_xscale("log")
+        ax.set_xlabel("results per search")
+        ax.set_ylabel(label)
+        ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return True
+
+
+def scale(states, sizes=DEFAULT_SIZES, workers=1, profile=None, output="scale.csv"):
+    """Run each state against the mocks at each size; print, save (CSV, PNG) and return the results."""
+    from ucc.ratelimit import RateLimits, use_limits
+
+    use_limits(RateLimits(UNLIMITED))
+    scale_pauses(0)
+    results = []
+    try:
+        for state in states:
+            for size in sizes:
+                portals = MockPortals(size)
+                tracemalloc.start()
+                try:
+                    with serving(portals):
+                        filings, elapsed, commands = run_state(state, workers, profile, names=[SCALE_NAME],
+                                                               replayer=portals)
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+                per = max(filings, 1)
+                results.append({
+                    "state": state, "size": size, "filings": filings, "seconds": round(elapsed, 3),
+                    "ms_per_filing": round(1000 * elapsed / per, 3), "peak_kb": round(peak / 1024, 1),
+                    "kb_per_filing": round(peak / 1024 / per, 3), "commands_per_filing": round(commands / per, 2),
+                    "misses": portals.misses,
+                })
+                print(f"[{state}] {size} results: {filings} filings in {elapsed:.1f}s")
+    finally:
+        scale_pauses(1.0)
+
+    print(f"\n{'State':<6}{'Size':>7}{'Filings':>9}{'Seconds':>9}{'ms/filing':>11}{'KiB/filing':>12}{'Cmd/filing':>12}")
+    for r in results:
+        print(f"{r['state']:<6}{r['size']:>7}{r['filings']:>9}{r['seconds']:>9.1f}{r['ms_per_filing']:>11.2f}"
+              f"{r['kb_per_filing']:>12.2f}{r['commands_per_filing']:>12.1f}")
+    for state in states:
+        fitted = slope([(r["size"], r["seconds"]) for r in results if r["state"] == state])
+        if fitted is not None:
+            verdict = "super-linear" if fitted > SUPERLINEAR_SLOPE else "linear"
+            print(f"{state}: time grows as size^{fitted:.2f} ({verdict})")
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]) if results else ["state"])
+        writer.writeheader()
+        writer.writerows(results)
+    chart = output.rsplit(".", 1)[0] + ".png"
+    print(f"Results written to {output}" + (f" and {chart}" if plot(results, chart) else ""))
+    return results
@@ -0,0 +1,61 @@
+"""CSV output shared by the state scrapers. Rows arrive as ``UCCFiling`` records."""
+import csv
+import threading
+
+
+class CsvSink:
+    """Fixed header, rows written as soon as they are produced."""
+
+    def __init__(self, path, header):
+        self.path = path
+        self.lock = threading.Lock()
+        self.count = 0
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+
+    def write(self, filing):
+        row = filing.to_row()
+        with self.lock:
+            self.writer.writerow(row)
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class DictCsvSink:
+    """Columns only known at the end (they depend on what the portal returned): filings are held until close.
+
+    Holding ``UCCFiling`` records rather than dicts keeps a full day of rows small.
+    """
+
+    def __init__(self, path, columns_for):
+        self.path = path
+        self.columns_for = columns_for
+        self.lock = threading.Lock()
+        self.rows = []
+        self.keys = {}
+        self.layouts = set()
+
+    @property
+    def count(self):
+        return len(self.rows)
+
+    def write(self, filing):
+        with self.lock:
+            self.rows.append(filing)
+            if filing.layout not in self.layouts:
+                self.layouts.add(filing.layout)
+                for key in filing.layout.columns:
+                    self.keys.setdefault(key, None)
+
+    def close(self):
+        with self.lock:
+            if not self.rows:
+                return
+            with open(self.path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=self.columns_for(list(self.keys)), extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(filing.to_dict() for filing in self.rows)
@@ -0,0 +1,284 @@
+"""Async Playwright engine behind the Selenium-style driver the state scrapers already use.
+
+One Chromium process and one asyncio loop (on a background thread) serve every
+worker. Each leased "driver" is an isolated browser context whose pages are
+driven through ``asyncio.run_coroutine_threadsafe``, so the scrapers keep their
+synchronous ``driver.find_element(...)`` code while dozens of contexts share a
+single browser.
+"""
+import asyncio
+import re
+import threading
+from fnmatch import fnmatch
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import async_playwright
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from ucc import cache
+from ucc.browser import PROFILES, DEFAULT_PROFILE, BrowserPool
+from ucc.trace import current_tags
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# Selenium's execute_script takes a function body that reads ``arguments``
+SCRIPT_WRAPPER = "(args) => (function () { %s }).apply(null, args)"
+
+# WebElement.get_attribute prefers the DOM property (absolute href, live value) over the attribute
+GET_ATTRIBUTE_JS = """(el, name) => {
+    const value = el[name];
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return String(value);
+    }
+    return el.getAttribute(name);
+}"""
+
+
+# Playwright cannot click an <option> of a closed <select>; Selenium selects it instead
+OPTION_LOCATOR = re.compile(r"\boption(\[[^\]]*\])?$")
+SELECT_OPTION_JS = """el => {
+    el.selected = true;
+    const select = el.closest('select');
+    if (select) {
+        select.dispatchEvent(new Event('input', {bubbles: true}));
+        select.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+}"""
+OPTION_DISPLAYED_JS = """el => {
+    const select = el.closest('select');
+    return !!select && select.getClientRects().length > 0;
+}"""
+
+
+def is_option_locator(by, value):
+    return by in (By.XPATH, By.CSS_SELECTOR, By.TAG_NAME) and OPTION_LOCATOR.search(value) is not None
+
+
+def selector(by, value):
+    if by == By.ID:
+        return f'[id="{value}"]'
+    if by == By.XPATH:
+        return f"xpath={value}"
+    if by == By.CLASS_NAME:
+        return f".{value}"
+    if by in (By.TAG_NAME, By.CSS_SELECTOR):
+        return value
+    if by == By.NAME:
+        return f'[name="{value}"]'
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+class PlaywrightEngine:
+    """The shared browser process and the event loop that drives it."""
+
+    def __init__(self, profile=None, recorder=None, replayer=None):
+        self.profile = profile or PROFILES[DEFAULT_PROFILE]
+        # ucc.replay hooks: keep every response, or answer every request from the archive
+        self.recorder = recorder
+        self.replayer = replayer
+        # Round trips to the browser per state, for the benchmarks
+        self.commands = {}
+        self.commands_lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="playwright-loop", daemon=True)
+        self.thread.start()
+        self.playwright = self.call(async_playwright().start())
+        self.browser = self.call(self.playwright.chromium.launch(
+            headless=self.profile.headless,
+            args=["--no-sandbox", "--disable-dev-shm-usage"],
+        ))
+
+    def call(self, coro):
+        """Run ``coro`` on the engine loop and block the calling worker thread until it is done."""
+        state = current_tags().get("state")
+        with self.commands_lock:
+            self.commands[state] = self.commands.get(state, 0) + 1
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _new_context(self):
+        context = await self.browser.new_context(viewport={"width": 1920, "height": 1080})
+        response_cache = cache.active()
+        if response_cache is not None:
+            # Handlers run newest first: registered first, the cache only sees what is not blocked
+            await context.route("**/*", response_cache.handle)
+        patterns = self.profile.blocked_urls()
+        if patterns:
+            blocked_types = set(BLOCKED_RESOURCE_TYPES)
+            if self.profile.block_stylesheets:
+                blocked_types.add("stylesheet")
+
+            async def block(route):
+                request = route.request
+                if request.resource_type in blocked_types or any(fnmatch(request.url, p) for p in patterns):
+                    await route.abort()
+                else:
+                    await route.fallback()
+
+            await context.route("**/*", block)
+        if self.replayer is not None:
+            # Registered last, so it sees requests first
+            await context.route("**/*", self.replayer.handle)
+        if self.recorder is not None:
+            context.on("response", self.recorder.on_response)
+        await context.new_page()
+        return context
+
+    def new_driver(self, profile=None, slot=0):
+        return PlaywrightDriver(self, self.call(self._new_context()))
+
+    def close(self):
+        try:
+            self.call(self.browser.close())
+            self.call(self.playwright.stop())
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=10)
+
+
+class PlaywrightElement:
+    """The WebElement subset the scrapers use, over an ElementHandle."""
+
+    def __init__(self, driver, handle, option=False):
+        self.driver = driver
+        self.handle = handle
+        self.option = option
+
+    def _call(self, coro):
+        try:
+            return self.driver.engine.call(coro)
+        except PlaywrightError as e:
+            if "not attached" in str(e) or "detached" in str(e):
+                raise StaleElementReferenceException(str(e)) from e
+            raise
+
+    @property
+    def text(self):
+        return self._call(self.handle.inner_text())
+
+    def get_attribute(self, name):
+        return self._call(self.handle.evaluate(GET_ATTRIBUTE_JS, name))
+
+    def click(self):
+        if self.option:
+            self._call(self.handle.evaluate(SELECT_OPTION_JS))
+        else:
+            self._call(self.handle.click())
+
+    def clear(self):
+        self._call(self.handle.fill(""))
+
+    def send_keys(self, text):
+        self._call(self.handle.type(text))
+
+    def is_displayed(self):
+        if self.option:
+            return self._call(self.handle.evaluate(OPTION_DISPLAYED_JS))
+        return self._call(self.handle.is_visible())
+
+    def is_enabled(self):
+        return self._call(self.handle.is_enabled())
+
+    def find_element(self, by, value):
+        found = self._call(self.handle.query_selector(selector(by, value)))
+        if found is None:
+            raise NoSuchElementException(f"{by}={value}")
+        return PlaywrightElement(self.driver, found, is_option_locator(by, value))
+
+    def find_elements(self, by, value):
+        option = is_option_locator(by, value)
+        return [PlaywrightElement(self.driver, h, option)
+                for h in self._call(self.handle.query_selector_all(selector(by, value)))]
+
+
+class SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.page = self.driver.context.pages[int(handle)]
+
+
+class PlaywrightDriver:
+    """The WebDriver subset the scrapers use, over one browser context."""
+
+    def __init__(self, engine, context):
+        self.engine = engine
+        self.context = context
+        self.page = context.pages[0]
+        self.switch_to = SwitchTo(self)
+
+    def _call(self, coro):
+        return self.engine.call(coro)
+
+    def get(self, url):
+        self._call(self.page.goto(url, wait_until="domcontentloaded" if self.engine.profile.eager else "load"))
+
+    def refresh(self):
+        self._call(self.page.reload())
+
+    def back(self):
+        self._call(self.page.go_back())
+
+    @property
+    def current_url(self):
+        return self.page.url
+
+    @property
+    def title(self):
+        return self._call(self.page.title())
+
+    @property
+    def page_source(self):
+        return self._call(self.page.content())
+
+    @property
+    def window_handles(self):
+        return [str(i) for i in range(len(self.context.pages))]
+
+    def find_element(self, by, value):
+        found = self._call(self.page.query_selector(selector(by, value)))
+        if found is None:
+            raise NoSuchElementException(f"{by}={value}")
+        return PlaywrightElement(self, found, is_option_locator(by, value))
+
+    def find_elements(self, by, value):
+        option = is_option_locator(by, value)
+        return [PlaywrightElement(self, h, option) for h in self._call(self.page.query_selector_all(selector(by, value)))]
+
+    def execute_script(self, script, *args):
+        args = [a.handle if isinstance(a, PlaywrightElement) else a for a in args]
+        return self._call(self.page.evaluate(SCRIPT_WRAPPER % script, args))
+
+    def get_cookies(self):
+        return self._call(self.context.cookies())
+
+    def add_cookie(self, cookie):
+        cookie = dict(cookie)
+        if "expiry" in cookie:
+            cookie["expires"] = cookie.pop("expiry")
+        self._call(self.context.add_cookies([cookie]))
+
+    def maximize_window(self):
+        pass
+
+    def close(self):
+        """Close the current tab, like WebDriver.close()."""
+        self._call(self.page.close())
+
+    def quit(self):
+        self._call(self.context.close())
+
+
+class PlaywrightPool(BrowserPool):
+    """BrowserPool whose drivers are contexts of one shared Playwright browser."""
+
+    def __init__(self, size, profile=None, **engine_options):
+        self.engine = PlaywrightEngine(profile, **engine_options)
+        super().__init__(size, profile=profile, factory=self.engine.new_driver)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.engine.close()
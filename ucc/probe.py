@@ -0,0 +1,105 @@
+"""Zero-result fast path: move on as soon as a search's outcome shows.
+
+Most names have nothing in a given state, yet the scrapers used to sit out
+their whole wait after every search: a fixed pause (KY 15s, MA and AL 10s) or
+the full timeout for a results table that never comes (CA 10s, AZ 15s).
+``ResultProbe.search`` submits the search and then polls for either the
+results or the portal's "no records" marker, and returns as soon as one
+shows, with the old wait as the limit.
+
+A marker only counts if it appeared after the search was submitted, so a
+disclaimer that is always on the page cannot pass for an empty result. The
+results locator wins over a text marker that shows at the same time, but not
+over a portal's own empty-result element (AZ's grid has a "no records" row).
+At the end of a run each state reports how much of the old waits it skipped.
+
+The submit and the wait for its outcome count as one request against the
+portal's limit (``LimitedDriver.limited``), so a search waits for a token like
+a navigation does and a challenge or error page it brings slows the portal down.
+"""
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from ucc.browser import TracedWait
+
+POLL = 0.25
+# Lower-case text a portal shows instead of an empty results table
+NO_RESULTS_TEXT = ("no results found", "no records found", "no records to display", "no matching records",
+                   "returned no results", "0 results found", "no filings found")
+
+PAGE_TEXT_JS = """
+return [document.readyState, document.body ? document.body.innerText.toLowerCase() : ''];
+"""
+
+
+class ResultProbe:
+    """One state's searches: what they found and how much waiting the fast path skipped."""
+
+    def __init__(self, state, markers=NO_RESULTS_TEXT):
+        self.state = state
+        self.markers = markers
+        self.lock = threading.Lock()
+        self.counts = {"results": 0, "empty": 0, "timeout": 0}
+        self.saved = {"results": 0.0, "empty": 0.0}
+
+    def _showing(self, driver, empty):
+        """The empty-result locators and text markers on the current page, or None while it is still loading."""
+        ready, text = driver.execute_script(PAGE_TEXT_JS)
+        if ready == "loading":
+            return None
+        located = {locator for locator in empty if driver.find_elements(*locator)}
+        return located, {marker for marker in self.markers if marker in text}
+
+    def search(self, driver, submit, results, empty=(), pause=None, timeout=None):
+        """Call ``submit`` and wait for ``results`` (a locator) or a no-results marker.
+
+        Give the wait the search used to have: ``pause`` for a fixed sleep,
+        ``timeout`` for a wait on the results table. Returns True when results
+        showed, False when the portal said there are none, and None when
+        neither showed in time.
+        """
+        empty = list(empty)
+        located_before, markers_before = self._showing(driver, empty) or (set(), set())
+        start = None
+
+        def outcome(d):
+            showing = self._showing(d, empty)
+            if showing is None:
+                return None
+            located, markers = showing
+            # The portal's own empty-result element is decisive, even inside an (empty) results table
+            if located - located_before:
+                return "empty"
+            if d.find_elements(*results):
+                return "results"
+            return "empty" if markers - markers_before else None
+
+        def submit_and_wait():
+            nonlocal start
+            submit()
+            start = time.monotonic()
+            return TracedWait(driver, pause or timeout, poll_frequency=POLL).until(outcome)
+
+        try:
+            found = driver.limited(submit_and_wait)
+        except TimeoutException:
+            found = "timeout"
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.counts[found] += 1
+            # A timeout was only ever spent in full when nothing came; a fixed pause always was
+            if found == "empty" or (found == "results" and pause):
+                self.saved[found] += max(0.0, (pause or timeout) - elapsed)
+        return None if found == "timeout" else found == "results"
+
+    def report(self):
+        with self.lock:
+            counts, saved = dict(self.counts), dict(self.saved)
+        searches = sum(counts.values())
+        if not searches:
+            return
+        print(f"[{self.state}] {searches} searches: {counts['results']} with results, {counts['empty']} empty, "
+              f"{counts['timeout']} undecided; fast path saved {saved['empty']:.0f}s on empty searches"
+              f" and {saved['results']:.0f}s on the rest")
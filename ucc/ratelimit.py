@@ -0,0 +1,300 @@
+"""Per-portal rate limiting shared by every browser and HTTP fetch path.
+
+Limits live in rate_limits.json at the repository root: a token bucket
+(``rate`` requests/sec, ``burst``) plus a cap on requests in flight, per host.
+Within those ceilings an AIMD controller adapts each portal during the run:
+concurrency and rate creep up while responses are fast and clean, and are
+halved on a timeout, HTTP 429/503 or a challenge page. The live values are
+exported to rate_limits_state.json.
+
+In a browser, navigations take a ticket themselves, and so does anything run
+through ``LimitedDriver.limited``: search submits (see ucc.probe) and grid
+postbacks, which are a portal's heaviest requests. The page such a request
+leaves is checked for a challenge, throttling or a server error, since the
+browser does not expose the status code.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from ucc.trace import span
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(REPO_ROOT, "rate_limits.json")
+STATE_FILE = os.path.join(REPO_ROOT, "rate_limits_state.json")
+EXPORT_INTERVAL = 5.0
+
+DEFAULT_LIMIT = {"rate": 1.0, "burst": 1, "max_in_flight": 2, "target_latency": 10.0, "min_rate": 0.05,
+                 "start_in_flight": 1}
+
+# Outcomes that mean "slow down": the portal is overloaded or pushing back
+BACKOFF_OUTCOMES = {"timeout", "throttled", "challenge", "error"}
+CHALLENGE_TITLES = ("just a moment", "attention required", "checking your browser", "access denied")
+THROTTLED_TITLES = ("too many requests", "service unavailable", "rate limit")
+ERROR_TITLES = ("internal server error", "server error in", "runtime error", "bad gateway", "gateway timeout",
+                "a timeout occurred", "web server is down")
+EWMA_WEIGHT = 0.2
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Ticket:
+    """Outcome of one request; the caller downgrades it when the response says so."""
+
+    def __init__(self):
+        self.outcome = "ok"
+
+    def check_response(self, response):
+        if response.status_code in (429, 503):
+            self.outcome = "throttled"
+        elif response.status_code >= 500:
+            self.outcome = "error"
+
+
+def classify_exception(e):
+    return "timeout" if "timeout" in type(e).__name__.lower() else "error"
+
+
+class HostLimiter:
+    """Token bucket plus an AIMD-controlled number of concurrent requests for one host."""
+
+    def __init__(self, host, rate, burst, max_in_flight, target_latency, min_rate, on_change=None,
+                 start_in_flight=1):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_in_flight = max_in_flight
+        self.target_latency = target_latency
+        self.on_change = on_change
+        # Start at one request in flight (by default) and earn more
+        self.concurrency = float(min(start_in_flight, max_in_flight))
+        self.in_flight = 0
+        self.latency = None
+        self.counts = {}
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def request(self):
+        with span("queue"), self.cond:
+            while self.in_flight >= int(self.concurrency):
+                self.cond.wait()
+            self.in_flight += 1
+        ticket = Ticket()
+        start = None
+        try:
+            with span("throttle"):
+                self.bucket.acquire()
+            start = time.monotonic()
+            yield ticket
+        except Exception as e:
+            ticket.outcome = classify_exception(e)
+            raise
+        finally:
+            elapsed = time.monotonic() - start if start is not None else 0.0
+            with self.cond:
+                self.in_flight -= 1
+                self._record(ticket.outcome, elapsed)
+                self.cond.notify_all()
+            if self.on_change:
+                self.on_change()
+
+    def _record(self, outcome, elapsed):
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        if outcome == "ok":
+            self.latency = elapsed if self.latency is None else (1 - EWMA_WEIGHT) * self.latency + EWMA_WEIGHT * elapsed
+        before = (self.concurrency, self.bucket.rate)
+        if outcome in BACKOFF_OUTCOMES:
+            # Multiplicative decrease
+            self.concurrency = max(1.0, self.concurrency / 2)
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+        elif self.latency is not None and self.latency > self.target_latency:
+            # Healthy but slow: hold the rate, give back a little concurrency
+            self.concurrency = max(1.0, self.concurrency * 0.8)
+        else:
+            # Additive increase: about one more request in flight per window of successes
+            self.concurrency = min(float(self.max_in_flight), self.concurrency + 1 / self.concurrency)
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate / 10)
+        if outcome in BACKOFF_OUTCOMES and before != (self.concurrency, self.bucket.rate):
+            print(f"[limits] {self.host}: {outcome}, concurrency {before[0]:.1f} -> {self.concurrency:.1f}, "
+                  f"rate {before[1]:.2f} -> {self.bucket.rate:.2f}/s")
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                "concurrency": round(self.concurrency, 2),
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "rate": round(self.bucket.rate, 3),
+                "max_rate": self.max_rate,
+                "latency_ewma": None if self.latency is None else round(self.latency, 3),
+                "outcomes": dict(self.counts),
+            }
+
+
+class RateLimits:
+    def __init__(self, config):
+        self.default = dict(DEFAULT_LIMIT, **config.get("default", {}))
+        self.hosts = config.get("hosts", {})
+        self.limiters = {}
+        self.lock = threading.Lock()
+        self.last_export = 0.0
+
+    @classmethod
+    def load(cls, path=CONFIG_FILE):
+        if not os.path.exists(path):
+            return cls({})
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def for_host(self, host):
+        with self.lock:
+            limiter = self.limiters.get(host)
+            if limiter is None:
+                limit = dict(self.default, **self.hosts.get(host, {}))
+                limiter = HostLimiter(host, limit["rate"], limit["burst"], limit["max_in_flight"],
+                                      limit["target_latency"], limit["min_rate"], on_change=self.maybe_export,
+                                      start_in_flight=limit["start_in_flight"])
+                self.limiters[host] = limiter
+            return limiter
+
+    def for_url(self, url):
+        return self.for_host(urlsplit(url).hostname or "")
+
+    def snapshot(self):
+        with self.lock:
+            limiters = list(self.limiters.values())
+        return {limiter.host: limiter.snapshot() for limiter in limiters}
+
+    def export(self, path=STATE_FILE):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def maybe_export(self):
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_export < EXPORT_INTERVAL:
+                return
+            self.last_export = now
+        self.export()
+
+    def report(self):
+        print(f"{'Host':<32}{'Conc':>6}{'Max':>5}{'Rate/s':>8}{'Latency':>9}  Outcomes")
+        for host, snap in sorted(self.snapshot().items()):
+            latency = "-" if snap["latency_ewma"] is None else f"{snap['latency_ewma']:.2f}s"
+            outcomes = ", ".join(f"{k}={v}" for k, v in sorted(snap["outcomes"].items()))
+            print(f"{host:<32}{snap['concurrency']:>6.1f}{snap['max_in_flight']:>5}{snap['rate']:>8.2f}{latency:>9}  {outcomes}")
+
+
+_limits = None
+_limits_lock = threading.Lock()
+
+
+def limits():
+    """Process-wide limits, loaded from rate_limits.json on first use."""
+    global _limits
+    with _limits_lock:
+        if _limits is None:
+            _limits = RateLimits.load()
+        return _limits
+
+
+def use_limits(rate_limits):
+    """Replace the process-wide limits (the offline benchmarks run without any)."""
+    global _limits
+    with _limits_lock:
+        _limits = rate_limits
+
+
+@contextmanager
+def limited(url):
+    """Wait for ``url``'s portal limit; yields a Ticket the caller can mark from the response."""
+    with limits().for_url(url).request() as ticket:
+        yield ticket
+
+
+@contextmanager
+def limited_request(url, params=None, body=None, method="GET"):
+    """``limited`` for an HTTP client call; one the response cache (ucc.cache) will answer is not held back."""
+    # Imported here: the cache needs requests, which the browser-only paths do not
+    from ucc.cache import fresh
+
+    if fresh(method, url, params, body):
+        yield Ticket()
+        return
+    with limited(url) as ticket:
+        yield ticket
+
+
+def is_challenge(title):
+    title = (title or "").lower()
+    return any(marker in title for marker in CHALLENGE_TITLES)
+
+
+def page_outcome(title):
+    """The ticket outcome a page's title calls for ("challenge", "throttled", "error"), or None if it looks fine."""
+    title = (title or "").lower()
+    for outcome, markers in (("challenge", CHALLENGE_TITLES), ("throttled", THROTTLED_TITLES),
+                             ("error", ERROR_TITLES)):
+        if any(marker in title for marker in markers):
+            return outcome
+    return None
+
+
+class LimitedDriver:
+    """Wraps a WebDriver (or the Playwright stand-in) so every navigation waits for, and reports to, its portal's limit."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def limited(self, action, url=None):
+        """Run ``action`` as one request against the portal's limit and return its result.
+
+        For clicks and scripts that make the page send a request, together with
+        the wait for its answer; ``url`` defaults to the page's own.
+        """
+        url = url or self.driver.current_url
+        with limited(url) as ticket, span("navigate", url=url):
+            result = action()
+            ticket.outcome = page_outcome(self.driver.title) or ticket.outcome
+        return result
+
+    def _navigate(self, url, action):
+        self.limited(action, url)
+
+    def get(self, url):
+        self._navigate(url, lambda: self.driver.get(url))
+
+    def refresh(self):
+        self._navigate(self.driver.current_url, self.driver.refresh)
+
+    def back(self):
+        self._navigate(self.driver.current_url, self.driver.back)
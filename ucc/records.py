@@ -0,0 +1,180 @@
+"""``UCCFiling`` and ``Party``: the compact in-memory form of an output row.
+
+Every state names its columns differently, so a row is read through a
+``Layout`` (one per distinct set of columns, shared by all rows that have
+it). The layout maps the columns onto the filing's fields and parties; the
+columns it cannot map are kept positionally in ``extra``. ``to_row`` and
+``to_dict`` give back exactly the columns the row came with.
+
+Both records are NamedTuples: no per-row ``__dict__`` and no repeated keys.
+Values are interned, so what repeats across thousands of rows (state,
+searched name, secured party and its address, status, dates, cities) is held
+once; interned strings are still freed with the last row that uses them.
+Secured parties and filers are shared through a table the caller owns (the
+scraper keeps one per run and drops it in ``finish``), so nothing outlives
+the rows that use it.
+"""
+import sys
+from typing import NamedTuple, Optional, Tuple
+
+# Column names seen in the state outputs, most specific first
+FILING_COLUMNS = {
+    "filing_number": ["Filing Number", "File Number", "filing_number", "Initial Filing Number", "File No"],
+    "filing_date": ["Filing Date", "File Date", "filing_date", "Date Filed"],
+    "lapse_date": ["Lapse Date", "lapse_date"],
+    "status": ["Status"],
+    "filing_type": ["Filing Type", "Document Type", "UCC Type", "Type"],
+    # The name that was searched for (KY and CA record it next to the real parties)
+    "search_name": ["Party Name", "Secured Party Name", "Secured Party", "secured_party_name"],
+    "processed": ["Processed"],
+}
+PARTY_COLUMNS = {
+    "debtor": {
+        "name": ["Debtor Name", "Debtor", "debtor_name"],
+        "street": ["Debtor Street", "Debtor_Street", "Debtor Address"],
+        "city": ["Debtor City", "Debtor_City"],
+        "state": ["Debtor State", "Debtor_State"],
+        "zip": ["Debtor Zip", "Debtor_Zip"],
+    },
+    "secured_party": {
+        "name": ["Secured Party", "Secured Party Name", "secured_party_name"],
+        "street": ["Secured Party Street", "secured_party_address", "Secured Party Address"],
+        "city": ["Secured Party City", "secured_party_city"],
+        "state": ["Secured Party State", "secured_party_state"],
+        "zip": ["Secured Party Zip", "secured_party_zip"],
+    },
+    "filer": {
+        "name": ["Filer"],
+        "street": ["Filer Address"],
+        "city": ["Filer City"],
+        "state": [],
+        "zip": [],
+    },
+}
+ROLES = list(PARTY_COLUMNS)
+
+
+# Secured parties and filers repeat on most rows of a day: one shared Party each
+SHARED_ROLES = {"secured_party", "filer"}
+
+
+def intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def shared_party(party, parties):
+    return party if parties is None else parties.setdefault(party, party)
+
+
+class Party(NamedTuple):
+    name: str
+    street: str = ""
+    city: str = ""
+    state: str = ""
+    zip: str = ""
+
+
+class UCCFiling(NamedTuple):
+    state: str
+    filing_number: str = ""
+    filing_date: str = ""
+    lapse_date: str = ""
+    status: str = ""
+    filing_type: str = ""
+    search_name: str = ""
+    processed: str = ""
+    debtor: Optional[Party] = None
+    secured_party: Optional[Party] = None
+    filer: Optional[Party] = None
+    # Values of ``layout.extra``, in that order
+    extra: Tuple = ()
+    layout: Optional["Layout"] = None
+
+    @classmethod
+    def from_row(cls, state, row, header=None, parties=None):
+        """Read a list row (in ``header`` order) or a dict row; ``parties`` is the table shared parties go in."""
+        if isinstance(row, dict):
+            layout = layout_for(tuple(row))
+            values = list(row.values())
+        else:
+            layout = layout_for(tuple(header))
+            values = row
+        return layout.read(sys.intern(state), values, parties)
+
+    def party(self, role):
+        return getattr(self, role)
+
+    def to_row(self):
+        return [get(self) for get in self.layout.getters]
+
+    def to_dict(self):
+        return dict(zip(self.layout.columns, self.to_row()))
+
+
+class Layout:
+    """Which column feeds which field, for one tuple of column names."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        index = {column: i for i, column in reversed(list(enumerate(columns)))}
+
+        def first(candidates):
+            return next((index[c] for c in candidates if c in index), None)
+
+        self.filing = {field: first(candidates) for field, candidates in FILING_COLUMNS.items()}
+        self.parties = {
+            role: {part: first(candidates) for part, candidates in parts.items()}
+            for role, parts in PARTY_COLUMNS.items()
+        }
+        used = {i for i in self.filing.values() if i is not None}
+        for parts in self.parties.values():
+            used.update(i for i in parts.values() if i is not None)
+        self.extra_indexes = [i for i in range(len(columns)) if i not in used]
+        self.extra = [columns[i] for i in self.extra_indexes]
+        self.getters = self._getters()
+
+    def __reduce__(self):
+        # Pickled (e.g. to a worker process) as its columns; unpickling finds the shared instance
+        return layout_for, (self.columns,)
+
+    def _getters(self):
+        # Reverse of read(): for each column, where its value now lives
+        sources = {}
+        for i, position in enumerate(self.extra_indexes):
+            sources[position] = lambda f, i=i: f.extra[i]
+        for role, parts in self.parties.items():
+            for part, position in parts.items():
+                if position is not None:
+                    sources.setdefault(position, lambda f, role=role, part=part: getattr(f.party(role), part, ""))
+        for field, position in self.filing.items():
+            if position is not None:
+                sources.setdefault(position, lambda f, field=field: getattr(f, field))
+        return [sources[i] for i in range(len(self.columns))]
+
+    def read(self, state, values, parties=None):
+        values = [intern(v) if v is not None else "" for v in values]
+
+        def value(i):
+            return "" if i is None else values[i]
+
+        fields = {field: value(i) for field, i in self.filing.items()}
+        for role, parts in self.parties.items():
+            party = [value(parts[part]) for part in Party._fields]
+            if not any(party):
+                fields[role] = None
+            elif role in SHARED_ROLES:
+                fields[role] = shared_party(Party(*party), parties)
+            else:
+                fields[role] = Party(*party)
+        return UCCFiling(state=state, extra=tuple(values[i] for i in self.extra_indexes), layout=self, **fields)
+
+
+_LAYOUTS = {}
+
+
+def layout_for(columns):
+    """The shared ``Layout`` for these columns (built once per distinct set)."""
+    layout = _LAYOUTS.get(columns)
+    if layout is None:
+        layout = _LAYOUTS.setdefault(columns, Layout(columns))
+    return layout
@@ -0,0 +1,369 @@
+"""Record what the portals send, then benchmark or re-parse offline against it.
+
+    python -m ucc bench record --states AL,CA        # live, once
+    python -m ucc bench replay --states AL,CA --latency 0.2 --pause-scale 0
+    python -m ucc run --engine playwright --archive .replay   # archive every run
+    python -m ucc reparse --states MA,KY --output-dir reparsed
+
+Recording runs the scrapers on the Playwright engine and keeps every response
+the pages received (documents, XHR, scripts, redirects), plus the AL detail
+fetches made with requests. Replay serves those responses back at the same
+URLs by intercepting the browser's and the HTTP session's requests, with
+``latency`` seconds added to each, and no rate limits. It reports filings/sec
+and driver commands (browser round trips) per filing for each state.
+
+A request is matched on method, URL and body first; if the body differs
+(search forms carry today's date) the responses recorded for that method and
+URL are served in their recorded order.
+
+The archive is content-addressed: a body is stored once (zstd-compressed when
+the optional ``zstandard`` package is installed) however often it was fetched,
+and each index line records the state, URL and fetch time. ``reparse`` runs
+the current scrapers against one day of it, one process per state, so a
+parsing fix can be applied to pages already fetched without touching the
+portals: every request is answered from the archive, or with a 404.
+"""
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ucc.cache import DROPPED_HEADERS, CachingAdapter, as_bytes
+from ucc.trace import current_tags, scale_pauses
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ARCHIVE = os.path.join(REPO_ROOT, ".replay")
+
+ZSTD_LEVEL = 10
+
+# Offline nothing needs protecting: every request goes through immediately
+UNLIMITED = {"default": {"rate": 1e9, "burst": 1e9, "max_in_flight": 1000, "start_in_flight": 1000}}
+
+
+def body_digest(data):
+    return hashlib.sha256(data or b"").hexdigest()
+
+
+def zstd():
+    # Optional dependency: without it bodies are stored uncompressed
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def read_index(index_path):
+    if not os.path.exists(index_path):
+        return
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A run killed mid-write leaves a torn last line
+                continue
+
+
+class Archive:
+    """index.jsonl (one line per response) plus content-addressed bodies.
+
+    With ``day`` (YYYY-MM-DD) only the responses fetched that day are served.
+    """
+
+    def __init__(self, directory, day=None):
+        self.directory = directory
+        self.bodies_dir = os.path.join(directory, "bodies")
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.lock = threading.Lock()
+        self.exact = {}
+        self.by_url = {}
+        for entry in read_index(self.index_path):
+            if day is None or entry.get("fetched", "").startswith(day):
+                self._index(entry)
+
+    def _index(self, entry):
+        self.exact.setdefault((entry["method"], entry["url"], entry["request_body"]), []).append(entry)
+        self.by_url.setdefault((entry["method"], entry["url"]), []).append(entry)
+
+    def add(self, method, url, request_body, status, headers, body, state=None):
+        digest = body_digest(body)
+        entry = {
+            "state": state,
+            "fetched": datetime.now().isoformat(timespec="seconds"),
+            "method": method,
+            "url": url,
+            "request_body": body_digest(request_body) if request_body else None,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS},
+            "body": digest,
+        }
+        path = os.path.join(self.bodies_dir, digest)
+        with self.lock:
+            os.makedirs(self.bodies_dir, exist_ok=True)
+            if not os.path.exists(path) and not os.path.exists(path + ".zst"):
+                zstandard = zstd()
+                if zstandard is not None:
+                    with open(path + ".zst", "wb") as f:
+                        f.write(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body or b""))
+                else:
+                    with open(path, "wb") as f:
+                        f.write(body or b"")
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._index(entry)
+
+    def body(self, entry):
+        path = os.path.join(self.bodies_dir, entry["body"])
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        with open(path + ".zst", "rb") as f:
+            return zstd().ZstdDecompressor().decompress(f.read())
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.by_url.values())
+
+
+def latest_day(directory, state):
+    """The last day ``state`` was archived in ``directory``, or None."""
+    days = [entry["fetched"][:10] for entry in read_index(os.path.join(directory, "index.jsonl"))
+            if entry.get("state") == state and entry.get("fetched")]
+    return max(days, default=None)
+
+
+class Recorder:
+    """Adds every response a browser context or HTTP session receives to the archive.
+
+    ``hosts`` maps a portal's host to its state, for the index.
+    """
+
+    def __init__(self, archive, hosts=None):
+        self.archive = archive
+        self.hosts = hosts or {}
+        if zstd() is None:
+            print("⚠️ zstandard is not installed: archived pages are stored uncompressed (pip install zstandard)")
+
+    def state_for(self, url):
+        return self.hosts.get(urlsplit(url).netloc)
+
+    async def on_response(self, response):
+        request = response.request
+        try:
+            body = await response.body()
+        except Exception:
+            # Redirects and aborted loads have no body; keep the status and Location
+            body = b""
+        headers = await response.all_headers()
+        self.archive.add(request.method, request.url, request.post_data_buffer, response.status, headers, body,
+                         state=self.state_for(request.url))
+
+    def send(self, adapter, request, **kwargs):
+        response = HTTPAdapter.send(adapter, request, **kwargs)
+        self.archive.add(request.method, request.url, as_bytes(request.body), response.status_code,
+                         dict(response.headers), response.content, state=self.state_for(request.url))
+        return response
+
+
+class Replayer:
+    """Serves the archive back, each response after ``latency`` seconds."""
+
+    def __init__(self, archive, latency=0.0):
+        self.archive = archive
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.served = {}
+        self.hits = 0
+        self.misses = 0
+
+    def take(self, method, url, request_body):
+        exact_key = (method, url, body_digest(request_body) if request_body else None)
+        with self.lock:
+            for key, entries in ((("exact",) + exact_key, self.archive.exact.get(exact_key)),
+                                 (("url", method, url), self.archive.by_url.get((method, url)))):
+                if entries:
+                    # Successive requests get successive recordings; the last one repeats
+                    index = self.served.get(key, 0)
+                    self.served[key] = index + 1
+                    self.hits += 1
+                    return entries[min(index, len(entries) - 1)]
+            self.misses += 1
+            return None
+
+    async def handle(self, route):
+        request = route.request
+        entry = self.take(request.method, request.url, request.post_data_buffer)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if entry is None:
+            await route.fulfill(status=404, body=b"")
+        else:
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=self.archive.body(entry))
+
+    def send(self, adapter, request, **kwargs):
+        entry = self.take(request.method, request.url, as_bytes(request.body))
+        if self.latency:
+            time.sleep(self.latency)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if entry is None:
+            response.status_code = 404
+            response._content = b""
+            response.headers = CaseInsensitiveDict()
+        else:
+            response.status_code = entry["status"]
+            response._content = self.archive.body(entry)
+            response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+
+# The recorder or replayer (or ucc.mockportal backend) of the current benchmark, if any
+_active = None
+
+
+@contextmanager
+def serving(backend):
+    """Route requests sessions made through ``http_adapter`` to ``backend`` inside the block."""
+    global _active
+    _active = backend
+    try:
+        yield backend
+    finally:
+        _active = None
+
+
+class ArchiveAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        return _active.send(self, request, **kwargs)
+
+
+def http_adapter(**kwargs):
+    """HTTPAdapter for scrapers' requests sessions: recorded or replayed while a benchmark runs,
+    otherwise going through the response cache (ucc.cache) whenever it is enabled."""
+    if _active is not None:
+        return ArchiveAdapter(**kwargs)
+    return CachingAdapter(**kwargs)
+
+
+def work_dir(scraper):
+    """Private copy of the state directory's inputs, so benchmarks leave names, watermarks and links alone.
+
+    What the last live run left for the next (AZ's watermarks) is not copied:
+    the archive holds whole result lists, and a replay should read them all.
+    """
+    directory = tempfile.mkdtemp(prefix=f"ucc-bench-{scraper.state}-")
+    for path in glob.glob(os.path.join(scraper.directory, "*.txt")) + glob.glob(os.path.join(scraper.directory, "*.json")):
+        if os.path.basename(path) not in scraper.run_state_files:
+            shutil.copy(path, directory)
+    scraper.directory = scraper.output_dir = directory
+    return directory
+
+
+def run_state(state, workers, profile, names=None, output_dir=None, run_date=None, **engine_options):
+    """Run one state on a Playwright pool built with ``engine_options``: (filings, seconds, commands).
+
+    The output is thrown away unless ``output_dir`` is given; ``run_date``
+    dates it (AL and WV name their output by day).
+    """
+    # Imported here: the engine and the scrapers need Playwright and Selenium
+    from ucc.playwright_engine import PlaywrightPool
+    from ucc.scraper import get_scraper, run_scrapers
+
+    scraper = get_scraper(state)(run_date=run_date)
+    directory = work_dir(scraper)
+    if names is not None:
+        scraper.names = lambda: names
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        scraper.output_dir = output_dir
+    pool = PlaywrightPool(workers, profile=profile, **engine_options)
+    start = time.perf_counter()
+    try:
+        run_scrapers([scraper], workers=workers, pool=pool, journal_path=os.path.join(directory, "journal.jsonl"),
+                     costs_path=os.path.join(directory, "unit_costs.json"))
+    finally:
+        elapsed = time.perf_counter() - start
+        shutil.rmtree(directory, ignore_errors=True)
+    return scraper.sink.count, elapsed, pool.engine.commands.get(state, 0)
+
+
+def record(states, archive_dir=DEFAULT_ARCHIVE, workers=1, profile=None):
+    from ucc.scraper import get_scraper
+
+    recorder = Recorder(Archive(archive_dir), hosts={urlsplit(get_scraper(s).url).netloc: s for s in states})
+    with serving(recorder):
+        for state in states:
+            filings, elapsed, _ = run_state(state, workers, profile, recorder=recorder)
+            print(f"[{state}] recorded {filings} filings in {elapsed:.1f}s")
+    print(f"{len(recorder.archive)} responses in {archive_dir}")
+
+
+def benchmark(states, archive_dir=DEFAULT_ARCHIVE, latency=0.0, workers=1, profile=None, pause_scale=1.0):
+    from ucc.ratelimit import RateLimits, use_limits
+
+    archive = Archive(archive_dir)
+    if not len(archive):
+        raise SystemExit(f"Nothing recorded in {archive_dir}; run 'python -m ucc bench record' first")
+    use_limits(RateLimits(UNLIMITED))
+    scale_pauses(pause_scale)
+    results = []
+    try:
+        for state in states:
+            with serving(Replayer(archive, latency)) as replayer:
+                filings, elapsed, commands = run_state(state, workers, profile, replayer=replayer)
+            results.append((state, filings, elapsed, commands, replayer.misses))
+    finally:
+        scale_pauses(1.0)
+
+    print(f"\nReplay: latency {latency:.2f}s per response, pauses x{pause_scale:g}, {workers} workers")
+    print(f"{'State':<6}{'Filings':>9}{'Seconds':>9}{'Filings/s':>11}{'Commands':>10}{'Cmd/filing':>12}{'Misses':>8}")
+    for state, filings, elapsed, commands, misses in results:
+        rate = filings / elapsed if elapsed else 0.0
+        per_filing = f"{commands / filings:.1f}" if filings else "-"
+        print(f"{state:<6}{filings:>9}{elapsed:>9.1f}{rate:>11.2f}{commands:>10}{per_filing:>12}{misses:>8}")
+
+
+def reparse_state(state, archive_dir, output_dir, day=None):
+    """Scrape ``state`` from one archived day (default: its latest) into ``output_dir``."""
+    from ucc.ratelimit import RateLimits, use_limits
+
+    day = day or latest_day(archive_dir, state)
+    if day is None:
+        return state, None, 0, 0.0, 0
+    use_limits(RateLimits(UNLIMITED))
+    scale_pauses(0)
+    with serving(Replayer(Archive(archive_dir, day=day))) as replayer:
+        filings, elapsed, _ = run_state(state, 1, None, output_dir=output_dir, run_date=date.fromisoformat(day),
+                                        replayer=replayer)
+    return state, day, filings, elapsed, replayer.misses
+
+
+def reparse(states, archive_dir=DEFAULT_ARCHIVE, output_dir="reparsed", day=None, processes=None):
+    """Regenerate the outputs of ``states`` from the archive, one process (and browser) per state."""
+    with ProcessPoolExecutor(max_workers=processes or len(states)) as executor:
+        futures = [executor.submit(reparse_state, state, archive_dir, output_dir, day) for state in states]
+        results = [future.result() for future in futures]
+
+    print(f"\n{'State':<6}{'Day':>12}{'Filings':>9}{'Seconds':>9}{'Misses':>8}")
+    for state, archived_day, filings, elapsed, misses in results:
+        if archived_day is None:
+            print(f"{state:<6}{'-':>12}  nothing archived")
+        else:
+            print(f"{state:<6}{archived_day:>12}{filings:>9}{elapsed:>9.1f}{misses:>8}")
+    print(f"Outputs written to {output_dir}")
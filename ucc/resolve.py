@@ -0,0 +1,204 @@
+"""Cross-state entity resolution of the parties in the store.
+
+    python -m ucc store resolve               # debtors; needs numpy
+    python -m ucc store resolve --role secured_party --output entities.csv
+
+The same debtor is filed as "MCCAN JOHN C" in one state and "MCCANN, JOHN"
+in another. Comparing every name with every other is quadratic, so names are
+only compared within blocks that share a key:
+
+- the normalized tokens, sorted, without initials ("JOHN MCCANN");
+- the Soundex codes of those tokens, sorted ("J500 M250": MCCAN and MCCANN agree);
+- the ZIP code plus the Soundex of the longest token.
+
+Parties with the same sorted tokens are the same entity outright. Within a
+block the names are scored all at once, as the cosine similarity of their
+character trigram counts, and pairs above ``threshold`` are merged
+(a shared ZIP lowers the bar by ``ZIP_BONUS``). Blocks larger than
+``MAX_BLOCK`` are too generic to say anything (a big ZIP, a common surname)
+and are skipped, which keeps the work close to linear in the number of names.
+
+Each party gets the ID of the entity it belongs to: the lowest party ID in
+its cluster. Party IDs are never reused, so an entity keeps its ID across
+runs unless it merges with an older one. The result goes to the store's
+``party_entities`` table (and to a CSV with ``--output``).
+"""
+import csv
+import re
+import sqlite3
+import time
+
+from ucc.enrich import normalize_name
+from ucc.store import DEFAULT_STORE
+
+DEFAULT_THRESHOLD = 0.85
+ZIP_BONUS = 0.05
+MAX_BLOCK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS party_entities (
+    party_id INTEGER PRIMARY KEY REFERENCES parties (id),
+    entity_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS party_entities_entity ON party_entities (entity_id);
+"""
+
+PARTIES_QUERY = """
+SELECT DISTINCT p.id, p.name, a.zip
+FROM parties p
+JOIN addresses a ON a.id = p.address_id
+JOIN filing_parties fp ON fp.party_id = p.id
+WHERE fp.role = ?
+"""
+
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(["AEIOUYHW", "BFPV", "CGJKQSXZ", "DT", "L", "MN", "R"])
+                 for c in letters}
+ZIP5 = re.compile(r"\d{5}")
+
+
+def soundex(token):
+    letters = [c for c in token if c.isalpha()]
+    if not letters:
+        return token
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        # H and W do not separate equal codes; vowels do
+        if digit and digit != "0" and digit != previous:
+            code += digit
+        if c not in "HW":
+            previous = digit
+        if len(code) == 4:
+            break
+    return code.ljust(4, "0")
+
+
+def name_tokens(name):
+    """Normalized tokens, sorted, without initials: 'MCCANN, JOHN C' -> ['JOHN', 'MCCANN']."""
+    tokens = normalize_name(name.replace("'", "")).split()
+    return sorted(t for t in tokens if len(t) > 1) or sorted(tokens)
+
+
+def blocking_keys(tokens, zips):
+    phonetic = " ".join(sorted(soundex(t) for t in tokens))
+    yield "s", phonetic
+    longest = soundex(max(tokens, key=len))
+    for zip_code in zips:
+        yield "z", zip_code, longest
+
+
+class DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        root = self.parent.setdefault(item, item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # The lower party ID becomes (and stays) the entity ID
+            self.parent[max(a, b)] = min(a, b)
+
+
+def trigrams(text):
+    text = f"  {text} "
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def similar_pairs(names, zips, threshold):
+    """Index pairs of ``names`` (one block) whose trigram cosine clears the threshold."""
+    # Optional dependency: only needed for resolution
+    import numpy as np
+
+    vocabulary = {}
+    rows, cols = [], []
+    for i, name in enumerate(names):
+        for gram in trigrams(name):
+            rows.append(i)
+            cols.append(vocabulary.setdefault(gram, len(vocabulary)))
+    counts = np.zeros((len(names), len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (np.array(rows), np.array(cols)), 1.0)
+    counts /= np.linalg.norm(counts, axis=1, keepdims=True)
+    scores = counts @ counts.T
+    zip_index = {}
+    zip_rows, zip_cols = [], []
+    for i, codes in enumerate(zips):
+        for code in codes:
+            zip_rows.append(i)
+            zip_cols.append(zip_index.setdefault(code, len(zip_index)))
+    if zip_index:
+        has_zip = np.zeros((len(names), len(zip_index)), dtype=np.float32)
+        has_zip[zip_rows, zip_cols] = 1.0
+        scores += ZIP_BONUS * ((has_zip @ has_zip.T) > 0)
+    left, right = np.nonzero(np.triu(scores >= threshold, k=1))
+    return zip(left.tolist(), right.tolist())
+
+
+def resolve(store_path=DEFAULT_STORE, role="debtor", threshold=DEFAULT_THRESHOLD, output=None):
+    start = time.perf_counter()
+    conn = sqlite3.connect(store_path)
+    try:
+        parties = conn.execute(PARTIES_QUERY, (role,)).fetchall()
+
+        # Same sorted tokens: same entity, no scoring needed
+        entities = DisjointSet()
+        by_name = {}
+        for party_id, name, zip_code in parties:
+            tokens = name_tokens(name)
+            if not tokens:
+                continue
+            key = " ".join(tokens)
+            ids, zips = by_name.setdefault(key, ([], set()))
+            ids.append(party_id)
+            match = ZIP5.match(zip_code or "")
+            if match:
+                zips.add(match.group())
+            entities.union(ids[0], party_id)
+
+        names = list(by_name)
+        blocks = {}
+        for index, key in enumerate(names):
+            for block_key in blocking_keys(key.split(), by_name[key][1]):
+                blocks.setdefault(block_key, []).append(index)
+
+        compared = skipped = 0
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BLOCK:
+                skipped += 1
+                continue
+            compared += len(members) * (len(members) - 1) // 2
+            block_names = [names[i] for i in members]
+            block_zips = [by_name[name][1] for name in block_names]
+            for a, b in similar_pairs(block_names, block_zips, threshold):
+                entities.union(by_name[block_names[a]][0][0], by_name[block_names[b]][0][0])
+
+        assignments = [(party_id, entities.find(party_id)) for ids, _ in by_name.values() for party_id in ids]
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute("DELETE FROM party_entities WHERE party_id IN (SELECT party_id FROM filing_parties WHERE role = ?)",
+                         (role,))
+            conn.executemany("INSERT OR REPLACE INTO party_entities (party_id, entity_id) VALUES (?, ?)", assignments)
+    finally:
+        conn.close()
+
+    if output:
+        names_by_id = {party_id: name for party_id, name, _ in parties}
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["entity_id", "party_id", "name"])
+            for party_id, entity_id in sorted(assignments, key=lambda a: (a[1], a[0])):
+                writer.writerow([entity_id, party_id, names_by_id[party_id]])
+
+    entity_count = len({entity_id for _, entity_id in assignments})
+    print(f"{len(assignments)} {role} parties, {len(names)} distinct names -> {entity_count} entities "
+          f"({len(blocks)} blocks, {skipped} too large, {compared} comparisons) in {time.perf_counter() - start:.1f}s")
+    return dict(assignments)
@@ -0,0 +1,167 @@
+"""Longest-job-first, work-stealing scheduling of (state, names) units.
+
+A big lender can take twenty times as long as a small one, so walking the
+names in file order leaves one worker busy long after the others are idle.
+Each unit's cost is estimated from how long it took in previous runs (an
+exponential moving average in .journal/unit_costs.json; a unit never seen is
+given its state's median). The units are dealt out greedily, most expensive
+first, to the worker with the least estimated work; each worker runs its own
+queue most expensive first and, once it is empty, steals from the back of
+the queue with the most work left.
+
+A worker passes over units of a portal that already has as many units
+running as it allows requests in flight (they would only wait in its rate
+limiter) as long as it has something else to do.
+
+At the end the makespan is reported against its lower bound: the larger of
+the total work divided by the workers and the longest single unit.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+from ucc.journal import JOURNAL_DIR
+
+COSTS_FILE = os.path.join(JOURNAL_DIR, "unit_costs.json")
+# Seconds assumed for a unit of a state with no history at all
+DEFAULT_COST = 60.0
+EWMA_WEIGHT = 0.5
+
+
+def cost_key(state, names):
+    return "|".join([state] + list(names))
+
+
+class CostModel:
+    """Seconds per unit, remembered across runs."""
+
+    def __init__(self, path=COSTS_FILE):
+        self.path = path
+        self.costs = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.costs = json.load(f)
+            except ValueError:
+                # A run killed while saving; start over rather than fail
+                self.costs = {}
+        self.lock = threading.Lock()
+
+    def estimate(self, state, names):
+        key = cost_key(state, names)
+        if key in self.costs:
+            return self.costs[key]
+        known = [cost for k, cost in self.costs.items() if k.split("|", 1)[0] == state]
+        return statistics.median(known) if known else DEFAULT_COST
+
+    def observe(self, state, names, seconds):
+        key = cost_key(state, names)
+        with self.lock:
+            previous = self.costs.get(key)
+            self.costs[key] = seconds if previous is None else (1 - EWMA_WEIGHT) * previous + EWMA_WEIGHT * seconds
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.costs, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class Unit:
+    __slots__ = ("scraper", "names", "estimate", "seconds")
+
+    def __init__(self, scraper, names, estimate):
+        self.scraper = scraper
+        self.names = names
+        self.estimate = estimate
+        self.seconds = None
+
+
+class WorkStealingScheduler:
+    """Runs ``func(scraper, names)`` for every unit on ``workers`` threads."""
+
+    def __init__(self, units, workers, state_limits=None):
+        self.workers = max(1, workers)
+        # Per state, how many units may run at once before a worker looks for something else
+        self.state_limits = state_limits or {}
+        self.running = {}
+        self.lock = threading.Lock()
+        self.queues = [deque() for _ in range(self.workers)]
+        self.queued = [0.0] * self.workers
+        # Longest processing time first: each unit goes to the least loaded worker
+        for unit in sorted(units, key=lambda u: -u.estimate):
+            worker = min(range(self.workers), key=lambda w: self.queued[w])
+            self.queues[worker].append(unit)
+            self.queued[worker] += unit.estimate
+        self.units = units
+        self.steals = 0
+
+    def _pick(self, queue, from_back=False):
+        """The first unit (from the front, or the back) whose portal has room, else the first one."""
+        order = reversed(queue) if from_back else iter(queue)
+        for unit in order:
+            state = unit.scraper.state
+            if self.running.get(state, 0) < self.state_limits.get(state, self.workers):
+                return unit
+        return queue[-1] if from_back else queue[0]
+
+    def take(self, worker):
+        with self.lock:
+            queue = self.queues[worker]
+            stolen = False
+            if not queue:
+                victim = max(range(self.workers), key=lambda w: self.queued[w])
+                if not self.queues[victim]:
+                    return None
+                worker, queue, stolen = victim, self.queues[victim], True
+            unit = self._pick(queue, from_back=stolen)
+            queue.remove(unit)
+            self.queued[worker] -= unit.estimate
+            self.steals += stolen
+            state = unit.scraper.state
+            self.running[state] = self.running.get(state, 0) + 1
+            return unit
+
+    def finished(self, unit):
+        with self.lock:
+            self.running[unit.scraper.state] -= 1
+
+    def run(self, func):
+        def work(worker):
+            while True:
+                unit = self.take(worker)
+                if unit is None:
+                    return
+                start = time.monotonic()
+                try:
+                    func(unit.scraper, unit.names)
+                    unit.seconds = time.monotonic() - start
+                except Exception as e:
+                    print(f"⚠️ [{unit.scraper.state}] Error during processing {', '.join(unit.names)}: {e}")
+                finally:
+                    self.finished(unit)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=work, args=(w,), name=f"unit-worker-{w}") for w in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - start
+
+    def report(self, makespan):
+        done = [u for u in self.units if u.seconds is not None]
+        if not done:
+            return
+        work = sum(u.seconds for u in done)
+        longest = max(done, key=lambda u: u.seconds)
+        bound = max(work / self.workers, longest.seconds)
+        ratio = makespan / bound if bound else 1.0
+        print(f"Makespan {makespan:.1f}s, lower bound {bound:.1f}s ({ratio:.2f}x): {work:.1f}s of work on "
+              f"{self.workers} workers, longest unit {longest.seconds:.1f}s "
+              f"({longest.scraper.state} {', '.join(longest.names)[:40]}), {self.steals} steals")
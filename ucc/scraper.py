@@ -0,0 +1,301 @@
+"""The ``StateScraper`` interface, the state registry and the concurrent runner.
+
+A state module defines one ``StateScraper`` subclass decorated with
+``@register``; everything else (browsers, CSV output, checkpoints) is handled
+here and in ucc.ratelimit, so that ``python -m ucc run --states AL,AZ --workers 4``
+can run several states at once.
+"""
+import argparse
+import importlib
+import os
+import sys
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import date
+from urllib.parse import urlsplit
+
+from ucc.browser import PROFILES, BrowserPool
+from ucc.delta import Delta
+from ucc.journal import Journal, journal_path_for, unit_key
+from ucc.output import CsvSink, DictCsvSink
+from ucc.probe import ResultProbe
+from ucc.ratelimit import limits
+from ucc.records import UCCFiling
+from ucc.schedule import COSTS_FILE, CostModel, Unit, WorkStealingScheduler
+from ucc.session import PortalSession
+from ucc.store import Store
+from ucc import trace
+from ucc.trace import context
+
+REGISTRY = {}
+
+# A scraper may yield this instead of single rows: all rows of one filing, checkpointed together
+FilingRows = namedtuple("FilingRows", ["key", "rows"])
+
+# Module that registers each state, importable from the repository root
+STATE_MODULES = {
+    "AL": "AL.al",
+    "AZ": "AZ.AZ",
+    "CA": "CA.ca",
+    "KY": "KY.KY",
+    "MA": "MA.MA",
+    "WV": "WV.wv",
+}
+
+
+def register(cls):
+    REGISTRY[cls.state] = cls
+    return cls
+
+
+def get_scraper(state):
+    state = state.upper()
+    if state not in REGISTRY:
+        if state not in STATE_MODULES:
+            raise KeyError(f"Unknown state '{state}'. Known states: {', '.join(sorted(STATE_MODULES))}")
+        importlib.import_module(STATE_MODULES[state])
+    return REGISTRY[state]
+
+
+def read_names(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class StateScraper:
+    """One state portal.
+
+    Subclasses set ``state``, ``url`` and ``output_file`` and implement
+    ``scrape_name``. With ``header`` set rows are lists written as they come;
+    with ``header = None`` rows are dicts and the columns are chosen by
+    ``output_columns`` once the run is over. Either way each row becomes a
+    ``UCCFiling`` on ``emit``.
+    """
+
+    state = None
+    url = None
+    output_file = None
+    header = None
+    names_file = "secured_party_names.txt"
+    # Quit the browser after every name instead of returning it to the pool
+    fresh_browser_per_name = False
+    # Search all names in one unit (the portal keeps a combined result list)
+    batch = False
+    # Each run fetches only what is new since the last, so a filing it does not see is not gone (see ucc.delta)
+    incremental = False
+    # Files in the state directory that carry state from one run to the next; benchmarks and reparses start without them
+    run_state_files = ()
+
+    def __init__(self, output_dir=None, run_date=None):
+        module = sys.modules[type(self).__module__]
+        self.directory = os.path.dirname(os.path.abspath(module.__file__))
+        self.output_dir = output_dir or self.directory
+        # The day the output is dated by; a reparse uses the day its pages were archived
+        self.run_date = run_date or date.today()
+        self.sink = None
+        self.journal = None
+        self.store = None
+        self.delta = None
+        # Secured parties and filers shared by this run's rows (see ucc.records)
+        self.parties = {}
+        # Cookies (Cloudflare clearance) kept across browsers and runs; see ucc.session
+        self.session = PortalSession(self.state, self.url) if self.url else None
+        # Searches that come back empty skip the rest of their wait; see ucc.probe
+        self.probe = ResultProbe(self.state)
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def output_path(self):
+        if self.output_dir == self.directory:
+            return self.path(self.output_file)
+        # A shared output directory gets one subdirectory per state: AZ and CA both write ucc_results.csv
+        directory = os.path.join(self.output_dir, self.state)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, self.output_file)
+
+    def names(self):
+        return read_names(self.path(self.names_file))
+
+    def units(self, names):
+        return [names] if self.batch else [[name] for name in names]
+
+    def unit_key(self, names):
+        return unit_key(self.state, self.journal.window, names)
+
+    def filing_done(self, name, filing):
+        """True if a resumed run already has this filing of ``name`` in its journal."""
+        return self.journal.previous.filing_done(self.unit_key([name]), filing)
+
+    def start(self):
+        if self.header is not None:
+            self.sink = CsvSink(self.output_path(), self.header)
+        else:
+            self.sink = DictCsvSink(self.output_path(), self.output_columns)
+
+    def finish(self):
+        self.sink.close()
+        self.parties = {}
+        print(f"\n✅ {self.state} done. {self.sink.count} rows saved to {self.sink.path}")
+
+    def output_columns(self, keys):
+        return keys
+
+    def emit(self, row):
+        filing = UCCFiling.from_row(self.state, row, self.header, self.parties)
+        self.sink.write(filing)
+        if self.store is not None:
+            self.store.add(filing)
+        if self.delta is not None:
+            self.delta.add(filing)
+
+    def scrape(self, driver, names):
+        # Errors propagate so that a failed name is not checkpointed as done
+        for name in names:
+            print(f"[{self.state}] Processing: {name}")
+            with context(name=name):
+                yield from self.scrape_name(driver, name)
+
+    def scrape_name(self, driver, name):
+        raise NotImplementedError
+
+    def unit_done(self, names):
+        """Called once a unit's rows are all written and journaled; state kept across runs advances here."""
+
+
+def run_unit(scraper, pool, names):
+    journal = scraper.journal
+    unit = scraper.unit_key(names)
+    for row in journal.previous.replay_rows(unit):
+        scraper.emit(row)
+    if unit in journal.previous.done_units:
+        return
+    journal.start(unit)
+    with context(state=scraper.state), pool.lease(fresh=scraper.fresh_browser_per_name) as driver:
+        for item in scraper.scrape(driver, names):
+            if isinstance(item, FilingRows):
+                journal.filing(unit, item.key, item.rows)
+                for row in item.rows:
+                    scraper.emit(row)
+            else:
+                journal.row(unit, item)
+                scraper.emit(item)
+    journal.done(unit)
+    scraper.unit_done(names)
+
+
+def make_pool(engine, workers, profile=None, recorder=None):
+    if engine == "playwright":
+        # Optional dependency: only needed when this engine is chosen
+        from ucc.playwright_engine import PlaywrightPool
+
+        return PlaywrightPool(workers, profile=profile, recorder=recorder)
+    if recorder is not None:
+        raise ValueError("Archiving pages needs the Playwright engine (--engine playwright)")
+    if engine == "daemon":
+        from ucc.daemon import DaemonPool
+
+        return DaemonPool(workers, profile=profile)
+    return BrowserPool(workers, profile=profile)
+
+
+def run_scrapers(scrapers, workers=1, profile=None, engine="selenium", resume=False, journal_path=None,
+                 store=None, pool=None, archive=None, costs_path=COSTS_FILE, delta=None):
+    """Run every scraper's units over one shared browser pool of ``workers`` drivers.
+
+    With ``engine="playwright"`` the drivers are contexts of a single browser
+    process, so ``workers`` can be far higher for the same memory. With
+    ``resume`` the units and filings finished by the previous run of the same
+    states are taken from the journal instead of being scraped again. Every
+    row also goes into ``store`` (a ucc.store.Store) when one is given, and
+    ``delta`` (a ucc.delta.Delta) writes each state's change feed. With
+    ``archive`` (a directory) every page and HTTP response is also kept there
+    for ``python -m ucc reparse``. A ready-made ``pool`` replaces the one built
+    from ``engine`` and ``profile``.
+
+    Units run longest first, by their durations in previous runs (kept in
+    ``costs_path``), and idle workers steal queued ones; see ucc.schedule.
+    """
+    recorder = None
+    if archive is not None:
+        # Imported here: requests is only needed when archiving
+        from ucc.replay import Archive, Recorder, serving
+
+        recorder = Recorder(Archive(archive), hosts={urlsplit(s.url).netloc: s.state for s in scrapers})
+    # The AL detail fetches go through requests, not the browser
+    capture = serving(recorder) if recorder is not None else nullcontext()
+    journal = Journal(journal_path or journal_path_for([s.state for s in scrapers]), resume=resume)
+    if resume:
+        print(f"Resuming: {len(journal.previous.done_units)} units already done in {journal.path}")
+    pool = pool or make_pool(engine, workers, profile, recorder=recorder)
+    try:
+        for scraper in scrapers:
+            scraper.journal = journal
+            scraper.store = store
+            scraper.delta = delta
+            scraper.start()
+        costs = CostModel(costs_path)
+        units = [Unit(s, names, costs.estimate(s.state, names)) for s in scrapers for names in s.units(s.names())]
+        # Running more units of a portal than it allows requests in flight only fills its limiter's queue
+        state_limits = {s.state: limits().for_url(s.url).max_in_flight for s in scrapers}
+        scheduler = WorkStealingScheduler(units, workers, state_limits)
+        with capture:
+            makespan = scheduler.run(lambda scraper, names: run_unit(scraper, pool, names))
+        for unit in units:
+            # Units replayed from the journal took no time worth remembering
+            if unit.seconds is not None and unit.scraper.unit_key(unit.names) not in journal.previous.done_units:
+                costs.observe(unit.scraper.state, unit.names, unit.seconds)
+        costs.save()
+        scheduler.report(makespan)
+        for scraper in scrapers:
+            if scraper.session is not None:
+                scraper.session.report(scraper.state)
+            scraper.probe.report()
+        if delta is not None:
+            for scraper in scrapers:
+                complete = all(u.seconds is not None for u in units if u.scraper is scraper)
+                delta.finish(scraper.state, os.path.dirname(scraper.output_path()), complete=complete,
+                             incremental=scraper.incremental)
+    finally:
+        for scraper in scrapers:
+            if scraper.sink is not None:
+                scraper.finish()
+        pool.close()
+        journal.close()
+        if store is not None:
+            store.close()
+            print(f"{store.rows} rows stored; {store.filings} filings in {store.path} ({store.skipped} rows without a filing number)")
+        limits().export()
+        limits().report()
+
+
+def run_from_args(scraper_classes, args):
+    scrapers = [cls(output_dir=args.output_dir) for cls in scraper_classes]
+    store = None if args.no_store else Store(args.store)
+    if args.trace:
+        trace.enable(args.trace)
+    if args.cache:
+        # Imported here: the cache needs requests
+        from ucc import cache
+
+        cache.enable()
+    try:
+        run_scrapers(scrapers, workers=args.workers, profile=PROFILES[args.profile], engine=args.engine,
+                     resume=args.resume, journal_path=args.journal, store=store, archive=args.archive,
+                     delta=None if args.no_delta else Delta())
+    finally:
+        if args.cache:
+            cache.active().report()
+            cache.disable()
+        if args.trace:
+            trace.disable()
+            print(f"Trace written to {args.trace}; summary: python -m ucc trace {args.trace}")
+
+
+def main(*scraper_classes):
+    """Entry point for running a state file directly, e.g. ``python AZ.py --resume``."""
+    from ucc.cli import add_run_arguments
+
+    parser = argparse.ArgumentParser(description=f"Scrape {', '.join(cls.state for cls in scraper_classes)}")
+    add_run_arguments(parser)
+    run_from_args(scraper_classes, parser.parse_args())
@@ -0,0 +1,108 @@
+"""Per-portal cookie jars, so a Cloudflare clearance outlives the browser that earned it.
+
+KY and AZ sit behind a Cloudflare check, and each name used to get a new
+browser that had to pass it again, behind a fixed five-second pause. Now a
+portal's persistent cookies (the clearance among them; not the ASP.NET session
+cookie, which stays with the browser that has it) are saved to
+.sessions/<STATE>.json after every page that loads clean. They are put into
+any browser before it opens the portal, this run or the next. The challenge is
+waited out only when it actually shows: when the clearance has expired, or
+when the portal will not take it from this browser.
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from ucc.browser import TracedWait
+from ucc.ratelimit import is_challenge
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SESSIONS_DIR = os.path.join(REPO_ROOT, ".sessions")
+# How long a challenge may take to clear before the page is given up on
+CHALLENGE_TIMEOUT = 30
+
+# What DevTools' Network.setCookies accepts of a WebDriver cookie
+CDP_COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+
+
+def cookie_expiry(cookie):
+    # WebDriver says "expiry"; Playwright says "expires" and -1 for a session cookie
+    expiry = cookie.get("expiry", cookie.get("expires"))
+    return expiry if expiry is not None and expiry >= 0 else None
+
+
+class PortalSession:
+    """The saved cookies of one portal; shared by its workers."""
+
+    def __init__(self, state, url, directory=SESSIONS_DIR):
+        self.host = urlsplit(url).hostname or ""
+        self.path = os.path.join(directory, f"{state}.json")
+        self.lock = threading.Lock()
+        self.cookies = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.cookies = json.load(f)
+            except ValueError:
+                # Torn by a killed run; the portal hands out new ones
+                self.cookies = []
+        self.counts = {"clean": 0, "challenged": 0}
+        self.waited = 0.0
+
+    def _ours(self, cookie):
+        domain = cookie.get("domain", "").lstrip(".")
+        return self.host == domain or self.host.endswith(f".{domain}")
+
+    def restore(self, driver):
+        now = time.time()
+        with self.lock:
+            cookies = [c for c in self.cookies if cookie_expiry(c) > now]
+        if not cookies:
+            return
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chrome takes them before it has been on the portal; add_cookie would need a page there first
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": [
+                dict({k: c[k] for k in CDP_COOKIE_FIELDS if k in c}, expires=cookie_expiry(c)) for c in cookies
+            ]})
+        else:
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+
+    def save(self, driver):
+        cookies = [dict(c, expiry=cookie_expiry(c)) for c in driver.get_cookies()
+                   if self._ours(c) and cookie_expiry(c) is not None]
+        for cookie in cookies:
+            cookie.pop("expires", None)
+        with self.lock:
+            if cookies == self.cookies:
+                return
+            self.cookies = cookies
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cookies, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def open(self, driver, url, timeout=CHALLENGE_TIMEOUT):
+        """Load ``url`` with the saved cookies, waiting for a challenge to clear only if one shows."""
+        self.restore(driver)
+        driver.get(url)
+        if is_challenge(driver.title):
+            start = time.monotonic()
+            TracedWait(driver, timeout, poll_frequency=0.5).until(lambda d: not is_challenge(d.title))
+            with self.lock:
+                self.counts["challenged"] += 1
+                self.waited += time.monotonic() - start
+        else:
+            with self.lock:
+                self.counts["clean"] += 1
+        self.save(driver)
+
+    def report(self, state):
+        with self.lock:
+            clean, challenged = self.counts["clean"], self.counts["challenged"]
+        if clean or challenged:
+            print(f"[{state}] {clean} portal loads without a challenge, {challenged} challenged "
+                  f"({self.waited:.1f}s waiting)")
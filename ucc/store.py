@@ -0,0 +1,218 @@
+"""One normalized SQLite store for every state's output, with a Parquet export.
+
+Each state writes its own CSV with its own headers. The store maps those
+columns onto one schema instead: ``filings`` (one row per state and filing
+number), ``parties`` (distinct name and address) and ``addresses``, linked by
+``filing_parties`` with the party's role. Rows arrive as ``UCCFiling``
+records (see ucc.records for how each state's columns are mapped); columns
+that fit nowhere are kept in ``filings.extra`` as JSON, so nothing a portal
+returned is lost.
+
+    python -m ucc store load KY KY/KY_UCC1.csv
+    python -m ucc store export parquet_dir      # needs pyarrow
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from ucc.records import ROLES, UCCFiling
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STORE = os.path.join(REPO_ROOT, "ucc_store.sqlite3")
+
+COMMIT_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS addresses (
+    id INTEGER PRIMARY KEY,
+    street TEXT NOT NULL,
+    city TEXT NOT NULL,
+    state TEXT NOT NULL,
+    zip TEXT NOT NULL,
+    UNIQUE (street, city, state, zip)
+);
+CREATE TABLE IF NOT EXISTS parties (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    address_id INTEGER NOT NULL REFERENCES addresses (id),
+    UNIQUE (name, address_id)
+);
+CREATE TABLE IF NOT EXISTS filings (
+    id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    filing_number TEXT NOT NULL,
+    filing_date TEXT,
+    lapse_date TEXT,
+    status TEXT,
+    filing_type TEXT,
+    search_name TEXT,
+    processed TEXT,
+    extra TEXT,
+    UNIQUE (state, filing_number)
+);
+CREATE TABLE IF NOT EXISTS filing_parties (
+    filing_id INTEGER NOT NULL REFERENCES filings (id),
+    role TEXT NOT NULL,
+    party_id INTEGER NOT NULL REFERENCES parties (id),
+    PRIMARY KEY (filing_id, role, party_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS filings_state_date ON filings (state, filing_date);
+CREATE INDEX IF NOT EXISTS filings_date ON filings (filing_date);
+CREATE INDEX IF NOT EXISTS parties_name ON parties (name);
+CREATE INDEX IF NOT EXISTS filing_parties_party ON filing_parties (party_id, role);
+"""
+
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%m-%d-%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y %I:%M %p"]
+
+
+def iso_date(text):
+    """ISO date for the formats the portals use; anything else is kept as is."""
+    text = (text or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return text or None
+
+
+class Store:
+    """Upserts rows into the normalized tables; safe to share between scraper threads."""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.address_ids = {}
+        self.party_ids = {}
+        self.pending = 0
+        self.rows = 0
+        self.skipped = 0
+        self.filings = 0
+
+    def _address_id(self, street, city, state, zip_code):
+        key = (street, city, state, zip_code)
+        if key not in self.address_ids:
+            self.conn.execute("INSERT OR IGNORE INTO addresses (street, city, state, zip) VALUES (?, ?, ?, ?)", key)
+            self.address_ids[key] = self.conn.execute(
+                "SELECT id FROM addresses WHERE street = ? AND city = ? AND state = ? AND zip = ?", key
+            ).fetchone()[0]
+        return self.address_ids[key]
+
+    def _party_id(self, name, address_id):
+        key = (name, address_id)
+        if key not in self.party_ids:
+            self.conn.execute("INSERT OR IGNORE INTO parties (name, address_id) VALUES (?, ?)", key)
+            self.party_ids[key] = self.conn.execute(
+                "SELECT id FROM parties WHERE name = ? AND address_id = ?", key
+            ).fetchone()[0]
+        return self.party_ids[key]
+
+    def add(self, filing):
+        """Store one ``UCCFiling``; filings without a number cannot be keyed and are only counted."""
+        filing_number = filing.filing_number.strip()
+        with self.lock:
+            if not filing_number:
+                self.skipped += 1
+                return
+            extra = {c: v for c, v in zip(filing.layout.extra, filing.extra) if v not in (None, "")}
+            self.conn.execute(
+                """INSERT INTO filings (state, filing_number, filing_date, lapse_date, status, filing_type,
+                                        search_name, processed, extra)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (state, filing_number) DO UPDATE SET
+                       filing_date = excluded.filing_date, lapse_date = excluded.lapse_date,
+                       status = excluded.status, filing_type = excluded.filing_type,
+                       search_name = excluded.search_name, processed = excluded.processed,
+                       extra = excluded.extra""",
+                (
+                    filing.state, filing_number,
+                    iso_date(filing.filing_date),
+                    iso_date(filing.lapse_date),
+                    filing.status.strip() or None,
+                    filing.filing_type.strip() or None,
+                    filing.search_name.strip() or None,
+                    filing.processed.strip() or None,
+                    json.dumps(extra) if extra else None,
+                ),
+            )
+            filing_id = self.conn.execute(
+                "SELECT id FROM filings WHERE state = ? AND filing_number = ?", (filing.state, filing_number)
+            ).fetchone()[0]
+            for role in ROLES:
+                party = filing.party(role)
+                if party is None or not party.name.strip():
+                    continue
+                address_id = self._address_id(*(str(v).strip() for v in party[1:]))
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO filing_parties (filing_id, role, party_id) VALUES (?, ?, ?)",
+                    (filing_id, role, self._party_id(party.name.strip(), address_id)),
+                )
+            self.rows += 1
+            self.pending += 1
+            if self.pending >= COMMIT_EVERY:
+                self.conn.commit()
+                self.pending = 0
+
+    def load_csv(self, state, path):
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.add(UCCFiling.from_row(state, row))
+
+    def close(self):
+        """Commit and close; ``filings`` is then the number of distinct filings in the store."""
+        with self.lock:
+            self.conn.commit()
+            self.filings = self.conn.execute("SELECT COUNT(*) FROM filings").fetchone()[0]
+            self.conn.close()
+
+
+# One wide row per filing for analytics: the first debtor and secured party are flattened in
+EXPORT_QUERY = """
+SELECT f.state, f.filing_number, f.filing_date, f.lapse_date, f.status, f.filing_type,
+       f.search_name, f.processed,
+       d.name AS debtor_name, da.street AS debtor_street, da.city AS debtor_city,
+       da.state AS debtor_state, da.zip AS debtor_zip,
+       s.name AS secured_party_name, sa.street AS secured_party_street, sa.city AS secured_party_city,
+       sa.state AS secured_party_state, sa.zip AS secured_party_zip,
+       COALESCE(substr(f.filing_date, 1, 7), 'unknown') AS filing_month
+FROM filings f
+LEFT JOIN filing_parties dp ON dp.filing_id = f.id AND dp.role = 'debtor'
+    AND dp.party_id = (SELECT MIN(party_id) FROM filing_parties WHERE filing_id = f.id AND role = 'debtor')
+LEFT JOIN parties d ON d.id = dp.party_id
+LEFT JOIN addresses da ON da.id = d.address_id
+LEFT JOIN filing_parties sp ON sp.filing_id = f.id AND sp.role = 'secured_party'
+    AND sp.party_id = (SELECT MIN(party_id) FROM filing_parties WHERE filing_id = f.id AND role = 'secured_party')
+LEFT JOIN parties s ON s.id = sp.party_id
+LEFT JOIN addresses sa ON sa.id = s.address_id
+"""
+EXPORT_BATCH = 50000
+
+
+def export_parquet(store_path, output_dir):
+    """Write the store as Parquet partitioned by state and filing month (state=KY/filing_month=2025-06/)."""
+    # Optional dependency: only needed for the export
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    conn = sqlite3.connect(store_path)
+    try:
+        cursor = conn.execute(EXPORT_QUERY)
+        columns = [d[0] for d in cursor.description]
+        total = 0
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH)
+            if not rows:
+                break
+            table = pa.table({col: [row[i] for row in rows] for i, col in enumerate(columns)})
+            pq.write_to_dataset(table, output_dir, partition_cols=["state", "filing_month"])
+            total += len(rows)
+    finally:
+        conn.close()
+    return total
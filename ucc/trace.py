@@ -0,0 +1,189 @@
+"""Tracing spans: where the time of a run goes, per state and stage.
+
+    with span("extract", filing=link):
+        ...
+
+Stages used by the scrapers: ``navigate`` (driver.get/refresh/back),
+``wait`` (explicit waits and fixed pauses), ``extract`` (reading one filing),
+``parse`` (address parsing) and ``lookup`` (zip code and NAICS lookups).
+The state and searched name come from ``context``, which the runner sets per
+name. Spans go to a JSONL file (``run --trace FILE``, or ``UCC_TRACE=FILE``
+for the standalone scripts) and ``python -m ucc trace FILE`` shows p50, p95
+and total per stage and state.
+
+Disabled (the default), ``span`` returns one shared no-op object: a global
+lookup and a call, nothing else.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+FLUSH_EVERY = 1000
+
+_tracer = None
+_context = threading.local()
+_pause_scale = 1.0
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def tag(self, **tags):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "stage", "tags", "start")
+
+    def __init__(self, tracer, stage, tags):
+        self.tracer = tracer
+        self.stage = stage
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.stage, self.tags, time.perf_counter() - self.start, exc_type is None)
+        return False
+
+    def tag(self, **tags):
+        self.tags.update(tags)
+
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.buffer = []
+
+    def record(self, stage, tags, duration, ok):
+        record = {"stage": stage, "dur": round(duration, 6), "ok": ok}
+        record.update(current_tags())
+        record.update(tags)
+        line = json.dumps(record, default=str)
+        with self.lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.file.flush()
+            self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
+
+
+def enable(path):
+    global _tracer
+    disable()
+    _tracer = Tracer(path)
+
+
+def disable():
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+        _tracer = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(stage, **tags):
+    tracer = _tracer
+    if tracer is None:
+        return NULL_SPAN
+    return Span(tracer, stage, tags)
+
+
+def traced(stage, **tags):
+    """Decorator: every call of the function is one span."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with Span(tracer, stage, dict(tags)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_tags():
+    return getattr(_context, "tags", {})
+
+
+@contextmanager
+def context(**tags):
+    """Tags (state, name) added to every span this thread records inside the block."""
+    previous = current_tags()
+    _context.tags = {**previous, **tags}
+    try:
+        yield
+    finally:
+        _context.tags = previous
+
+
+def pause(seconds):
+    """``time.sleep`` that shows up as a wait."""
+    with span("wait", fixed=seconds):
+        time.sleep(seconds * _pause_scale)
+
+
+def scale_pauses(factor):
+    """Shorten (or with 0, skip) the fixed pauses, e.g. when replaying recorded pages."""
+    global _pause_scale
+    _pause_scale = factor
+
+
+if os.environ.get("UCC_TRACE"):
+    enable(os.environ["UCC_TRACE"])
+    atexit.register(disable)
+
+
+# --- Report ---
+
+def percentile(ordered, q):
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(path, out=sys.stdout):
+    durations = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = (record.get("state") or "-", record["stage"])
+            durations.setdefault(key, []).append(record["dur"])
+
+    print(f"{'State':<6} {'Stage':<10} {'Count':>7} {'p50 s':>8} {'p95 s':>8} {'Total s':>9}", file=out)
+    for state in sorted({state for state, _ in durations}):
+        stages = [(stage, sorted(values)) for (s, stage), values in durations.items() if s == state]
+        for stage, values in sorted(stages, key=lambda item: -sum(item[1])):
+            print(f"{state:<6} {stage:<10} {len(values):>7} {percentile(values, 0.5):>8.3f} "
+                  f"{percentile(values, 0.95):>8.3f} {sum(values):>9.3f}", file=out)